@@ -0,0 +1,49 @@
+# =============================================================================
+#           HyperNesting v3.0 - checkpoint.py (نقاط الحفظ واستئناف مهام التعشيش الطويلة)
+# =============================================================================
+"""Checkpoints of long nesting runs.
+
+A checkpoint is a run log (run_log.py) written with GAConfig.run_log_keep: its header holds the job
+(unique parts as WKB, the sheet or sheet inventory, the GA config and seed) and every few generations
+the file is cut back to the latest generation, so it stays small and each generation costs one
+appended record. load_checkpoint() rebuilds the job from the file alone; the nester then continues
+with the logged populations and RNG states, exactly as the interrupted run would have.
+"""
+import os
+from dataclasses import replace
+from typing import Dict, Optional
+
+import shapely
+
+from nesting_engine import Part, PartPool, SheetConfig, GAConfig, GeneticAlgorithmNester, NestingWorkerPool
+from run_log import load_run_log
+
+DEFAULT_CHECKPOINT_DIR = os.path.join(os.path.expanduser("~"), ".hypernesting", "checkpoints")
+DEFAULT_CHECKPOINT_PATH = os.path.join(DEFAULT_CHECKPOINT_DIR, "last_run.hnrl")
+CHECKPOINT_KEEP = 10  # generations between compactions of a checkpoint log
+
+def checkpoint_config(ga_config: GAConfig, path: str = DEFAULT_CHECKPOINT_PATH) -> GAConfig:
+    """ga_config writing a checkpoint to `path` while it runs."""
+    return replace(ga_config, run_log_path=path, run_log_keep=ga_config.run_log_keep or CHECKPOINT_KEEP)
+
+def load_checkpoint(path: str) -> Dict:
+    """The job stored in a checkpoint: {'parts_pool', 'sheet_config', 'sheets', 'ga_config', 'generation'}.
+
+    ga_config resumes from `path` and keeps checkpointing to it; a run that had reached its generation
+    cap gets another `generations` to go.
+    """
+    header, records = load_run_log(path)
+    if 'job' not in header: raise ValueError(f"{path} is a run log without a job snapshot and cannot be resumed on its own")
+    job = header['job']
+    unique = [Part(id=entry['id'], geometry=shapely.from_wkb(bytes.fromhex(entry['wkb'])), name=entry['name'], source_file=entry['source_file']) for entry in job['parts']]
+    parts_pool = PartPool(unique, job['pool'])  # same unique order and copy indices as the pool the run started from
+    sheet_config = SheetConfig(**job['sheet']); sheets = [SheetConfig(**sheet) for sheet in job['sheets']] if job['sheets'] else None
+    generation = max((record.generation for record in records), default=0)
+    ga = GAConfig(**header['ga']); generations = ga.generations + generation if ga.generations and generation >= ga.generations else ga.generations
+    ga_config = replace(ga, seed=header['seed'], generations=generations, resume_log_path=path, resume_generation=0, run_log_path=path, run_log_keep=ga.run_log_keep or CHECKPOINT_KEEP)
+    return {'parts_pool': parts_pool, 'sheet_config': sheet_config, 'sheets': sheets, 'ga_config': ga_config, 'generation': generation}
+
+def checkpoint_nester(path: str, worker_pool: Optional[NestingWorkerPool] = None) -> GeneticAlgorithmNester:
+    """A nester that continues the run checkpointed in `path`."""
+    job = load_checkpoint(path)
+    return GeneticAlgorithmNester(job['parts_pool'], job['sheet_config'], job['ga_config'], worker_pool, job['sheets'])
@@ -0,0 +1,252 @@
+# =============================================================================
+#           HyperNesting v3.0 - dxf_io.py (قراءة وكتابة ملفات DXF بدون واجهة)
+# =============================================================================
+import os
+import re
+import sqlite3
+import concurrent.futures
+from typing import List, Tuple, Sequence, Optional, Iterator, Callable
+
+import ezdxf
+from ezdxf import edgeminer, edgesmith, path as ezdxf_path
+import shapely
+from shapely.geometry import Polygon, GeometryCollection
+from shapely.affinity import rotate as shapely_rotate, translate as shapely_translate
+
+MIN_PART_AREA = 1e-6
+GAP_TOL = 1e-6; GROUP_GRID = 1e-3  # loop chaining: endpoint distance that connects edges, and the grid edges are pre-grouped on
+FLATTEN_DISTANCE = 0.01  # max deviation of flattened arcs and curves from the drawing
+LOOP_TIMEOUT = 10.0      # seconds per group of connected edges
+DXF_VERSION = 'R2010'; DXF_VERSIONS = ('R2000', 'R2004', 'R2007', 'R2010', 'R2013', 'R2018')
+SHEET_GAP = 0.1  # single-file export: gap between sheets, as a fraction of the widest sheet
+DEFAULT_IMPORT_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".hypernesting", "import_cache.sqlite")
+
+def _path_polygon(path) -> Optional[Polygon]:
+    points = [(v.x, v.y) for v in path.flattening(FLATTEN_DISTANCE)]
+    if len(points) < 3: return None
+    polygon = Polygon(points)
+    return polygon if polygon.is_valid and polygon.area > MIN_PART_AREA else None
+
+def _edge_groups(edges: Sequence[edgeminer.Edge]) -> List[List[edgeminer.Edge]]:
+    """Edges split into groups that share endpoints, so each loop search only sees its own drawing."""
+    parent = list(range(len(edges))); owner = {}
+    def root(i):
+        while parent[i] != i: parent[i] = parent[parent[i]]; i = parent[i]
+        return i
+    for i, edge in enumerate(edges):
+        for vertex in (edge.start, edge.end):
+            key = (round(vertex.x / GROUP_GRID), round(vertex.y / GROUP_GRID)); j = owner.setdefault(key, i)
+            if j != i: parent[root(i)] = root(j)
+    groups = {}
+    for i, edge in enumerate(edges): groups.setdefault(root(i), []).append(edge)
+    return list(groups.values())
+
+def _edge_loops(edges: Sequence[edgeminer.Edge]) -> Iterator[Sequence[edgeminer.Edge]]:
+    """Closed loops chained from open edges (see ezdxf.edgeminer); edges left over are open linework."""
+    for group in _edge_groups(edges):
+        while len(group) > 1:
+            try: loop = edgeminer.find_loop(edgeminer.Deposit(group, gap_tol=GAP_TOL), timeout=LOOP_TIMEOUT)
+            except edgeminer.TimeoutError: break
+            if not loop: break
+            yield loop; group = edgeminer.subtract_edges(group, loop)
+
+OUTLINE_TYPES = {'LINE', 'ARC', 'CIRCLE', 'ELLIPSE', 'SPLINE', 'LWPOLYLINE', 'POLYLINE'}
+
+def _outline_entities(entities, layer: Optional[str]) -> Iterator:
+    """Outline entities with block references expanded in place, like a CAD program shows them."""
+    for e in entities:
+        if e.dxftype() == 'INSERT': yield from _outline_entities(e.virtual_entities(), layer)
+        elif e.dxftype() in OUTLINE_TYPES and (layer is None or e.dxf.layer == layer): yield e
+
+def read_dxf_polygons(filepath: str, layer: Optional[str] = None) -> List[Polygon]:
+    """Closed outlines found in the modelspace of a DXF file, as valid shapely polygons.
+
+    Closed entities (circles, closed polylines, full ellipses and splines) are outlines by themselves;
+    lines, arcs and open polylines are chained into loops by their endpoints. Block references are
+    expanded. `layer` keeps only the outlines on that layer, e.g. 'PARTS' to read back an exported
+    layout without its sheet outline.
+    """
+    doc = ezdxf.readfile(filepath); entities = list(_outline_entities(doc.modelspace(), layer))
+    closed = [e for e in entities if edgesmith.is_closed_entity(e)]; edges = list(edgesmith.edges_from_entities_2d([e for e in entities if not edgesmith.is_closed_entity(e)], gap_tol=GAP_TOL))
+    paths = [ezdxf_path.make_path(e) for e in closed] + [edgesmith.path2d_from_chain(loop) for loop in _edge_loops(edges)]
+    return polygons_with_holes([polygon for polygon in map(_path_polygon, paths) if polygon is not None])
+
+def polygons_with_holes(loops: Sequence[Polygon]) -> List[Polygon]:
+    """Groups closed loops into parts: a loop directly inside a part's outline is one of its holes.
+
+    Nesting depth alternates outline / hole / outline, so a part drawn inside another part's cut-out
+    (depth 2) stays a separate part. Parts come out in the order of their outlines in `loops`.
+    """
+    order = sorted(range(len(loops)), key=lambda i: -loops[i].area); tree = shapely.STRtree([loops[i] for i in order])
+    depth = [0] * len(order); parent = [-1] * len(order); holes = {}
+    for rank, index in enumerate(order):
+        # containers are larger, so they sort earlier; the last one found is the innermost
+        containers = [c for c in tree.query(loops[index], predicate='within').tolist() if c < rank]
+        if containers: parent[rank] = max(containers); depth[rank] = depth[parent[rank]] + 1
+        if depth[rank] % 2: holes.setdefault(parent[rank], []).append(loops[index].exterior.coords)
+    polygons = {}
+    for rank, index in enumerate(order):
+        if depth[rank] % 2: continue
+        polygon = Polygon(loops[index].exterior.coords, holes.get(rank, []))
+        polygons[index] = polygon if polygon.is_valid else loops[index]  # touching holes: fall back to the solid outline
+    return [polygons[i] for i in sorted(polygons)]
+
+def dxf_parts(filepath: str, cache: Optional['DxfImportCache'] = None) -> List[Tuple[str, Polygon]]:
+    """(name, polygon) for every outline in the file, named <file stem>_<n> like the Parts tab does."""
+    polygons = cache.get(filepath) if cache else None
+    if polygons is None:
+        polygons = read_dxf_polygons(filepath)
+        if cache: cache.put(filepath, polygons)
+    return part_names(filepath, polygons)
+
+def part_names(filepath: str, polygons: Sequence[Polygon]) -> List[Tuple[str, Polygon]]:
+    stem = os.path.basename(filepath).split('.')[0]
+    return [(f"{stem}_{i+1}", polygon) for i, polygon in enumerate(polygons)]
+
+class DxfImportCache:
+    """Polygonized outlines of imported DXF files, keyed by (absolute path, mtime, size).
+
+    A file whose mtime or size changed is parsed again and its row replaced. The polygons of one
+    file are stored as a single GeometryCollection WKB so their order survives the round trip.
+    """
+    def __init__(self, path: str = DEFAULT_IMPORT_CACHE_PATH):
+        self.path = path; self.hits = 0; self.misses = 0; self._conn: Optional[sqlite3.Connection] = None
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            self._conn.execute("CREATE TABLE IF NOT EXISTS files (path TEXT PRIMARY KEY, mtime_ns INTEGER, size INTEGER, payload BLOB)")
+        return self._conn
+    @staticmethod
+    def file_key(filepath: str) -> Tuple[str, int, int]:
+        stat = os.stat(filepath)
+        return os.path.abspath(filepath), stat.st_mtime_ns, stat.st_size
+    def get(self, filepath: str) -> Optional[List[Polygon]]:
+        try:
+            path, mtime_ns, size = self.file_key(filepath)
+            row = self._connection().execute("SELECT payload FROM files WHERE path=? AND mtime_ns=? AND size=?", (path, mtime_ns, size)).fetchone()
+        except (OSError, sqlite3.Error): row = None
+        if row is None: self.misses += 1; return None
+        self.hits += 1
+        return list(shapely.get_parts(shapely.from_wkb(row[0])))
+    def put(self, filepath: str, polygons: Sequence[Polygon]):
+        try:
+            conn = self._connection(); conn.execute("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?)", (*self.file_key(filepath), shapely.to_wkb(GeometryCollection(list(polygons)))))
+            conn.commit()
+        except (OSError, sqlite3.Error): pass
+    def close(self):
+        if self._conn is not None: self._conn.close(); self._conn = None
+
+def iter_dxf_imports(filepaths: Sequence[str], cache: Optional[DxfImportCache] = None, max_workers: Optional[int] = None,
+                     should_stop: Callable[[], bool] = lambda: False) -> Iterator[Tuple[str, List[Tuple[str, Polygon]], Optional[str]]]:
+    """Yields (filepath, [(name, polygon)], error) per file as soon as it is ready.
+
+    Cached files come first; the rest are parsed in parallel in a process pool and yielded in
+    completion order. A file that fails yields an error message and no parts.
+    """
+    pending = []
+    for filepath in filepaths:
+        polygons = cache.get(filepath) if cache else None
+        if polygons is None: pending.append(filepath)
+        else: yield filepath, part_names(filepath, polygons), None
+    if not pending: return
+    with concurrent.futures.ProcessPoolExecutor(max_workers=min(len(pending), max_workers or os.cpu_count() or 1)) as executor:
+        futures = {executor.submit(read_dxf_polygons, filepath): filepath for filepath in pending}
+        for future in concurrent.futures.as_completed(futures):
+            if should_stop():
+                for other in futures: other.cancel()
+                return
+            filepath = futures[future]
+            try: polygons = future.result()
+            except Exception as e: yield filepath, [], str(e) or type(e).__name__; continue
+            if cache: cache.put(filepath, polygons)
+            yield filepath, part_names(filepath, polygons), None
+
+def _add_polygon(msp, polygon: Polygon, layer: str, offset: Tuple[float, float] = (0.0, 0.0)):
+    for ring in [polygon.exterior, *polygon.interiors]:
+        points = shapely.get_coordinates(ring)[:-1]
+        if offset != (0.0, 0.0): points = points + offset
+        msp.add_lwpolyline(points.tolist(), close=True, dxfattribs={'layer': layer})
+
+def _polygons(geometry) -> List[Polygon]: return list(getattr(geometry, 'geoms', [geometry]))
+
+class _PartBlocks:
+    """Block definitions of one DXF document: placed copies of a part become INSERTs of one shared block.
+
+    A block holds the part's outline as GeneticAlgorithmNester placed it (Part.geometry, already
+    rotated). Other rotations of the same part (same id and source file) reuse that block with an
+    INSERT rotation when rotating the block outline reproduces them exactly; otherwise they get
+    a block of their own.
+    """
+    def __init__(self, doc):
+        self.doc = doc; self._parts = {}; self._variants = {}  # (id, source_file) -> (block, geometry, rotation); id(geometry) -> (block, angle, offset)
+    def _new_block(self, name: str, geometry) -> str:
+        base = re.sub(r'[^A-Za-z0-9_-]', '_', name) or 'PART'; block_name = base; n = 1
+        while block_name in self.doc.blocks: n += 1; block_name = f"{base}_{n}"
+        block = self.doc.blocks.new(name=block_name)
+        for polygon in _polygons(geometry): _add_polygon(block, polygon, 'PARTS')
+        return block_name
+    def _variant(self, part: 'Part'):
+        key = id(part.geometry)
+        if key in self._variants: return self._variants[key]
+        geometry = part.geometry; base = self._parts.get((part.id, part.source_file)); angle = 0.0; offset = (0.0, 0.0)
+        if base is not None:
+            block_name, base_geometry, base_rotation = base; angle = (part.rotation - base_rotation) % 360
+            # an INSERT rotates the block about its base point (the origin), then moves it
+            rotated = shapely_rotate(base_geometry, angle, origin=(0, 0)); offset = (geometry.bounds[0] - rotated.bounds[0], geometry.bounds[1] - rotated.bounds[1])
+            size = max(geometry.bounds[2] - geometry.bounds[0], geometry.bounds[3] - geometry.bounds[1], 1.0)
+            if not shapely.equals_exact(shapely_translate(rotated, *offset), geometry, tolerance=1e-9 * size): base = None
+        if base is None:
+            block_name = self._new_block(part.name, geometry); angle = 0.0; offset = (0.0, 0.0)
+            self._parts.setdefault((part.id, part.source_file), (block_name, geometry, part.rotation))
+        self._variants[key] = (block_name, angle, offset); return self._variants[key]
+    def add(self, msp, part: 'Part', origin: Tuple[float, float] = (0.0, 0.0)):
+        placed = part.placed_geometry
+        if part.geometry is None or part.geometry is placed:  # no unplaced outline to share
+            for polygon in _polygons(placed): _add_polygon(msp, polygon, 'PARTS', origin)
+            return
+        block_name, angle, offset = self._variant(part)
+        dx = placed.bounds[0] - part.geometry.bounds[0] + offset[0] + origin[0]; dy = placed.bounds[1] - part.geometry.bounds[1] + offset[1] + origin[1]
+        msp.add_blockref(block_name, (dx, dy), dxfattribs={'layer': 'PARTS', 'rotation': angle})
+
+def _add_layout(doc, msp, blocks: Optional[_PartBlocks], width: float, height: float, parts: Sequence['Part'], origin: Tuple[float, float] = (0.0, 0.0)):
+    x, y = origin
+    msp.add_lwpolyline([(x, y), (x + width, y), (x + width, y + height), (x, y + height)], close=True, dxfattribs={'layer': 'SHEET'})
+    for part in parts:
+        if blocks: blocks.add(msp, part, origin)
+        else:
+            for polygon in _polygons(part.placed_geometry): _add_polygon(msp, polygon, 'PARTS', origin)
+
+def _new_document(dxfversion: str):
+    doc = ezdxf.new(dxfversion); doc.layers.add('SHEET', color=8); doc.layers.add('PARTS', color=3)
+    return doc
+
+def write_layout_dxf(filepath: str, width: float, height: float, parts: Sequence['Part'], use_blocks: bool = True, dxfversion: str = DXF_VERSION):
+    """Writes one sheet layout: the sheet outline on layer SHEET and every placed part on layer PARTS.
+
+    Parts are written in the given order, which is the cut order when they come from
+    GeneticAlgorithmNester.layouts() (parts nested in holes before their containers). With
+    use_blocks every part outline is defined once as a block and each copy is an INSERT, which keeps
+    large sheets small; without it every copy is written out as polylines.
+    """
+    doc = _new_document(dxfversion); msp = doc.modelspace()
+    _add_layout(doc, msp, _PartBlocks(doc) if use_blocks else None, width, height, parts)
+    doc.saveas(filepath)
+
+def write_layouts_dxf(filepath: str, layouts: Sequence[Tuple[float, float, Sequence['Part']]], single_file: bool = False,
+                      use_blocks: bool = True, dxfversion: str = DXF_VERSION) -> List[str]:
+    """Writes [(width, height, parts)] sheet layouts and returns the files written.
+
+    single_file puts the sheets side by side in one drawing, sharing one set of blocks; otherwise
+    each sheet goes to <stem>_sheet_NN.dxf next to `filepath` (a single sheet is written to
+    `filepath` itself).
+    """
+    if single_file or len(layouts) == 1:
+        doc = _new_document(dxfversion); msp = doc.modelspace(); blocks = _PartBlocks(doc) if use_blocks else None
+        gap = SHEET_GAP * max((width for width, _, _ in layouts), default=0.0); x = 0.0
+        for width, height, parts in layouts: _add_layout(doc, msp, blocks, width, height, parts, (x, 0.0)); x += width + gap
+        doc.saveas(filepath); return [filepath]
+    stem, extension = os.path.splitext(filepath); paths = []
+    for number, (width, height, parts) in enumerate(layouts, start=1):
+        path = f"{stem}_sheet_{number:02d}{extension or '.dxf'}"; write_layout_dxf(path, width, height, parts, use_blocks, dxfversion); paths.append(path)
+    return paths
@@ -0,0 +1,51 @@
+# =============================================================================
+#           HyperNesting v3.0 - evaluation_cache.py (ذاكرة نتائج التقييم والبادئات)
+# =============================================================================
+import hashlib
+from collections import OrderedDict
+from typing import List, Tuple, Optional
+
+import numpy as np
+
+class FitnessCache:
+    """Bounded LRU of chromosome -> fitness; elites and repeated children are never re-evaluated."""
+    def __init__(self, max_entries: int = 5000):
+        self.max_entries = max_entries; self._entries: "OrderedDict[bytes, float]" = OrderedDict(); self.hits = 0; self.misses = 0
+    def get(self, key: bytes) -> Optional[float]:
+        fitness = self._entries.get(key)
+        if fitness is None: self.misses += 1; return None
+        self._entries.move_to_end(key); self.hits += 1
+        return fitness
+    def put(self, key: bytes, fitness: float):
+        self._entries[key] = fitness; self._entries.move_to_end(key)
+        if len(self._entries) > self.max_entries: self._entries.popitem(last=False)
+
+class PrefixStateCache:
+    """Trie of partial layouts over variant-id sequences, with a node every `stride` genes.
+
+    Each node is stored under the digest of its whole path, which keeps lookups O(n) without
+    child maps; the nodes hold engine snapshots and are evicted LRU beyond `max_nodes`.
+    """
+    def __init__(self, stride: int = 8, max_nodes: int = 2000):
+        self.stride = max(1, stride); self.max_nodes = max_nodes; self._nodes: "OrderedDict[bytes, object]" = OrderedDict()
+        self.lookups = 0; self.reused_genes = 0
+    def path(self, variant_ids: np.ndarray) -> List[bytes]:
+        """Digests of every node on the path of this sequence (depths stride, 2*stride, ...)."""
+        hasher = hashlib.blake2b(digest_size=16); data = np.ascontiguousarray(variant_ids, dtype=np.int64); digests = []
+        for depth in range(self.stride, len(data) + 1, self.stride):
+            hasher.update(data[depth - self.stride:depth].tobytes()); digests.append(hasher.copy().digest())
+        return digests
+    def longest(self, path: List[bytes]) -> Tuple[int, object]:
+        """(depth, snapshot) of the deepest cached node on `path`, or (0, None)."""
+        self.lookups += 1
+        for level in range(len(path) - 1, -1, -1):
+            snapshot = self._nodes.get(path[level])
+            if snapshot is not None:
+                self._nodes.move_to_end(path[level]); depth = (level + 1) * self.stride; self.reused_genes += depth
+                return depth, snapshot
+        return 0, None
+    def store(self, path: List[bytes], depth: int, snapshot):
+        key = path[depth // self.stride - 1]
+        if key in self._nodes: self._nodes.move_to_end(key); return
+        self._nodes[key] = snapshot
+        if len(self._nodes) > self.max_nodes: self._nodes.popitem(last=False)
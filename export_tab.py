@@ -1,18 +1,28 @@
 # =============================================================================
 #           HyperNesting v3.0 - export_tab.py (النسخة النهائية)
 # =============================================================================
-import json
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QPushButton, QFrame, 
-                             QHBoxLayout, QLabel, QFileDialog)
-from PyQt6.QtCore import Qt, QSize
+                             QHBoxLayout, QLabel, QFileDialog, QMessageBox)
+from PyQt6.QtCore import Qt, QSize, QThread, pyqtSignal
 import qtawesome as qta
 
 from ui_components import DxfExportDialog, SummaryReportViewer, DetailedReportViewer
+from dxf_io import write_layouts_dxf
+
+class DxfExportWorker(QThread):
+    """Writes the sheet layouts off the GUI thread (see dxf_io.write_layouts_dxf)."""
+    finished = pyqtSignal(object, str)  # written paths, error message ('' on success)
+    def __init__(self, filepath, layouts, settings):
+        super().__init__(); self.filepath = filepath; self.layouts = layouts; self.settings = settings
+    def run(self):
+        try: paths = write_layouts_dxf(self.filepath, self.layouts, self.settings['single_file'], self.settings['use_blocks'], self.settings['dxf_version'])
+        except Exception as e: self.finished.emit([], str(e) or type(e).__name__); return
+        self.finished.emit(paths, "")
 
 class ExportTab(QWidget):
     def __init__(self, main_window):
         super().__init__()
-        self.main_window = main_window
+        self.main_window = main_window; self.export_worker = None
         main_layout = QVBoxLayout(self)
         main_layout.setContentsMargins(0, 5, 5, 5)
         toolbar = self.create_toolbar()
@@ -41,23 +51,38 @@ class ExportTab(QWidget):
         return button
 
     def open_dxf_export_dialog(self):
-        if not self.main_window.nesting_results: print("No nesting results to export."); return
-        dialog = DxfExportDialog(self)
-        if dialog.exec():
-            settings = dialog.get_settings(); print("--- DXF Export Settings ---\n", json.dumps(settings, indent=2))
-            file_path, _ = QFileDialog.getSaveFileName(self, "Save CAD Layout", "", "DXF Files (*.dxf)")
-            if file_path: print(f"File would be saved to: {file_path}")
+        results = self.main_window.nesting_results
+        if not results: QMessageBox.warning(self, "لا توجد نتائج", "لا توجد نتائج تعشيش للتصدير."); return
+        if self.export_worker and self.export_worker.isRunning(): QMessageBox.warning(self, "تصدير جارٍ", "الرجاء الانتظار حتى ينتهي التصدير الحالي."); return
+        dialog = DxfExportDialog(len(results), self)
+        if not dialog.exec(): return
+        settings = dialog.get_settings(); file_path, _ = QFileDialog.getSaveFileName(self, "Save CAD Layout", "", "DXF Files (*.dxf)")
+        if not file_path: return
+        # القطع تُجمع هنا في خيط الواجهة، والكتابة وحدها تتم في الخلفية
+        layouts = [(r['layout']['width'], r['layout']['height'], list(r['layout']['placed_parts_geometries'])) for r in results]
+        self.results_display.setText("Writing DXF...")
+        self.export_worker = DxfExportWorker(file_path, layouts, settings); self.export_worker.finished.connect(self.on_export_finished); self.export_worker.start()
+
+    def on_export_finished(self, paths, error):
+        if error: self.results_display.setText("DXF export failed."); QMessageBox.critical(self, "فشل", f"فشل تصدير DXF:\n{error}"); return
+        self.results_display.setText("Written:\n" + "\n".join(paths))
 
     def open_summary_report(self):
-        if not self.main_window.nesting_results: print("No nesting results for summary report."); return
-        mock_data = {"job_summary": { "nests": len(self.main_window.nesting_results) }, "sheet_requirements":, "parts_list":}
-        self.summary_report_viewer = SummaryReportViewer(mock_data, self); self.summary_report_viewer.show()
+        results = self.main_window.nesting_results
+        if not results: QMessageBox.information(self, "لا توجد نتائج", "لا توجد نتائج تعشيش لعرض التقرير."); return
+        sheets = []; counts = {}
+        for r in results:
+            layout = r['layout']; placed = layout.get('placed_parts_geometries', [])
+            sheets.append({'sheet': layout.get('name', ''), 'width': layout['width'], 'height': layout['height'], 'parts': len(placed), 'utilization': r.get('util', 0.0)})
+            for part in placed: counts[part.name] = counts.get(part.name, 0) + 1
+        job = {'nests': len(results), 'parts_placed': sum(s['parts'] for s in sheets), 'average_utilization': sum(s['utilization'] for s in sheets) / len(sheets)}
+        data = {"job_summary": job, "sheet_requirements": sheets, "parts_list": [{'name': name, 'quantity': n} for name, n in sorted(counts.items())]}
+        self.summary_report_viewer = SummaryReportViewer(data, self); self.summary_report_viewer.show()
 
     def open_detailed_report(self):
-        if not self.main_window.nesting_results: print("No nesting results for detailed report."); return
-        first_result = self.main_window.nesting_results
-        placed_parts_data =
-        if 'placed_parts_geometries' in first_result['layout']:
-            for part in first_result['layout']['placed_parts_geometries']: placed_parts_data.append({'name': part.name})
-        mock_data = {"header_summary": { "nest_no": "1 of X" }, "main_preview": first_result['layout'], "parts_list": placed_parts_data, "footer": {}}
-        self.detailed_report_viewer = DetailedReportViewer(mock_data, self); self.detailed_report_viewer.show()
+        results = self.main_window.nesting_results
+        if not results: QMessageBox.information(self, "لا توجد نتائج", "لا توجد نتائج تعشيش لعرض التقرير."); return
+        first_result = results[0]; layout = first_result['layout']
+        parts = [{'name': p.name, 'rotation': p.rotation, 'nested_in': p.nested_in or ''} for p in layout.get('placed_parts_geometries', [])]
+        data = {"header_summary": {"nest_no": f"1 of {len(results)}", "sheet": layout.get('name', ''), "utilization": first_result.get('util', 0.0)}, "main_preview": layout, "parts_list": parts, "footer": {}}
+        self.detailed_report_viewer = DetailedReportViewer(data, self); self.detailed_report_viewer.show()
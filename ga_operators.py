@@ -0,0 +1,27 @@
+# =============================================================================
+#           HyperNesting v3.0 - ga_operators.py (عمليات الخوارزمية الجينية على مصفوفات)
+# =============================================================================
+"""Chromosome operators on (n, 2) int32 arrays: column 0 is the placement order (pool indices),
+column 1 the rotation index of each gene. Genes move as whole rows, so rotations are inherited."""
+import numpy as np
+
+def random_chromosome(rng: np.random.Generator, n: int, allowed: np.ndarray) -> np.ndarray:
+    """Random order with a random allowed rotation index per gene."""
+    return np.ascontiguousarray(np.stack([rng.permutation(n), allowed[rng.integers(len(allowed), size=n)]], axis=1), dtype=np.int32)
+
+def order_crossover(p1: np.ndarray, p2: np.ndarray, start: int, stop: int) -> np.ndarray:
+    """OX: the child keeps p1's genes [start, stop) in place and fills the other positions with the
+    remaining genes in p2's order. O(n) with one membership mask instead of a per-gene search."""
+    segment = p1[start:stop]; taken = np.zeros(len(p1), dtype=bool); taken[segment[:, 0]] = True
+    rest = p2[~taken[p2[:, 0]]]
+    return np.concatenate([rest[:start], segment, rest[start:]])
+
+def swap_mutation(chromosome: np.ndarray, i: int, j: int) -> np.ndarray:
+    chromosome[[i, j]] = chromosome[[j, i]]; return chromosome
+
+def inversion_mutation(chromosome: np.ndarray, i: int, j: int) -> np.ndarray:
+    """Reverses the placement order of genes [i, j)."""
+    chromosome[i:j] = chromosome[i:j][::-1].copy(); return chromosome
+
+def rotation_mutation(chromosome: np.ndarray, i: int, rotation_index: int) -> np.ndarray:
+    chromosome[i, 1] = rotation_index; return chromosome
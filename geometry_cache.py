@@ -0,0 +1,96 @@
+# =============================================================================
+#           HyperNesting v3.0 - geometry_cache.py (ذاكرة تخزين هندسة أزواج القطع)
+# =============================================================================
+import hashlib
+import os
+import sqlite3
+import struct
+import time
+from typing import Optional
+
+import numpy as np
+import shapely
+from shapely.affinity import translate as shapely_translate
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".hypernesting", "pair_cache.sqlite")
+DEFAULT_CACHE_MAX_MB = 512
+KEY_PRECISION = 6  # decimals kept when hashing coordinates
+SIZE_RESYNC_SECONDS = 30.0  # how often the running size total is re-read, to pick up other processes' writes
+
+def geometry_key(geometry, rotation: float, spacing: float) -> bytes:
+    """Canonical digest of a part variant: translation-free, vertex-order-free geometry + rotation + spacing."""
+    minx, miny, _, _ = geometry.bounds
+    canonical = shapely.normalize(shapely_translate(geometry, xoff=-minx, yoff=-miny))
+    canonical = shapely.transform(canonical, lambda coords: np.round(coords, KEY_PRECISION) + 0.0)
+    digest = hashlib.blake2b(shapely.to_wkb(canonical), digest_size=16)
+    digest.update(struct.pack("<dd", float(rotation), float(spacing)))
+    return digest.digest()
+
+class PairGeometryCache:
+    """Size-capped on-disk LRU store for pairwise placement data (NFPs, pair collision results).
+
+    Entries are keyed by (kind, key_a, key_b) with keys from geometry_key(). Writes and LRU
+    touches are batched and committed by flush(); several worker processes may share one file.
+    The stored size is tracked as a running total, re-read from the file every
+    SIZE_RESYNC_SECONDS and before evicting.
+    """
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, max_mb: int = DEFAULT_CACHE_MAX_MB, batch_size: int = 64):
+        self.path = path; self.max_bytes = max_mb * 1024 * 1024; self.batch_size = batch_size
+        self.hits = 0; self.misses = 0; self._conn: Optional[sqlite3.Connection] = None; self._pending = 0
+        self._touched = {}; self._total: Optional[int] = None; self._synced = 0.0  # (kind, key_a, key_b) -> last_used; bytes stored; when _total was read
+    def __getstate__(self):
+        state = self.__dict__.copy(); state['_conn'] = None; state['_pending'] = 0; state['_touched'] = {}; state['_total'] = None
+        return state
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._conn = sqlite3.connect(self.path, timeout=30)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS pairs (kind TEXT, key_a BLOB, key_b BLOB, payload BLOB, size INTEGER, last_used REAL, PRIMARY KEY (kind, key_a, key_b))")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS pairs_lru ON pairs (last_used)")
+        return self._conn
+    def get(self, kind: str, key_a: bytes, key_b: bytes) -> Optional[bytes]:
+        try:
+            conn = self._connection()
+            row = conn.execute("SELECT payload FROM pairs WHERE kind=? AND key_a=? AND key_b=?", (kind, key_a, key_b)).fetchone()
+            if row is None: self.misses += 1; return None
+            self._touched[(kind, key_a, key_b)] = time.time(); self._touch()
+        except sqlite3.Error: self.misses += 1; return None
+        self.hits += 1
+        return row[0]
+    def put(self, kind: str, key_a: bytes, key_b: bytes, payload: bytes):
+        try:
+            self._connection().execute("INSERT OR REPLACE INTO pairs VALUES (?, ?, ?, ?, ?, ?)", (kind, key_a, key_b, payload, len(payload), time.time()))
+            if self._total is not None: self._total += len(payload)
+            self._touch()
+        except sqlite3.Error: pass
+    def _touch(self):
+        self._pending += 1
+        if self._pending >= self.batch_size: self.flush()
+    def _stored_bytes(self) -> int:
+        self._synced = time.monotonic(); return self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM pairs").fetchone()[0]
+    def flush(self):
+        """Commits pending writes and LRU touches and evicts least-recently-used entries above the size cap."""
+        if self._conn is None or not self._pending: return
+        try:
+            if self._touched:
+                self._conn.executemany("UPDATE pairs SET last_used=? WHERE kind=? AND key_a=? AND key_b=?", [(used, *key) for key, used in self._touched.items()])
+            # replaced rows and other processes make the running total drift, so it is re-read before evicting
+            if self._total is None or self._total > self.max_bytes or time.monotonic() - self._synced > SIZE_RESYNC_SECONDS: self._total = self._stored_bytes()
+            total = self._total
+            if total > self.max_bytes:
+                # evict down to 90% of the cap so eviction doesn't run on every flush
+                excess = total - int(self.max_bytes * 0.9); freed = 0; stale = []
+                for kind, key_a, key_b, size in self._conn.execute("SELECT kind, key_a, key_b, size FROM pairs ORDER BY last_used"):
+                    stale.append((kind, key_a, key_b)); freed += size
+                    if freed >= excess: break
+                self._conn.executemany("DELETE FROM pairs WHERE kind=? AND key_a=? AND key_b=?", stale); self._total -= freed
+            self._conn.commit()
+        except sqlite3.Error: pass
+        self._pending = 0; self._touched = {}
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {'hits': self.hits, 'misses': self.misses, 'hit_rate': self.hits / lookups if lookups else 0.0}
+    def close(self):
+        self.flush()
+        if self._conn is not None: self._conn.close(); self._conn = None
@@ -0,0 +1,86 @@
+# =============================================================================
+#           HyperNesting v3.0 - geometry_hash.py (بصمة هندسية قياسية لكشف التكرار)
+# =============================================================================
+import hashlib
+import struct
+
+import numpy as np
+import shapely
+from shapely.geometry import Polygon
+from shapely.geometry.polygon import orient
+
+DEFAULT_TOLERANCE = 1e-3  # drawing units; lengths closer than this hash alike
+ANGLE_TOLERANCE = 1e-4    # radians
+
+def _turns(points: np.ndarray):
+    edges = np.roll(points, -1, axis=0) - points; previous = np.roll(edges, 1, axis=0)
+    return edges, np.arctan2(previous[:, 0] * edges[:, 1] - previous[:, 1] * edges[:, 0], (previous * edges).sum(axis=1))
+
+def _ring_codes(coords: np.ndarray, tolerance: float):
+    """(turning vertices, (n, 2) int64 [quantized edge length, quantized turn angle] per vertex) of a closed ring.
+
+    The codes are intrinsic to the outline, so they do not change under translation or rotation.
+    Vertices that do not turn (collinear or repeated) are dropped first.
+    """
+    points = coords[:-1, :2]; edges = np.roll(points, -1, axis=0) - points
+    points = points[(edges != 0).any(axis=1)]; edges, turns = _turns(points)
+    keep = np.round(turns / ANGLE_TOLERANCE) != 0
+    if keep.sum() >= 3 and not keep.all(): points = points[keep]; edges, turns = _turns(points)
+    lengths = np.hypot(edges[:, 0], edges[:, 1])
+    return points, np.stack([np.round(lengths / tolerance), np.round(turns / ANGLE_TOLERANCE)], axis=1).astype(np.int64)
+
+def _least_rotation(keys: list) -> int:
+    """Start index of the lexicographically smallest cyclic shift (Booth's algorithm, O(n))."""
+    doubled = keys + keys; failure = [-1] * len(doubled); k = 0
+    for j in range(1, len(doubled)):
+        value = doubled[j]; i = failure[j - k - 1]
+        while i != -1 and value != doubled[k + i + 1]:
+            if value < doubled[k + i + 1]: k = j - i - 1
+            i = failure[i]
+        if value != doubled[k + i + 1]:
+            if value < doubled[k]: k = j
+            failure[j - k] = -1
+        else: failure[j - k] = i + 1
+    return k
+
+def _canonical_starts(codes: np.ndarray) -> list:
+    """Start indices of the smallest cyclic shift of `codes`; a symmetric outline has one per symmetry."""
+    if len(codes) == 0: return []
+    keys = (codes[:, 0] << 16) | (codes[:, 1] + 32768)  # one comparable int per vertex; turn codes fit in 16 bits
+    start = _least_rotation(keys.tolist()); period = next(p for p in range(1, len(codes) + 1) if len(codes) % p == 0 and np.array_equal(np.roll(keys, -p), keys))
+    return [(start + shift) % len(codes) for shift in range(0, len(codes), period)]
+
+def _canonical_codes(codes: np.ndarray, starts: list) -> bytes:
+    return np.roll(codes, -starts[0], axis=0).tobytes() if starts else b""
+
+def _ring_digest(coords: np.ndarray, tolerance: float) -> bytes:
+    _, codes = _ring_codes(coords, tolerance)
+    return hashlib.blake2b(_canonical_codes(codes, _canonical_starts(codes)), digest_size=16).digest()
+
+def _frame_coords(points: np.ndarray, start: int, positions: np.ndarray, tolerance: float) -> np.ndarray:
+    """`positions` in the frame of an outline's vertex `start` (origin there, x along its first edge), quantized."""
+    origin = points[start]; axis = points[(start + 1) % len(points)] - origin; axis = axis / np.hypot(*axis); relative = positions - origin
+    local = np.stack([relative @ axis, axis[0] * relative[:, 1] - axis[1] * relative[:, 0]], axis=1)
+    return np.round(local / tolerance).astype(np.int64)
+
+def geometry_fingerprint(geometry, tolerance: float = DEFAULT_TOLERANCE) -> bytes:
+    """16-byte digest of a polygon's shape, independent of position, rotation and start vertex.
+
+    The outline is described by its edge lengths and turn angles (quantized to `tolerance`), starting
+    at a canonical vertex. Holes and further polygons add their own outline digest plus their
+    centroid in the frame of the largest outline's canonical vertex and first edge; a symmetric
+    outline has several such frames and the smallest encoding wins. Mirror images hash differently,
+    since a flipped part is a different part to cut.
+    """
+    digest = hashlib.blake2b(digest_size=16); polygons = [orient(p) for p in sorted(shapely.get_parts(geometry), key=lambda p: -p.area)]  # CCW exterior, CW holes
+    if not polygons: return digest.digest()
+    points, codes = _ring_codes(np.asarray(polygons[0].exterior.coords), tolerance); starts = _canonical_starts(codes)
+    digest.update(struct.pack("<q", len(polygons))); digest.update(_canonical_codes(codes, starts))
+    rings = [(Polygon(p.exterior), 0) for p in polygons[1:]] + [(Polygon(ring), 1) for p in polygons for ring in p.interiors]
+    if not rings: return digest.digest()
+    ring_digests = [_ring_digest(np.asarray(ring.exterior.coords), tolerance) + struct.pack("<q", kind) for ring, kind in rings]
+    centroids = np.array([ring.centroid.coords[0] for ring, _ in rings])
+    # ترتيب الحلقات داخل كل إطار ثم أخذ أصغر ترميز يجعل البصمة مستقلة عن ترتيب الثقوب ونقطة البداية
+    encodings = [b"".join(sorted(d + c.tobytes() for d, c in zip(ring_digests, _frame_coords(points, start, centroids, tolerance)))) for start in starts]
+    digest.update(min(encodings))
+    return digest.digest()
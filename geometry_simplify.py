@@ -0,0 +1,31 @@
+# =============================================================================
+#           HyperNesting v3.0 - geometry_simplify.py (تبسيط الحواف للخارج قبل التعشيش)
+# =============================================================================
+import shapely
+from shapely.geometry import Polygon
+
+MAX_TOLERANCE_DOUBLINGS = 12
+
+def vertex_count(geometry) -> int:
+    return int(shapely.get_num_coordinates(geometry))
+
+def simplify_outward(geometry: Polygon, tolerance: float, max_vertices: int = 0) -> Polygon:
+    """Collision proxy with fewer vertices that always contains `geometry`.
+
+    The outline is first offset outward by half the tolerance and then simplified by slightly less
+    than that, so the simplified boundary can never cut back into the part and stays within
+    `tolerance` of it. If the result still has more than `max_vertices` (0 = no budget), the tolerance
+    is doubled until it fits. A part the proxy would not simplify is its own proxy.
+    """
+    if tolerance <= 0 and max_vertices <= 0: return geometry
+    if max_vertices > 0 and vertex_count(geometry) <= max_vertices: return geometry
+    tolerance = tolerance if tolerance > 0 else max(geometry.length, 1e-9) / max(max_vertices, 3) / 4
+    best = geometry
+    for _ in range(MAX_TOLERANCE_DOUBLINGS):
+        proxy = geometry.buffer(tolerance / 2, join_style=2).simplify(tolerance * 0.49, preserve_topology=True)
+        if proxy.geom_type == 'Polygon' and proxy.contains(geometry):
+            if vertex_count(proxy) < vertex_count(best): best = proxy
+            # a proxy that saves no vertices would only reserve extra material
+            if max_vertices <= 0 or vertex_count(proxy) <= max_vertices: return proxy if vertex_count(proxy) < vertex_count(geometry) else geometry
+        tolerance *= 2
+    return best
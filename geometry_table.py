@@ -0,0 +1,109 @@
+# =============================================================================
+#           HyperNesting v3.0 - geometry_table.py (جدول الهندسة المحسوبة مسبقاً)
+# =============================================================================
+from typing import List, Sequence, Tuple
+
+import numpy as np
+import shapely
+from shapely.affinity import rotate as shapely_rotate, translate as shapely_translate
+from shapely.geometry import Polygon
+
+from geometry_cache import geometry_key
+from geometry_simplify import simplify_outward, vertex_count
+
+class PartPool(Sequence):
+    """The GA part pool: every unique part once, and one int32 unique index per copy.
+
+    pool[i] is the shared Part of copy i, so quantities never become objects, and pickling a pool
+    for the worker processes sends each outline once plus an index array.
+    """
+    __slots__ = ('unique', 'indices')
+    def __init__(self, unique: Sequence['Part'], indices):
+        self.unique = list(unique); self.indices = np.ascontiguousarray(indices, dtype=np.int32)
+    @classmethod
+    def from_quantities(cls, unique: Sequence['Part'], quantities) -> 'PartPool':
+        return cls(unique, np.repeat(np.arange(len(unique)), np.asarray(quantities, dtype=np.int64)))
+    @classmethod
+    def from_parts(cls, parts: Sequence['Part']) -> 'PartPool':
+        """Pool of a list of Part copies; copies with the same id and geometry object share one unique entry."""
+        unique = []; unique_index = {}; indices = []
+        for part in parts:
+            key = (part.id, id(part.geometry))
+            if key not in unique_index: unique_index[key] = len(unique); unique.append(part)
+            indices.append(unique_index[key])
+        return cls(unique, indices)
+    def __len__(self) -> int: return len(self.indices)
+    def __getitem__(self, index):
+        if isinstance(index, slice): return [self.unique[i] for i in self.indices[index].tolist()]
+        return self.unique[self.indices[index]]
+    def __getstate__(self): return self.unique, self.indices
+    def __setstate__(self, state): self.unique, self.indices = state
+
+class GeometryTable:
+    """Rotated and buffered geometry for every (unique part, allowed rotation), built once per run.
+
+    Variant ids are flat: variant = unique_index * len(rotations) + rotation_index. Copies of a part
+    in the pool (see PartPool) share one unique entry, so quantities cost nothing.
+    With a simplify tolerance or vertex budget, collision tests use an outward-simplified proxy
+    (see geometry_simplify) while `geometry` keeps the full-resolution outline for display and export.
+    """
+    def __init__(self, parts_pool: Sequence['Part'], rotations: Sequence[float], spacing: float, simplify_tolerance: float = 0.0, max_vertices: int = 0):
+        self.rotations = list(rotations); self.spacing = spacing
+        pool = parts_pool if isinstance(parts_pool, PartPool) else PartPool.from_parts(parts_pool)
+        self.unique_parts: List['Part'] = pool.unique; self.pool_to_unique = pool.indices
+        self.geometry = [part.geometry if rotation == 0 else shapely_rotate(part.geometry, rotation, origin='centroid')
+                         for part in self.unique_parts for rotation in self.rotations]
+        # البديل المبسط يُحسب مرة لكل قطعة ويُدار حول نفس المركز الذي تدور حوله القطعة الأصلية
+        proxies = [simplify_outward(part.geometry, simplify_tolerance, max_vertices) for part in self.unique_parts]
+        self.collision = [proxy if rotation == 0 else shapely_rotate(proxy, rotation, origin=part.geometry.centroid)
+                          for part, proxy in zip(self.unique_parts, proxies) for rotation in self.rotations]
+        before = sum(vertex_count(part.geometry) for part in self.unique_parts); after = sum(vertex_count(proxy) for proxy in proxies)
+        self.simplify_stats = {'vertices_before': before, 'vertices_after': after, 'vertices_removed': before - after}
+        self.buffered = [g.buffer(spacing / 2, cap_style=3, join_style=2) for g in self.collision]
+        self.bounds = shapely.bounds(np.array(self.geometry, dtype=object)).reshape(-1, 4)
+        self.buffered_bounds = shapely.bounds(np.array(self.buffered, dtype=object)).reshape(-1, 4)
+        self.area = shapely.area(np.array(self.geometry, dtype=object)).reshape(-1)
+        # bounds of the cut-outs of every variant's collision geometry: free pockets other parts can nest in
+        self.hole_bounds = [[ring.bounds for polygon in shapely.get_parts(g) for ring in polygon.interiors] for g in self.collision]
+        self._keys: List[bytes] = [None] * len(self.geometry); self._hole_corners = {}
+    @classmethod
+    def from_parts(cls, parts: Sequence['Part'], spacing: float) -> 'GeometryTable':
+        """Table over already-rotated parts (one variant each), used by the plain place_parts() path."""
+        return cls(parts, [0], spacing)
+    def __len__(self): return len(self.geometry)
+    def variant_rotation(self, variant: int) -> float: return self.rotations[variant % len(self.rotations)]
+    def variant_part(self, variant: int) -> 'Part': return self.unique_parts[variant // len(self.rotations)]
+    def variant_key(self, variant: int) -> bytes:
+        """Pair-cache key of a variant's collision geometry (see geometry_cache.geometry_key), computed on first use."""
+        if self._keys[variant] is None: self._keys[variant] = geometry_key(self.collision[variant], self.variant_rotation(variant), self.spacing)
+        return self._keys[variant]
+    def hole_corners(self, container: int, variant: int, gap: float = 0.0) -> List[Tuple[float, float]]:
+        """Where the buffered bounding box of `variant` can go inside the holes of `container` (unmoved): lower-left corners, computed on first use.
+
+        The holes are those of the container's buffered proxy, so a part there keeps one spacing from
+        the cut-out. The points are the vertices of the region where all four box corners lie in the
+        hole, shrunk by `gap` so the box does not touch it; for a convex hole every such point fits.
+        """
+        key = (container, variant); corners = self._hole_corners.get(key)
+        if corners is None:
+            b = self.buffered_bounds[variant]; w, h = b[2] - b[0], b[3] - b[1]; corners = []
+            for polygon in shapely.get_parts(self.buffered[container]):
+                for ring in polygon.interiors:
+                    rb = ring.bounds
+                    if rb[2] - rb[0] <= w or rb[3] - rb[1] <= h: continue
+                    hole = Polygon(ring); fit = shapely.intersection_all([shapely_translate(hole, -x, -y) for x, y in ((0, 0), (w, 0), (0, h), (w, h))])
+                    if gap > 0: fit = fit.buffer(-gap, join_style=2)
+                    for part in shapely.get_parts(fit):
+                        if isinstance(part, Polygon) and not part.is_empty: corners.extend(map(tuple, shapely.get_coordinates(part.exterior)[:-1].tolist()))
+            self._hole_corners[key] = corners
+        return corners
+    def pool_variants(self, encoded: np.ndarray = None) -> np.ndarray:
+        """Variant ids for an (n, 2) [pool_index, rotation_index] array; defaults to the pool in order at rotation 0."""
+        if encoded is None: return self.pool_to_unique.astype(np.int64) * len(self.rotations)
+        return self.pool_to_unique[encoded[:, 0]].astype(np.int64) * len(self.rotations) + encoded[:, 1]
+    def materialize(self, parts: Sequence['Part'], variant_ids: np.ndarray, placements: List[Tuple[int, float, float, int]], unplaced: List[int]):
+        """Writes placed_geometry and sheet_index onto `parts` (aligned with variant_ids) and splits them into placed/unplaced."""
+        placed_parts = []
+        for seq, dx, dy, sheet in placements:
+            part = parts[seq]; part.placed_geometry = shapely_translate(self.geometry[variant_ids[seq]], xoff=dx, yoff=dy); part.sheet_index = sheet; placed_parts.append(part)
+        return placed_parts, [parts[seq] for seq in unplaced]
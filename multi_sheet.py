@@ -0,0 +1,70 @@
+# =============================================================================
+#           HyperNesting v3.0 - multi_sheet.py (التعشيش على عدة ألواح)
+# =============================================================================
+from typing import List, Dict
+
+import numpy as np
+
+from nesting_engine import PlacementEngine, PlacementState, SheetConfig, create_engine
+from geometry_cache import PairGeometryCache
+from geometry_table import GeometryTable
+
+def sheet_inventory(sheets_data: List[Dict], spacing: float, margin: float, raster_resolution: float = 0.0) -> List[SheetConfig]:
+    """Expands the Sheets tab rows into one SheetConfig per physical sheet, lowest priority number first."""
+    inventory = []
+    for sheet in sorted(sheets_data, key=lambda s: s.get('priority', 1)):
+        inventory.extend(SheetConfig(width=sheet['width'], height=sheet['height'], spacing=spacing, margin=margin, raster_resolution=raster_resolution) for _ in range(int(sheet['quantity'])))
+    return inventory
+
+class MultiSheetEngine(PlacementEngine):
+    """Places one variant sequence across an ordered sheet inventory in a single pass.
+
+    Each part goes to the first of the last `lookback` open sheets where the inner engine can place
+    it; otherwise the next unused sheet that can hold its bounding box is opened. The pass is
+    sequential, so the GA's prefix cache and one GA run cover the whole job, whatever its sheet count.
+    Placements carry the inventory index of their sheet.
+    """
+    def __init__(self, sheets: List[SheetConfig], engine_name: str = 'bbox', pair_cache: PairGeometryCache = None, lookback: int = 3):
+        super().__init__(sheets[0]); self.sheets = sheets; self.lookback = max(1, lookback); engines = {}; self.engines = []
+        for sheet in sheets:
+            key = (sheet.width, sheet.height, sheet.spacing, sheet.margin)
+            if key not in engines: engines[key] = create_engine(engine_name, sheet, pair_cache)
+            self.engines.append(engines[key])
+    @property
+    def unplaced_penalty(self) -> float:
+        return max(sheet.width * sheet.height for sheet in self.sheets)
+    def begin(self, table: GeometryTable, variant_ids: np.ndarray) -> PlacementState:
+        return PlacementState(extra=([], variant_ids))  # ([(inventory index, inner state)] in opening order, sequence)
+    def snapshot(self, state: PlacementState):
+        open_sheets = state.extra[0]
+        return (state, len(state.placements), len(state.unplaced), state.max_y, len(open_sheets), [self.engines[i].snapshot(inner) for i, inner in open_sheets])
+    def restore(self, snapshot) -> PlacementState:
+        state, n_placed, n_unplaced, max_y, n_open, inner = snapshot; open_sheets, variant_ids = state.extra
+        restored = [(i, self.engines[i].restore(token)) for (i, _), token in zip(open_sheets[:n_open], inner)]
+        return PlacementState(state.placements[:n_placed], state.unplaced[:n_unplaced], max_y, (restored, variant_ids))
+    def _try(self, state: PlacementState, entry, table: GeometryTable, seq: int, variant: int) -> bool:
+        index, inner = entry; count = len(inner.placements); self.engines[index].advance(inner, table, seq, variant)
+        if len(inner.placements) == count: return False
+        _, dx, dy, _ = inner.placements[-1]; state.placements.append((seq, dx, dy, index))
+        return True
+    def advance(self, state: PlacementState, table: GeometryTable, seq: int, variant: int):
+        open_sheets, variant_ids = state.extra
+        for entry in open_sheets[-self.lookback:]:
+            if self._try(state, entry, table, seq, variant): return
+        bounds = table.buffered_bounds[variant]; width, height = bounds[2] - bounds[0], bounds[3] - bounds[1]; used = {i for i, _ in open_sheets}
+        for index, sheet in enumerate(self.sheets):
+            if index in used or width > sheet.width - 2 * sheet.margin or height > sheet.height - 2 * sheet.margin: continue
+            # a sheet is only opened once the part is on it; an empty sheet would still be billed in full
+            entry = (index, self.engines[index].begin(table, variant_ids))
+            if self._try(state, entry, table, seq, variant): open_sheets.append(entry); return
+            break
+        state.unplaced.append(seq)
+    def result(self, state: PlacementState):
+        """Fitness = material consumed: full area of every sheet opened before the last, plus the used strip of the last."""
+        open_sheets = state.extra[0]; material = 0.0
+        for position, (index, inner) in enumerate(open_sheets):
+            sheet = self.sheets[index]
+            if position < len(open_sheets) - 1: material += sheet.width * sheet.height
+            else: material += sheet.width * (inner.max_y if inner.max_y is not None else 0.0)
+        for index, inner in open_sheets: self.engines[index].result(inner)  # lets inner engines flush their caches
+        return list(state.placements), list(state.unplaced), material
@@ -0,0 +1,267 @@
+# =============================================================================
+#           HyperNesting v3.0 - nesting_benchmark.py (قياس سرعة وجودة التعشيش)
+# =============================================================================
+"""Nesting benchmarks: seeded datasets run through every placement engine and GA configuration.
+
+Each case (dataset, engine, config) reports:
+
+    seconds_per_part, placement_seconds   one cold placement pass in pool order, best of --repeats
+    peak_memory_mb                        Python heap peak of that pass (tracemalloc; GEOS buffers not included)
+    evaluations_per_second                chromosome evaluations of a seeded GA run, worker processes included
+    placed, unplaced, sheets, utilization the GA's best layout; utilization = placed area / material consumed
+                                          (the used strip of a single sheet, or the used sheet area of an inventory)
+
+Synthetic datasets (rectangles, L-shapes, gears, plates with holes) are generated from the seed and
+--scale. The "*_like" datasets imitate the strip-packing instances of the literature (piece count,
+piece types, strip width 40, allowed rotations); they are synthetic stand-ins, not the published
+coordinates. Any nesting_cli job file can be benchmarked too (--job), e.g. a converted ESICUP instance.
+
+Results are written as JSON. With a baseline file (--save-baseline writes one) every run is compared
+against it and the exit status is 1 when a case got slower, used more memory or nested worse:
+
+    python nesting_benchmark.py --engines bbox nfp --save-baseline
+    python nesting_benchmark.py --engines bbox nfp          # after a change: compare
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import shapely
+from shapely.geometry import Point, Polygon, box
+
+from nesting_engine import Part, PartPool, SheetConfig, GAConfig, GeneticAlgorithmNester, NestingWorkerPool, PLACEMENT_ENGINES, benchmark_engines
+
+DEFAULT_RESULTS_PATH = "benchmark_results.json"; DEFAULT_BASELINE_PATH = "benchmark_baseline.json"
+TIME_TOLERANCE = 0.25     # relative slow-down (and memory growth) reported as a regression
+QUALITY_TOLERANCE = 0.1   # utilization percentage points lost before it counts as a regression
+MEMORY_SLACK_MB = 0.5     # memory growth below this is noise, whatever the ratio
+BENCHMARK_CONFIGS = {
+    'quick': {'population_size': 8, 'generations': 3},
+    'standard': {'population_size': 20, 'generations': 10},
+    'simplified': {'population_size': 20, 'generations': 10, 'max_vertices': 24},
+}
+
+@dataclass
+class BenchmarkDataset:
+    name: str; description: str; parts: PartPool; sheet_config: SheetConfig
+    sheets: Optional[List[SheetConfig]] = None  # sheet inventory; None = one sheet (a strip for the literature instances)
+    ga: Dict = field(default_factory=dict)      # GAConfig fields the instance prescribes, e.g. allowed_rotations
+
+# --- synthetic part generators: every shape sits at the origin ---
+
+def rectangles(rng: np.random.Generator, count: int, size: Tuple[float, float] = (20, 120)) -> List[Polygon]:
+    return [box(0, 0, *rng.uniform(*size, 2).round(1)) for _ in range(count)]
+
+def l_shapes(rng: np.random.Generator, count: int, size: Tuple[float, float] = (40, 160)) -> List[Polygon]:
+    shapes = []
+    for _ in range(count):
+        w, h = rng.uniform(*size, 2).round(1); t = round(float(min(w, h) * rng.uniform(0.25, 0.5)), 1)
+        shapes.append(Polygon([(0, 0), (w, 0), (w, t), (t, t), (t, h), (0, h)]))
+    return shapes
+
+def gears(rng: np.random.Generator, count: int, radius: Tuple[float, float] = (20, 60), teeth: Tuple[int, int] = (8, 24)) -> List[Polygon]:
+    """Spur-gear outlines (trapezoid teeth) with a bore hole: many vertices per part."""
+    shapes = []
+    for _ in range(count):
+        r = float(rng.uniform(*radius)); n = int(rng.integers(teeth[0], teeth[1] + 1)); root = r * 0.85; step = 2 * np.pi / n
+        angles = (np.arange(n)[:, None] * step + np.array([0.0, 0.2, 0.5, 0.7]) * step).ravel(); radii = np.tile([root, r, r, root], n)
+        shell = np.stack([radii * np.cos(angles), radii * np.sin(angles)], axis=1) + r
+        shapes.append(Polygon(shell, [Point(r, r).buffer(r * 0.25, quad_segs=4).exterior.coords]))
+    return shapes
+
+def holed_plates(rng: np.random.Generator, count: int, size: Tuple[float, float] = (150, 300)) -> List[Polygon]:
+    """Plates with 1-3 rectangular or round cut-outs that smaller parts can nest in."""
+    shapes = []
+    for _ in range(count):
+        w, h = rng.uniform(*size, 2).round(1); cells = int(rng.integers(1, 4)); cell_w = w / cells; holes = []
+        for k in range(cells):
+            hw, hh = cell_w * rng.uniform(0.5, 0.8), h * rng.uniform(0.5, 0.8); cx, cy = cell_w * (k + 0.5), h / 2
+            hole = Point(cx, cy).buffer(min(hw, hh) / 2, quad_segs=8) if rng.random() < 0.3 else box(cx - hw / 2, cy - hh / 2, cx + hw / 2, cy + hh / 2)
+            holes.append(hole.exterior.coords)
+        shapes.append(Polygon(box(0, 0, w, h).exterior.coords, holes))
+    return shapes
+
+def _pool(prefix: str, geometries: Sequence, quantities: Sequence[int]) -> PartPool:
+    unique = [Part(id=f"{prefix}_{i + 1}", name=f"{prefix}_{i + 1}", geometry=g, source_file='') for i, g in enumerate(geometries)]
+    return PartPool.from_quantities(unique, quantities)
+
+def _stock(width: float, height: float, count: int, spacing: float = 2.0, margin: float = 5.0) -> List[SheetConfig]:
+    return [SheetConfig(width=width, height=height, spacing=spacing, margin=margin) for _ in range(count)]
+
+def _strip(pool: PartPool, width: float = 40.0, kerf: float = 0.1) -> SheetConfig:
+    """A strip of the given width, long enough for every piece stacked one above the other.
+
+    The instances of the literature have no spacing, but the engines treat touching parts as
+    overlapping, so pieces keep a small kerf.
+    """
+    bounds = shapely.bounds(np.array([part.geometry for part in pool.unique], dtype=object))[pool.indices]
+    return SheetConfig(width=width, height=float(np.max(bounds[:, 2:] - bounds[:, :2], axis=1).sum()) + kerf * len(pool), spacing=kerf, margin=0.0)
+
+def _scaled(count: int, scale: float) -> int: return max(1, int(round(count * scale)))
+
+# --- datasets: builder(seed, scale) -> BenchmarkDataset ---
+
+def rectangles_dataset(seed: int, scale: float = 1.0) -> BenchmarkDataset:
+    rng = np.random.default_rng(seed); n = _scaled(40, scale); parts = _pool("rect", rectangles(rng, n), rng.integers(1, 5, n))
+    return BenchmarkDataset('rectangles', f"{len(parts)} rectangles ({n} unique) on 1000x500 stock", parts, _stock(1000, 500, 1)[0], _stock(1000, 500, len(parts)))
+
+def l_shapes_dataset(seed: int, scale: float = 1.0) -> BenchmarkDataset:
+    rng = np.random.default_rng(seed); n = _scaled(20, scale); parts = _pool("l", l_shapes(rng, n), rng.integers(1, 4, n))
+    return BenchmarkDataset('l_shapes', f"{len(parts)} L-shapes ({n} unique) on 1000x500 stock", parts, _stock(1000, 500, 1)[0], _stock(1000, 500, len(parts)))
+
+def gears_dataset(seed: int, scale: float = 1.0) -> BenchmarkDataset:
+    rng = np.random.default_rng(seed); n = _scaled(10, scale); parts = _pool("gear", gears(rng, n), rng.integers(1, 4, n))
+    return BenchmarkDataset('gears', f"{len(parts)} gears ({n} unique, {sum(len(p.geometry.exterior.coords) for p in parts.unique) // n} vertices each on average) on 600x400 stock",
+                            parts, _stock(600, 400, 1)[0], _stock(600, 400, len(parts)))
+
+def holes_dataset(seed: int, scale: float = 1.0) -> BenchmarkDataset:
+    rng = np.random.default_rng(seed); n = _scaled(6, scale); m = _scaled(12, scale)
+    plates = holed_plates(rng, n); fillers = rectangles(rng, m, (15, 60))
+    parts = PartPool.from_quantities([*_pool("plate", plates, [1] * n).unique, *_pool("filler", fillers, [1] * m).unique], [*rng.integers(1, 3, n), *rng.integers(1, 5, m)])
+    return BenchmarkDataset('holes', f"{n} plates with cut-outs and {m} filler parts ({len(parts)} in total) on 1000x500 stock", parts, _stock(1000, 500, 1)[0], _stock(1000, 500, len(parts)))
+
+def jakobs_like_dataset(seed: int, scale: float = 1.0) -> BenchmarkDataset:
+    """25 rectangles, L- and U-shapes on a strip of width 40, rotations in steps of 90 degrees (after JAKOBS1)."""
+    rng = np.random.default_rng(seed); n = _scaled(25, scale); shapes = []
+    for kind in rng.integers(3, size=n).tolist():
+        w, h = rng.integers(4, 13, 2).tolist()
+        if kind == 0: shapes.append(box(0, 0, w, h))
+        elif kind == 1: shapes.append(l_shapes(rng, 1, (4, 13))[0])
+        else: t = max(1, w // 3); shapes.append(Polygon([(0, 0), (w, 0), (w, h), (w - t, h), (w - t, t), (t, t), (t, h), (0, h)]))
+    parts = _pool("jakobs", shapes, [1] * n)
+    return BenchmarkDataset('jakobs_like', f"{n} pieces (rectangles, L, U) on a strip of width 40", parts, _strip(parts), ga={'allowed_rotations': [0, 90, 180, 270]})
+
+def shapes_like_dataset(seed: int, scale: float = 1.0) -> BenchmarkDataset:
+    """43 copies of 4 fixed piece types on a strip of width 40, no rotation (after SHAPES0)."""
+    types = [Polygon([(0, 0), (8, 0), (8, 8), (0, 8)]), Polygon([(0, 0), (10, 0), (10, 4), (4, 4), (4, 10), (0, 10)]),
+             Polygon([(4, 0), (8, 0), (8, 4), (12, 4), (12, 8), (8, 8), (8, 12), (4, 12), (4, 8), (0, 8), (0, 4), (4, 4)]), Polygon([(0, 0), (12, 0), (6, 9)])]
+    parts = _pool("shapes", types, [_scaled(q, scale) for q in (12, 11, 10, 10)])
+    return BenchmarkDataset('shapes_like', f"{len(parts)} pieces of 4 types on a strip of width 40", parts, _strip(parts), ga={'allowed_rotations': [0]})
+
+def shirts_like_dataset(seed: int, scale: float = 1.0) -> BenchmarkDataset:
+    """99 copies of 8 small convex piece types on a strip of width 40, rotations 0 and 180 (after SHIRTS)."""
+    rng = np.random.default_rng(seed); types = []
+    for _ in range(8):
+        angles = np.sort(rng.uniform(0, 2 * np.pi, int(rng.integers(4, 9)))); r = rng.uniform(2, 5)
+        types.append(Polygon(np.stack([r * np.cos(angles), r * np.sin(angles)], axis=1) + r).convex_hull)
+    parts = _pool("shirts", types, [_scaled(q, scale) for q in (15, 15, 14, 14, 12, 12, 9, 8)])
+    return BenchmarkDataset('shirts_like', f"{len(parts)} pieces of 8 types on a strip of width 40", parts, _strip(parts), ga={'allowed_rotations': [0, 180]})
+
+def dighe_like_dataset(seed: int, scale: float = 1.0) -> BenchmarkDataset:
+    """A 100x100 square cut into 16 rectangles by random guillotine cuts, no rotation: the optimum is 100% (after DIGHE1)."""
+    rng = np.random.default_rng(seed); pieces = [(0.0, 0.0, 100.0, 100.0)]
+    while len(pieces) < _scaled(16, scale):
+        x0, y0, x1, y1 = pieces.pop(int(np.argmax([(p[2] - p[0]) * (p[3] - p[1]) for p in pieces])))
+        if x1 - x0 >= y1 - y0: cut = round(float(rng.uniform(x0 + (x1 - x0) * 0.3, x1 - (x1 - x0) * 0.3))); pieces += [(x0, y0, cut, y1), (cut, y0, x1, y1)]
+        else: cut = round(float(rng.uniform(y0 + (y1 - y0) * 0.3, y1 - (y1 - y0) * 0.3))); pieces += [(x0, y0, x1, cut), (x0, cut, x1, y1)]
+    parts = _pool("dighe", [box(0, 0, x1 - x0, y1 - y0) for x0, y0, x1, y1 in pieces], [1] * len(pieces))
+    return BenchmarkDataset('dighe_like', f"{len(parts)} guillotine pieces of a 100x100 square on a strip of width 100", parts, _strip(parts, 100.0), ga={'allowed_rotations': [0]})
+
+DATASETS: Dict[str, Callable[[int, float], BenchmarkDataset]] = {
+    'rectangles': rectangles_dataset, 'l_shapes': l_shapes_dataset, 'gears': gears_dataset, 'holes': holes_dataset,
+    'jakobs_like': jakobs_like_dataset, 'shapes_like': shapes_like_dataset, 'shirts_like': shirts_like_dataset, 'dighe_like': dighe_like_dataset,
+}
+
+def job_dataset(path: str) -> BenchmarkDataset:
+    """A nesting_cli job file as a dataset; its "ga" fields other than the benchmark config's still apply."""
+    from nesting_cli import load_job, job_parts, job_sheets
+    job = load_job(path); sheet_config, sheets = job_sheets(job); parts = job_parts(job)
+    return BenchmarkDataset(job['name'], f"job file {path}", parts, sheet_config, sheets, dict(job.get('ga', {})))
+
+# --- runners ---
+
+def run_case(dataset: BenchmarkDataset, engine: str, config: str, seed: int, worker_pool: NestingWorkerPool = None, repeats: int = 3) -> Dict:
+    """Benchmarks one (dataset, engine, config): a timed and a traced placement pass, then a seeded GA run."""
+    parts = dataset.parts; pass_stats = benchmark_engines(parts, dataset.sheet_config, (engine,), repeats, dataset.sheets)[engine]
+    tracemalloc.start()
+    try: benchmark_engines(parts, dataset.sheet_config, (engine,), 1, dataset.sheets); peak = tracemalloc.get_traced_memory()[1]
+    finally: tracemalloc.stop()
+    ga_config = GAConfig(**{**dataset.ga, **BENCHMARK_CONFIGS[config], 'engine': engine, 'seed': seed, 'pair_cache_path': None})
+    nester = GeneticAlgorithmNester(parts, dataset.sheet_config, ga_config, worker_pool, dataset.sheets); start = time.perf_counter()
+    placed, unplaced, fitness = nester.run(lambda percent: None, lambda: False); ga_seconds = time.perf_counter() - start
+    evaluations = sum(s['evaluations'] for s in nester.generation_stats); evaluation_seconds = sum(s['seconds'] for s in nester.generation_stats)
+    material = fitness if dataset.sheets else dataset.sheet_config.width * fitness
+    return {'dataset': dataset.name, 'engine': engine, 'config': config, 'seed': seed,
+            'parts': len(parts), 'unique_parts': len(parts.unique), 'vertices': int(sum(shapely.get_num_coordinates(p.geometry) for p in parts)),
+            'placement_seconds': pass_stats['seconds'], 'seconds_per_part': pass_stats['seconds_per_part'], 'peak_memory_mb': peak / 2 ** 20,
+            'evaluations': evaluations, 'evaluations_per_second': evaluations / evaluation_seconds if evaluation_seconds > 0 else 0.0, 'ga_seconds': ga_seconds,
+            'placed': len(placed), 'unplaced': len(unplaced), 'sheets': len(nester.layouts(placed)), 'fitness': float(fitness),
+            'utilization': sum(p.geometry.area for p in placed) / material * 100 if material > 0 else 0.0}
+
+def run_benchmarks(datasets: Sequence[BenchmarkDataset], engines: Sequence[str], configs: Sequence[str], seed: int = 1, repeats: int = 3,
+                   max_workers: Optional[int] = None, log=print) -> Dict:
+    """Every (dataset, engine, config) case on one shared worker pool; returns {'meta', 'results'}."""
+    worker_pool = NestingWorkerPool(max_workers); results = []
+    try:
+        for dataset in datasets:
+            log(f"{dataset.name}: {dataset.description}")
+            for engine in engines:
+                for config in configs:
+                    result = run_case(dataset, engine, config, seed, worker_pool, repeats); results.append(result); log("  " + format_result(result))
+    finally: worker_pool.shutdown()
+    meta = {'created': time.strftime('%Y-%m-%dT%H:%M:%S'), 'python': platform.python_version(), 'platform': platform.platform(), 'cpus': os.cpu_count(),
+            'numpy': np.__version__, 'shapely': shapely.__version__, 'workers': max_workers, 'repeats': repeats}
+    return {'meta': meta, 'results': results}
+
+def format_result(r: Dict) -> str:
+    return (f"{r['engine']:<6} {r['config']:<10} {r['seconds_per_part'] * 1000:8.2f} ms/part {r['evaluations_per_second']:8.1f} evals/s {r['peak_memory_mb']:7.2f} MB"
+            f"  {r['placed']}/{r['parts']} placed on {r['sheets']} sheet(s), {r['utilization']:.1f}% utilization")
+
+def case_key(r: Dict) -> Tuple: return (r['dataset'], r['engine'], r['config'], r['seed'], r['parts'])
+
+def compare_results(results: Dict, baseline: Dict, tolerance: float = TIME_TOLERANCE, quality_tolerance: float = QUALITY_TOLERANCE) -> List[str]:
+    """Regressions of `results` against `baseline`, one message each; cases missing from either side are skipped."""
+    previous = {case_key(r): r for r in baseline['results']}; regressions = []
+    for r in results['results']:
+        old = previous.get(case_key(r))
+        if old is None: continue
+        name = f"{r['dataset']}/{r['engine']}/{r['config']}"
+        if r['seconds_per_part'] > old['seconds_per_part'] * (1 + tolerance): regressions.append(f"{name}: placement {old['seconds_per_part'] * 1000:.2f} -> {r['seconds_per_part'] * 1000:.2f} ms/part")
+        if r['evaluations_per_second'] < old['evaluations_per_second'] / (1 + tolerance): regressions.append(f"{name}: {old['evaluations_per_second']:.1f} -> {r['evaluations_per_second']:.1f} evals/s")
+        if r['peak_memory_mb'] > old['peak_memory_mb'] * (1 + tolerance) + MEMORY_SLACK_MB: regressions.append(f"{name}: peak memory {old['peak_memory_mb']:.1f} -> {r['peak_memory_mb']:.1f} MB")
+        if r['placed'] < old['placed']: regressions.append(f"{name}: placed {old['placed']} -> {r['placed']} parts")
+        if r['sheets'] > old['sheets']: regressions.append(f"{name}: {old['sheets']} -> {r['sheets']} sheets")
+        if r['utilization'] < old['utilization'] - quality_tolerance: regressions.append(f"{name}: utilization {old['utilization']:.2f}% -> {r['utilization']:.2f}%")
+    return regressions
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="HyperNesting benchmarks")
+    parser.add_argument('--datasets', nargs='+', choices=list(DATASETS), default=list(DATASETS), help="built-in datasets (default: all)")
+    parser.add_argument('--job', action='append', default=[], metavar='JOB', help="also benchmark a nesting_cli job file (repeatable)")
+    parser.add_argument('--engines', nargs='+', choices=list(PLACEMENT_ENGINES), default=list(PLACEMENT_ENGINES), help="placement engines (default: all)")
+    parser.add_argument('--configs', nargs='+', choices=list(BENCHMARK_CONFIGS), default=['quick'], help="GA configurations (default: %(default)s)")
+    parser.add_argument('--seed', type=int, default=1, help="dataset and GA seed (default: %(default)s)")
+    parser.add_argument('--scale', type=float, default=1.0, help="multiplies the part counts of the built-in datasets (default: %(default)s)")
+    parser.add_argument('--repeats', type=int, default=3, help="timed placement passes per case, best one counts (default: %(default)s)")
+    parser.add_argument('-j', '--workers', type=int, default=None, help="GA worker processes (default: CPU count)")
+    parser.add_argument('-o', '--output', default=DEFAULT_RESULTS_PATH, help="results JSON (default: %(default)s)")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE_PATH, help="baseline JSON to compare against (default: %(default)s)")
+    parser.add_argument('--save-baseline', action='store_true', help="store these results as the baseline instead of comparing")
+    parser.add_argument('--tolerance', type=float, default=TIME_TOLERANCE, help="relative slow-down or memory growth allowed (default: %(default)s)")
+    parser.add_argument('--list', action='store_true', help="describe the built-in datasets and exit")
+    args = parser.parse_args(argv)
+    if args.list:
+        for name, build in DATASETS.items(): print(f"{name:<12} {build(args.seed, args.scale).description}")
+        return 0
+    datasets = [DATASETS[name](args.seed, args.scale) for name in args.datasets] + [job_dataset(path) for path in args.job]
+    results = run_benchmarks(datasets, args.engines, args.configs, args.seed, args.repeats, args.workers); results['meta'].update(seed=args.seed, scale=args.scale)
+    with open(args.output, 'w', encoding='utf-8') as f: json.dump(results, f, indent=2)
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f: json.dump(results, f, indent=2)
+        print(f"Baseline written to {args.baseline}"); return 0
+    if not os.path.exists(args.baseline): print(f"No baseline at {args.baseline}; run with --save-baseline to create one."); return 0
+    with open(args.baseline, encoding='utf-8') as f: baseline = json.load(f)
+    regressions = compare_results(results, baseline, args.tolerance)
+    for message in regressions: print(f"REGRESSION {message}", file=sys.stderr)
+    print(f"{len(regressions)} regression(s) against {args.baseline}")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,125 @@
+# =============================================================================
+#           HyperNesting v3.0 - nesting_cli.py (تشغيل التعشيش بدون واجهة رسومية)
+# =============================================================================
+"""Headless nesting: runs job files through GeneticAlgorithmNester without loading PyQt6.
+
+A job file is JSON:
+
+    {
+      "name": "job-42",                                   # optional, defaults to the file stem
+      "parts": [{"file": "bracket.dxf", "quantity": 4},    # every outline in the DXF, 4 of each
+                {"name": "plate", "wkt": "POLYGON ((0 0, 100 0, 100 50, 0 50, 0 0))", "quantity": 2}],
+      "sheet": {"width": 3000, "height": 1500},           # used when "sheets" is absent
+      "sheets": [{"name": "A", "width": 2500, "height": 1250, "quantity": 3, "priority": 1}],
+      "spacing": 5, "margin": 10, "raster_resolution": 0,  # raster engine cell size, 0 = automatic
+      "ga": {"population_size": 30, "generations": 20, "engine": "nfp"}   # any GAConfig field
+    }
+
+Relative DXF paths are resolved against the job file. Each job writes one DXF per used sheet and a
+summary.json into <output>/<job name>/; a batch also writes <output>/batch_summary.json.
+While a job runs it checkpoints to <output>/<job name>/checkpoint.hnrl ("checkpoint": false turns
+this off); --resume <checkpoint> continues an interrupted job and writes its results next to it.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from typing import List, Dict, Optional, Tuple
+
+from shapely import wkt as shapely_wkt
+
+from nesting_engine import Part, PartPool, SheetConfig, GAConfig, GeneticAlgorithmNester, NestingWorkerPool
+from checkpoint import checkpoint_config, checkpoint_nester
+from multi_sheet import sheet_inventory
+from dxf_io import DxfImportCache, dxf_parts, write_layout_dxf
+from geometry_hash import geometry_fingerprint
+
+def load_job(path: str) -> Dict:
+    with open(path, encoding='utf-8') as f: job = json.load(f)
+    job.setdefault('name', os.path.splitext(os.path.basename(path))[0]); job['base_dir'] = os.path.dirname(os.path.abspath(path))
+    return job
+
+def job_parts(job: Dict, import_cache: DxfImportCache = None) -> PartPool:
+    """The GA part pool of the job's part entries.
+
+    Outlines with the same fingerprint (duplicates up to translation and rotation) are pooled as
+    copies of the first one seen; a quantity only adds indices.
+    """
+    unique = []; indices = []; seen = {}
+    for entry in job['parts']:
+        quantity = int(entry.get('quantity', 1))
+        if 'wkt' in entry: outlines = [(entry.get('name', f"part_{len(indices)+1}"), shapely_wkt.loads(entry['wkt']))]
+        else: outlines = dxf_parts(os.path.join(job.get('base_dir', ''), entry['file']), import_cache)
+        for name, geometry in outlines:
+            fingerprint = geometry_fingerprint(geometry)
+            if fingerprint not in seen: seen[fingerprint] = len(unique); unique.append(Part(id=name, name=name, geometry=geometry, source_file=entry.get('file', '')))
+            indices.extend([seen[fingerprint]] * quantity)
+    return PartPool(unique, indices)
+
+def job_sheets(job: Dict) -> Tuple[SheetConfig, Optional[List[SheetConfig]]]:
+    """(sheet_config, sheet inventory or None) of a job."""
+    spacing = job.get('spacing', 5.0); margin = job.get('margin', 10.0); resolution = job.get('raster_resolution', 0.0)
+    sheets = sheet_inventory(job['sheets'], spacing, margin, resolution) if job.get('sheets') else None
+    return sheets[0] if sheets else SheetConfig(width=job['sheet']['width'], height=job['sheet']['height'], spacing=spacing, margin=margin, raster_resolution=resolution), sheets
+
+def run_job(job: Dict, output_dir: str, worker_pool: NestingWorkerPool = None, log=print, import_cache: DxfImportCache = None) -> Dict:
+    """Nests one job, writes its layouts and summary.json, and returns the summary."""
+    start = time.time(); parts = job_parts(job, import_cache); sheet_config, sheets = job_sheets(job)
+    ga_config = GAConfig(**job.get('ga', {}))
+    if job.get('checkpoint', True) and not ga_config.run_log_path: ga_config = checkpoint_config(ga_config, os.path.join(output_dir, job['name'], 'checkpoint.hnrl'))
+    nester = GeneticAlgorithmNester(parts, sheet_config, ga_config, worker_pool, sheets)
+    return write_results(job['name'], nester, nester.run(lambda percent: None, lambda: False, log), output_dir, start)
+
+def resume_job(path: str, output_dir: Optional[str] = None, worker_pool: NestingWorkerPool = None, log=print) -> Dict:
+    """Continues the job checkpointed in `path`; results go to the checkpoint's directory, or <output_dir>/<job name>/."""
+    start = time.time(); job_dir = os.path.dirname(os.path.abspath(path)); name = os.path.basename(job_dir)
+    nester = checkpoint_nester(path, worker_pool)
+    return write_results(name, nester, nester.run(lambda percent: None, lambda: False, log), output_dir or os.path.dirname(job_dir), start)
+
+def write_results(name: str, nester: GeneticAlgorithmNester, result, output_dir: str, start: float) -> Dict:
+    """Writes the layouts and summary.json of a finished run into <output_dir>/<name>/ and returns the summary."""
+    placed, unplaced, fitness = result; parts = nester.parts_pool; ga_config = nester.ga_config
+    job_dir = os.path.join(output_dir, name); os.makedirs(job_dir, exist_ok=True); sheet_summaries = []
+    for number, (sheet, sheet_parts) in enumerate(nester.layouts(placed), start=1):
+        filename = f"sheet_{number:02d}.dxf"; write_layout_dxf(os.path.join(job_dir, filename), sheet.width, sheet.height, sheet_parts)
+        sheet_area = sheet.width * sheet.height
+        sheet_summaries.append({'file': filename, 'width': sheet.width, 'height': sheet.height, 'parts': len(sheet_parts), 'nested': sum(p.nest_depth > 0 for p in sheet_parts),
+                                'utilization': sum(p.geometry.area for p in sheet_parts) / sheet_area * 100 if sheet_area > 0 else 0.0})
+    summary = {'name': name, 'engine': ga_config.engine, 'parts_total': len(parts), 'parts_placed': len(placed),
+               'unplaced': [p.name for p in unplaced], 'fitness': fitness, 'stop_reason': nester.stop_reason, 'seed': nester.seed, 'sheets': sheet_summaries,
+               'pair_cache': nester.cache_stats(), 'duration': time.time() - start}
+    with open(os.path.join(job_dir, 'summary.json'), 'w', encoding='utf-8') as f: json.dump(summary, f, indent=2)
+    return summary
+
+def run_batch(job_paths: List[str], output_dir: str, max_workers: Optional[int] = None, log=print, resume_paths: List[str] = ()) -> List[Dict]:
+    """Runs jobs (then resumes checkpoints) one after another on a shared worker pool; a failing job is recorded and the batch continues."""
+    worker_pool = NestingWorkerPool(max_workers); import_cache = DxfImportCache(); summaries = []
+    try:
+        for path, resume in [(p, False) for p in job_paths] + [(p, True) for p in resume_paths]:
+            try:
+                if resume: log(f"[{path}] resuming..."); summary = resume_job(path, None, worker_pool, log)
+                else: job = load_job(path); log(f"[{job['name']}] nesting..."); summary = run_job(job, output_dir, worker_pool, log, import_cache)
+            except Exception as e: summaries.append({'job': path, 'error': str(e)}); log(f"[{path}] failed: {e}"); continue
+            summaries.append(summary); log(f"[{summary['name']}] {summary['parts_placed']}/{summary['parts_total']} parts on {len(summary['sheets'])} sheet(s) in {summary['duration']:.1f}s")
+    finally: worker_pool.shutdown(); import_cache.close()
+    os.makedirs(output_dir, exist_ok=True)
+    with open(os.path.join(output_dir, 'batch_summary.json'), 'w', encoding='utf-8') as f: json.dump(summaries, f, indent=2)
+    return summaries
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="HyperNesting headless batch runner")
+    parser.add_argument('jobs', nargs='*', help="job JSON files")
+    parser.add_argument('--resume', action='append', default=[], metavar='CHECKPOINT', help="continue an interrupted job from its checkpoint.hnrl (repeatable)")
+    parser.add_argument('-o', '--output', default='nesting_output', help="output directory (default: %(default)s)")
+    parser.add_argument('-j', '--workers', type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument('-q', '--quiet', action='store_true', help="only print failures")
+    args = parser.parse_args(argv)
+    if not args.jobs and not args.resume: parser.error("nothing to do: give job files and/or --resume checkpoints")
+    summaries = run_batch(args.jobs, args.output, args.workers, (lambda message: None) if args.quiet else print, args.resume)
+    failed = [s for s in summaries if 'error' in s]
+    for s in failed: print(f"FAILED {s['job']}: {s['error']}", file=sys.stderr)
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
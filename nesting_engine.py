@@ -0,0 +1,654 @@
+# =============================================================================
+#           HyperNesting v3.0 - nesting_engine.py (محرك التعشيش)
+# =============================================================================
+import hashlib
+import random
+import time
+import concurrent.futures
+import multiprocessing
+from dataclasses import dataclass, field, replace, asdict
+from typing import List, Dict, Tuple, Optional, Sequence
+
+import numpy as np
+import shapely
+from shapely.geometry import Polygon, box
+from shapely.ops import unary_union
+from shapely.affinity import translate as shapely_translate
+
+from geometry_cache import PairGeometryCache, DEFAULT_CACHE_PATH, DEFAULT_CACHE_MAX_MB
+from geometry_table import GeometryTable, PartPool
+from evaluation_cache import FitnessCache, PrefixStateCache
+from ga_operators import random_chromosome, order_crossover, swap_mutation, inversion_mutation, rotation_mutation
+from run_log import RunLogWriter, load_run_log
+
+@dataclass(slots=True)
+class Part:
+    id: str; geometry: Polygon; name: str; source_file: str; quantity: int = 1; placed_geometry: Polygon = None; rotation: float = 0.0
+    sheet_index: int = 0  # index into the sheet inventory the part was placed on
+    nested_in: Optional[str] = None; nest_depth: int = 0  # name of the part whose hole holds this one, and how many holes deep it sits
+@dataclass
+class SheetConfig:
+    width: float; height: float; spacing: float; margin: float
+    raster_resolution: float = 0.0  # raster engine: drawing units per bitmap cell, 0 = automatic
+@dataclass
+class GAConfig:
+    # --- THIS LINE IS NOW CORRECTED ---
+    population_size: int = 30; generations: int = 20; mutation_rate: float = 0.1; crossover_rate: float = 0.8; allowed_rotations: List[int] = field(default_factory=lambda: [0, 90])
+    # ----------------------------------
+    engine: str = 'bbox'  # one of PLACEMENT_ENGINES
+    pair_cache_path: Optional[str] = DEFAULT_CACHE_PATH; pair_cache_max_mb: int = DEFAULT_CACHE_MAX_MB  # None disables the on-disk pair cache
+    fitness_cache_size: int = 5000; prefix_stride: int = 8; prefix_cache_nodes: int = 2000  # 0 disables either cache
+    open_sheet_lookback: int = 3  # multi-sheet jobs: how many recently opened sheets a part may still go to
+    # anytime mode: the run ends at whichever limit comes first; 0 disables a limit (generations=0 = no generation cap)
+    time_budget: float = 0.0; target_utilization: float = 0.0; stall_generations: int = 0  # seconds, percent of used sheet area, generations without improvement
+    simplify_tolerance: float = 0.0; max_vertices: int = 0  # outward-simplified collision proxies; 0 disables (drawing units, vertices per part)
+    simplification_report: bool = False  # time one full-resolution and one simplified evaluation before the run and log the speed-up
+    islands: int = 0; migration_interval: int = 5; migrants: int = 2  # island model: sub-populations evolved in the worker processes; 0 or 1 = one population
+    island_overrides: List[Dict] = field(default_factory=list)  # GAConfig fields per island, cycled, e.g. [{'mutation_rate': 0.3}, {'allowed_rotations': [0, 180]}]
+    seed: Optional[int] = None  # RNG seed; the same seed, job and config give the same run (without a time budget). None draws one per run
+    run_log_path: Optional[str] = None  # binary log of every generation (see run_log); None = no log
+    resume_log_path: Optional[str] = None; resume_generation: int = 0  # continue a logged run after this generation, 0 = its last complete one
+    run_log_keep: int = 0  # checkpoint use: every N generations the log is cut back to the latest generation; 0 keeps every generation
+CORNER_GAP = 1e-6  # an outline moved exactly onto an edge can land a rounding error past it, and touching counts as a collision
+class SpatialGrid:
+    """Uniform bucket grid over the placed (buffered) geometries; grows as parts are added."""
+    def __init__(self, cell_size: float):
+        self.cell_size = max(cell_size, 1e-6); self.cells: Dict[Tuple[int, int], List[int]] = {}; self.geometries = []; self.bounds = []
+    def _cells(self, bounds):
+        s = self.cell_size
+        return [(ix, iy) for ix in range(int(bounds[0] // s), int(bounds[2] // s) + 1) for iy in range(int(bounds[1] // s), int(bounds[3] // s) + 1)]
+    def insert(self, geometry):
+        shapely.prepare(geometry); index = len(self.geometries); self.geometries.append(geometry); self.bounds.append(geometry.bounds)
+        for cell in self._cells(geometry.bounds): self.cells.setdefault(cell, []).append(index)
+    def intersects(self, geometry) -> bool:
+        minx, miny, maxx, maxy = geometry.bounds; seen = set()
+        for cell in self._cells((minx, miny, maxx, maxy)):
+            for index in self.cells.get(cell, ()):
+                if index in seen: continue
+                seen.add(index); b = self.bounds[index]
+                if b[0] > maxx or b[2] < minx or b[1] > maxy or b[3] < miny: continue
+                if self.geometries[index].intersects(geometry): return True
+        return False
+    def prefix(self, n: int) -> 'SpatialGrid':
+        grid = SpatialGrid(self.cell_size)
+        for geometry in self.geometries[:n]: grid.insert(geometry)
+        return grid
+
+class UnionIndex:
+    """The unindexed reference for SpatialGrid: one running union of the placed (buffered) geometries."""
+    def __init__(self):
+        self.union = Polygon(); self.geometries = []
+    def insert(self, geometry):
+        self.geometries.append(geometry); self.union = unary_union([self.union, geometry])
+    def intersects(self, geometry) -> bool: return self.union.intersects(geometry)
+    def prefix(self, n: int) -> 'UnionIndex':
+        index = UnionIndex()
+        for geometry in self.geometries[:n]: index.insert(geometry)
+        return index
+
+class PlacementState:
+    """Placement progress over one variant sequence. Lists are append-only, so a snapshot is just their lengths."""
+    __slots__ = ('placements', 'unplaced', 'max_y', 'extra')
+    def __init__(self, placements=None, unplaced=None, max_y=None, extra=None):
+        self.placements: List[Tuple[int, float, float, int]] = placements if placements is not None else []; self.unplaced: List[int] = unplaced if unplaced is not None else []
+        self.max_y = max_y; self.extra = extra
+
+class PlacementEngine:
+    """Common driver: place_variants() = begin() + advance() per variant + result().
+
+    Engines implement begin/advance/restore; snapshot() is O(1) and restore() copies only the prefix,
+    which lets the GA resume placement from a cached prefix of a chromosome.
+    """
+    def __init__(self, sheet_config: SheetConfig):
+        self.sheet_config = sheet_config
+        self.sheet_boundary = box(self.sheet_config.margin, self.sheet_config.margin, self.sheet_config.width - self.sheet_config.margin, self.sheet_config.height - self.sheet_config.margin)
+    def place_parts(self, parts_to_place: List[Part]) -> Tuple[List[Part], List[Part], float]:
+        table = GeometryTable.from_parts(parts_to_place, self.sheet_config.spacing); variant_ids = table.pool_variants()
+        placements, unplaced, fitness = self.place_variants(table, variant_ids)
+        return (*table.materialize(parts_to_place, variant_ids, placements, unplaced), fitness)
+    @property
+    def unplaced_penalty(self) -> float:
+        """Fitness added per unplaced part; larger than any layout's own fitness."""
+        return self.sheet_config.width * self.sheet_config.height
+    def place_variants(self, table: GeometryTable, variant_ids: np.ndarray) -> Tuple[List[Tuple[int, float, float, int]], List[int], float]:
+        """Places a sequence of table variants; returns ([(sequence_index, dx, dy, sheet)], [unplaced sequence_index], fitness)."""
+        state = self.begin(table, variant_ids)
+        for seq, v in enumerate(variant_ids.tolist()): self.advance(state, table, seq, v)
+        return self.result(state)
+    def begin(self, table: GeometryTable, variant_ids: np.ndarray) -> PlacementState: raise NotImplementedError
+    def advance(self, state: PlacementState, table: GeometryTable, seq: int, variant: int): raise NotImplementedError
+    def restore(self, snapshot) -> PlacementState: raise NotImplementedError
+    def snapshot(self, state: PlacementState):
+        return (state, len(state.placements), len(state.unplaced), state.max_y)
+    def result(self, state: PlacementState) -> Tuple[List[Tuple[int, float, float, int]], List[int], float]:
+        fitness = state.max_y if state.max_y is not None else self.sheet_config.height
+        return list(state.placements), list(state.unplaced), fitness
+
+class NestingEngine(PlacementEngine):
+    """Bounding-box corner placement; use_spatial_index=False checks collisions against one union instead (same placements, slower)."""
+    def __init__(self, sheet_config: SheetConfig, use_spatial_index: bool = True):
+        super().__init__(sheet_config); self.use_spatial_index = use_spatial_index
+    def begin(self, table: GeometryTable, variant_ids: np.ndarray) -> PlacementState:
+        if not self.use_spatial_index: return PlacementState(extra=([], UnionIndex(), []))
+        # حجم الخلية = متوسط أكبر بُعد للقطع، بحيث يقع كل مرشح في عدد قليل من الخلايا
+        bb = table.buffered_bounds[variant_ids]; sizes = np.maximum(bb[:, 2] - bb[:, 0], bb[:, 3] - bb[:, 1]); sizes = sizes[np.isfinite(sizes)]
+        grid = SpatialGrid(float(sizes.mean()) if len(sizes) else max(self.sheet_config.width, self.sheet_config.height))
+        return PlacementState(extra=([], grid, []))  # (placed bounds, grid of buffered placed geometries, (variant, dx, dy) per placed part with holes, else None)
+    def restore(self, snapshot) -> PlacementState:
+        state, n_placed, n_unplaced, max_y = snapshot; placed_bounds, grid, placed_holes = state.extra
+        return PlacementState(state.placements[:n_placed], state.unplaced[:n_unplaced], max_y, (placed_bounds[:n_placed], grid.prefix(n_placed), placed_holes[:n_placed]))
+    def advance(self, state: PlacementState, table: GeometryTable, seq: int, v: int):
+        placed_bounds, grid, placed_holes = state.extra; margin = self.sheet_config.margin; sheet_bounds = self.sheet_boundary.bounds
+        best_pos = None; min_y, min_x = float('inf'), float('inf'); part_bounds = table.buffered_bounds[v].tolist(); part_with_spacing = table.buffered[v]
+        # placed_bounds are the buffered collision proxies, so a part at a corner sits one spacing from its neighbour;
+        # inside a placed part's holes the candidates trace the hole outline (see GeometryTable.hole_corners)
+        candidate_points = [(margin + CORNER_GAP, margin + CORNER_GAP)]
+        for pb in placed_bounds: candidate_points.extend([(pb[2] + CORNER_GAP, pb[1]), (pb[0], pb[3] + CORNER_GAP)])
+        for container, cx, cy in filter(None, placed_holes): candidate_points.extend((x + cx, y + cy) for x, y in table.hole_corners(container, v, CORNER_GAP))
+        for x, y in candidate_points:
+            if y > min_y or (y == min_y and x >= min_x): continue
+            if x + part_bounds[2] - part_bounds[0] > sheet_bounds[2] or y + part_bounds[3] - part_bounds[1] > sheet_bounds[3]: continue
+            candidate_geom = shapely_translate(part_with_spacing, xoff=x - part_bounds[0], yoff=y - part_bounds[1])
+            if self.sheet_boundary.contains(candidate_geom) and not grid.intersects(candidate_geom):
+                min_y, min_x = y, x; best_pos = (x - part_bounds[0], y - part_bounds[1])
+        if best_pos:
+            dx, dy = best_pos; state.placements.append((seq, dx, dy, 0))
+            placed_bounds.append((part_bounds[0] + dx, part_bounds[1] + dy, part_bounds[2] + dx, part_bounds[3] + dy)); grid.insert(shapely_translate(part_with_spacing, xoff=dx, yoff=dy))
+            placed_holes.append((v, dx, dy) if table.hole_bounds[v] else None)
+            state.max_y = part_bounds[3] + dy if state.max_y is None else max(state.max_y, part_bounds[3] + dy)
+        else: state.unplaced.append(seq)
+PLACEMENT_ENGINES = {'bbox': "Bounding-box corners", 'nfp': "No-fit polygon", 'raster': "Raster bitmap (large part counts)"}
+STOP_REASONS = {'generations': "generation limit reached", 'time_budget': "time budget used", 'target_utilization': "target utilization reached", 'stalled': "no further improvement", 'cancelled': "stopped by user"}
+def create_engine(name: str, sheet_config: SheetConfig, pair_cache: PairGeometryCache = None, sheets: Optional[List[SheetConfig]] = None, lookback: int = 3):
+    """Builds the placement engine selected in GAConfig.engine; all engines share place_parts().
+
+    The pair cache only goes to engines that do pairwise geometry work (the bbox engine has none).
+    With a sheet inventory the engine is wrapped in a MultiSheetEngine that fills the sheets in order.
+    """
+    if sheets:
+        from multi_sheet import MultiSheetEngine
+        return MultiSheetEngine(sheets, name, pair_cache, lookback)
+    if name == 'bbox': return NestingEngine(sheet_config)
+    if name == 'nfp':
+        from nfp_engine import NFPNestingEngine
+        return NFPNestingEngine(sheet_config, pair_cache)
+    if name == 'raster':
+        from raster_engine import RasterNestingEngine
+        return RasterNestingEngine(sheet_config)
+    raise ValueError(f"Unknown placement engine: {name}")
+
+def benchmark_engines(parts: Sequence[Part], sheet_config: SheetConfig, names: Tuple[str, ...] = tuple(PLACEMENT_ENGINES), repeats: int = 3,
+                      sheets: Optional[List[SheetConfig]] = None) -> Dict[str, Dict]:
+    """Places the same parts, in pool order, with each engine; best-of-`repeats` wall time plus layout quality.
+
+    Every repeat starts with cold caches. Utilization is the placed area over the material consumed:
+    the used strip of a single sheet, or the MultiSheetEngine fitness with a sheet inventory.
+    """
+    table = GeometryTable.from_parts(parts, sheet_config.spacing); variant_ids = table.pool_variants(); results = {}
+    for name in names:
+        timings = []
+        for _ in range(max(1, repeats)):
+            if name == 'nfp':
+                from nfp_engine import clear_nfp_cache
+                clear_nfp_cache()
+            engine = create_engine(name, sheet_config, None, sheets); start = time.perf_counter()
+            placements, unplaced, fitness = engine.place_variants(table, variant_ids); timings.append(time.perf_counter() - start)
+        placed_area = float(table.area[variant_ids[[seq for seq, _, _, _ in placements]]].sum()); material = fitness if sheets else sheet_config.width * fitness
+        results[name] = {'seconds': min(timings), 'seconds_per_part': min(timings) / max(1, len(variant_ids)), 'placed': len(placements), 'unplaced': len(unplaced),
+                         'sheets': len({sheet for _, _, _, sheet in placements}), 'fitness': float(fitness), 'utilization': placed_area / material * 100 if material > 0 else 0.0}
+    return results
+
+def assign_nesting(placed_parts: List[Part]) -> List[Part]:
+    """Marks parts placed inside a hole of another part and returns one sheet's parts in cut order.
+
+    A nested part is cut before its container, because the container's hole releases everything
+    inside it; within each depth the placement order is kept.
+    """
+    holes = []; owners = []
+    for index, part in enumerate(placed_parts):
+        part.nested_in = None; part.nest_depth = 0
+        for polygon in shapely.get_parts(part.placed_geometry):
+            for ring in polygon.interiors: holes.append(Polygon(ring)); owners.append(index)
+    if not holes: return list(placed_parts)
+    tree = shapely.STRtree(holes); parent = [-1] * len(placed_parts)
+    for index, part in enumerate(placed_parts):
+        inside = [h for h in tree.query(part.placed_geometry, predicate='within').tolist() if owners[h] != index]
+        if inside: parent[index] = owners[min(inside, key=lambda h: holes[h].area)]; part.nested_in = placed_parts[parent[index]].name
+    for index, part in enumerate(placed_parts):
+        ancestor = parent[index]
+        while ancestor >= 0 and part.nest_depth < len(placed_parts): part.nest_depth += 1; ancestor = parent[ancestor]
+    return sorted(placed_parts, key=lambda p: -p.nest_depth)
+
+def job_rotations(ga_config: GAConfig) -> List[float]:
+    """Every rotation any island may use, in table order; chromosomes index into this list."""
+    return list(dict.fromkeys([*ga_config.allowed_rotations, *(r for o in ga_config.island_overrides for r in o.get('allowed_rotations', []))]))
+
+class GeneticAlgorithmNester:
+    def __init__(self, parts_pool: Sequence[Part], sheet_config: SheetConfig, ga_config: GAConfig, worker_pool: 'NestingWorkerPool' = None, sheets: Optional[List[SheetConfig]] = None):
+        # a plain list of copies is pooled once here, so the table, the workers and the run log all see unique parts + indices
+        self.parts_pool = parts_pool if isinstance(parts_pool, PartPool) else PartPool.from_parts(parts_pool); self.sheet_config = sheet_config; self.ga_config = ga_config; self.worker_pool = worker_pool
+        self.sheets = list(sheets) if sheets else [sheet_config]; self.multi_sheet = bool(sheets)  # sheet inventory; placed parts carry an index into it
+        self.pair_cache = PairGeometryCache(ga_config.pair_cache_path, ga_config.pair_cache_max_mb) if ga_config.pair_cache_path else None
+        self.nesting_engine = create_engine(ga_config.engine, sheet_config, self.pair_cache, sheets, ga_config.open_sheet_lookback); self.cache_hits = 0; self.cache_misses = 0
+        self.rotations = job_rotations(ga_config)
+        self.table = GeometryTable(self.parts_pool, self.rotations, sheet_config.spacing, ga_config.simplify_tolerance, ga_config.max_vertices)
+        self.fitness_cache = FitnessCache(ga_config.fitness_cache_size) if ga_config.fitness_cache_size else None
+        self.prefix_cache = PrefixStateCache(ga_config.prefix_stride, ga_config.prefix_cache_nodes) if ga_config.prefix_cache_nodes else None
+        self.generation_stats: List[Dict] = []; self.best_utilization = 0.0; self.stop_reason: Optional[str] = None; self.seed: Optional[int] = None; self._run_log = None; self._log_base = None
+    def cache_stats(self) -> Dict:
+        lookups = self.cache_hits + self.cache_misses
+        return {'hits': self.cache_hits, 'misses': self.cache_misses, 'hit_rate': self.cache_hits / lookups if lookups else 0.0}
+    def allowed_rotation_indices(self, ga: GAConfig) -> np.ndarray:
+        """Indices into self.rotations of the rotations `ga` (the job's or an island's config) may use."""
+        return np.array([self.rotations.index(r) for r in ga.allowed_rotations], dtype=np.int32)
+    def _decode(self, encoded: np.ndarray, variant_ids: np.ndarray) -> List[Part]:
+        parts = []; unique = self.parts_pool.unique; indices = self.parts_pool.indices.tolist()
+        for (part_index, rotation_index), variant in zip(encoded.tolist(), variant_ids.tolist()):
+            original_part = unique[indices[part_index]]
+            parts.append(Part(id=original_part.id, geometry=self.table.geometry[variant], name=original_part.name, source_file=original_part.source_file, rotation=self.rotations[rotation_index]))
+        return parts
+    def _fitness_key(self, encoded: np.ndarray) -> bytes:
+        """Fitness-cache key of a chromosome: its variant sequence, so swapping two copies of a part is a hit."""
+        return self.table.pool_variants(encoded).tobytes()
+    def _evaluate_chromosome(self, encoded: np.ndarray):
+        """Fitness of one chromosome, resuming from the longest cached placement prefix when there is one."""
+        start = time.perf_counter(); variant_ids = self.table.pool_variants(encoded); engine = self.nesting_engine
+        before = (self.pair_cache.hits, self.pair_cache.misses) if self.pair_cache else (0, 0)
+        path = self.prefix_cache.path(variant_ids) if self.prefix_cache else []
+        depth, snapshot = self.prefix_cache.longest(path) if path else (0, None)
+        state = engine.restore(snapshot) if snapshot is not None else engine.begin(self.table, variant_ids)
+        for seq in range(depth, len(variant_ids)):
+            engine.advance(state, self.table, seq, int(variant_ids[seq]))
+            if path and (seq + 1) % self.prefix_cache.stride == 0: self.prefix_cache.store(path, seq + 1, engine.snapshot(state))
+        _placements, _unplaced, fitness = engine.result(state)
+        after = (self.pair_cache.hits, self.pair_cache.misses) if self.pair_cache else (0, 0)
+        info = {'cache_hits': after[0] - before[0], 'cache_misses': after[1] - before[1], 'reused_genes': depth, 'genes': len(variant_ids), 'seconds': time.perf_counter() - start}
+        return fitness + len(_unplaced) * engine.unplaced_penalty, info
+    def layouts(self, placed_parts: List[Part]) -> List[Tuple[SheetConfig, List[Part]]]:
+        """Groups placed parts into one (sheet, parts) layout per used sheet, in inventory order and cut order (see assign_nesting)."""
+        by_sheet: Dict[int, List[Part]] = {}
+        for part in placed_parts: by_sheet.setdefault(part.sheet_index, []).append(part)
+        return [(self.sheets[index], assign_nesting(by_sheet[index])) for index in sorted(by_sheet)]
+    def _place_with_stats(self, variant_ids: np.ndarray):
+        """place_variants() plus the pair-cache hits/misses it caused (counters live in whichever process ran it)."""
+        before = (self.pair_cache.hits, self.pair_cache.misses) if self.pair_cache else (0, 0)
+        placements, unplaced, fitness = self.nesting_engine.place_variants(self.table, variant_ids)
+        after = (self.pair_cache.hits, self.pair_cache.misses) if self.pair_cache else (0, 0)
+        return placements, unplaced, fitness, after[0] - before[0], after[1] - before[1]
+    def simplification_report(self) -> Optional[Dict]:
+        """Vertices removed by the collision proxies and the measured speed-up of one evaluation (pool order, cold caches)."""
+        ga = self.ga_config
+        if ga.simplify_tolerance <= 0 and ga.max_vertices <= 0: return None
+        full_table = GeometryTable(self.parts_pool, self.rotations, self.sheet_config.spacing); timings = []
+        for table in (full_table, self.table):
+            engine = create_engine(ga.engine, self.sheet_config, None, self.sheets if self.multi_sheet else None, ga.open_sheet_lookback)
+            if ga.engine == 'nfp':
+                from nfp_engine import clear_nfp_cache
+                clear_nfp_cache()
+            start = time.perf_counter(); engine.place_variants(table, table.pool_variants()); timings.append(time.perf_counter() - start)
+        return {**self.table.simplify_stats, 'full_seconds': timings[0], 'simplified_seconds': timings[1], 'speedup': timings[0] / timings[1] if timings[1] > 0 else 0.0}
+    def utilization(self, placed_parts: List[Part]) -> float:
+        """Placed part area as a percentage of the area of every sheet the layout uses."""
+        sheet_area = sum(sheet.width * sheet.height for sheet, _ in self.layouts(placed_parts))
+        return sum(p.geometry.area for p in placed_parts) / sheet_area * 100 if sheet_area > 0 else 0.0
+    def _materialize(self, chromosome: np.ndarray) -> Tuple[List[Part], List[Part], float]:
+        """Places a chromosome for real and returns (placed, unplaced, fitness) with fresh Part objects."""
+        variant_ids = self.table.pool_variants(chromosome)
+        placements, unplaced, fitness, hits, misses = self._place_with_stats(variant_ids); self.cache_hits += hits; self.cache_misses += misses
+        placed, unplaced = self.table.materialize(self._decode(chromosome, variant_ids), variant_ids, placements, unplaced)
+        return placed, unplaced, fitness
+    def island_config(self, island: int) -> GAConfig:
+        overrides = self.ga_config.island_overrides
+        return replace(self.ga_config, **overrides[island % len(overrides)]) if overrides else self.ga_config
+    def _generation_stats(self, gen: int, evaluated: List[Dict], fitness_hits: int, fitnesses: List[float], seconds: float, best_overall: float) -> Dict:
+        genes = sum(i['genes'] for i in evaluated); reused = sum(i['reused_genes'] for i in evaluated)
+        # the cost of placing gene k grows ~linearly with k, so a full run of n genes costs ~n² / (n² - d²) times a run resumed at depth d;
+        # a run resumed at its last gene placed nothing and saved as much as a fitness hit
+        partial = [i for i in evaluated if i['reused_genes'] < i['genes']]; hits = fitness_hits + len(evaluated) - len(partial)
+        full = [i['seconds'] * i['genes'] ** 2 / (i['genes'] ** 2 - i['reused_genes'] ** 2) for i in partial]
+        saved = max(0.0, sum(full) - sum(i['seconds'] for i in evaluated) + hits * (sum(full) / len(full) if full else 0.0))
+        return {'generation': gen + 1, 'evaluations': len(evaluated), 'fitness_cache_hits': fitness_hits,
+                'prefix_reuse': reused / genes if genes else 0.0, 'seconds_saved': saved,
+                'best_fitness': fitnesses[0], 'mean_fitness': sum(fitnesses) / len(fitnesses), 'worst_fitness': fitnesses[-1], 'best_overall': best_overall,
+                'evaluations_per_second': len(evaluated) / seconds if seconds > 0 else 0.0, 'seconds': seconds}
+    def _record_generation(self, stats: Dict, log_callback) -> Dict:
+        self.generation_stats.append(stats)
+        if log_callback: log_callback(f"Generation {stats['generation']}: {stats['fitness_cache_hits']} fitness-cache hits, {stats['evaluations']} evaluated, {stats['prefix_reuse']:.0%} of genes resumed from cached prefixes, ~{stats['seconds_saved']:.2f}s saved.")
+        return stats
+    def _should_end(self, gen: int, elapsed: float, last_generation: float, stalled: int) -> Optional[str]:
+        """Why the run should not start another generation, or None to keep going."""
+        ga = self.ga_config
+        if ga.generations > 0 and gen >= ga.generations: return 'generations'
+        if ga.time_budget > 0 and gen > 0 and elapsed + last_generation > ga.time_budget: return 'time_budget'
+        if ga.target_utilization > 0 and self.best_utilization >= ga.target_utilization: return 'target_utilization'
+        if ga.stall_generations > 0 and stalled >= ga.stall_generations: return 'stalled'
+        return None
+    def _progress(self, gen: int, elapsed: float, stalled: int) -> int:
+        ga = self.ga_config; fractions = []
+        if ga.generations > 0: fractions.append(gen / ga.generations)
+        if ga.time_budget > 0: fractions.append(elapsed / ga.time_budget)
+        if ga.stall_generations > 0: fractions.append(stalled / ga.stall_generations)
+        return int(min(1.0, max(fractions)) * 100) if fractions else 0
+    def _random_population(self, rng: np.random.Generator, ga: GAConfig) -> List[np.ndarray]:
+        """Chromosomes are (n, 2) int32 arrays [pool index, rotation index]: the same bytes the workers and caches use."""
+        n = len(self.parts_pool); allowed = self.allowed_rotation_indices(ga)
+        population = [random_chromosome(rng, n, allowed) for _ in range(ga.population_size)]
+        if population and any(self.table.hole_bounds):
+            # parts can only nest in holes that are already placed, so one individual starts with the containers: largest bounding box first
+            envelope = np.array([part.geometry.envelope.area for part in self.parts_pool.unique])[self.parts_pool.indices]
+            population[0] = np.ascontiguousarray(np.stack([np.argsort(-envelope, kind='stable'), np.full(n, allowed[0])], axis=1), dtype=np.int32)
+        return population
+    def _breed(self, sorted_population: List[np.ndarray], rng: np.random.Generator, ga: GAConfig) -> List[np.ndarray]:
+        next_generation = sorted_population[:2]; parents = sorted_population[:max(1, len(sorted_population) // 2)]; allowed = self.allowed_rotation_indices(ga)
+        while len(next_generation) < ga.population_size:
+            p1, p2 = (parents[i] for i in rng.integers(len(parents), size=2)); n = len(p1)
+            # OX with the segment anchored at gene 0: the child keeps p1's prefix as-is, so its placement can resume from p1's cached prefix
+            child = order_crossover(p1, p2, 0, int(rng.integers(1, n))) if n > 1 and rng.random() < ga.crossover_rate else p1.copy()
+            if n > 1 and rng.random() < ga.mutation_rate:
+                operator = rng.integers(3 if len(allowed) > 1 else 2); i, j = sorted(rng.choice(n, size=2, replace=False).tolist())
+                if operator == 0: swap_mutation(child, i, j)
+                elif operator == 1: inversion_mutation(child, i, j + 1)
+                else: rotation_mutation(child, i, int(rng.choice(allowed[allowed != child[i, 1]])))
+            next_generation.append(child)
+        return next_generation
+    def run(self, progress_callback, should_stop, log_callback=None, generation_callback=None):
+        """Evolves the population and returns (placed, unplaced, fitness) of the best chromosome found.
+
+        The run ends at the first of: the generation cap, the time budget, the target utilization,
+        `stall_generations` without improvement, or should_stop(); stop_reason records which. A
+        cancelled run still returns the best layout evaluated so far.
+        generation_callback(stats, best) is called after every generation; `best` is (placed, unplaced,
+        fitness) when the generation improved on the best so far and None otherwise.
+        With GAConfig.islands > 1 the island model runs instead (see _run_islands).
+        """
+        ga = self.ga_config
+        if ga.generations <= 0 and ga.time_budget <= 0 and ga.stall_generations <= 0 and ga.target_utilization <= 0:
+            raise ValueError("GAConfig needs at least one of generations, time_budget, stall_generations or target_utilization")
+        # the pair cache is closed however the run ends, so its pending writes and LRU touches reach the file
+        try:
+            if log_callback and (ga.simplify_tolerance > 0 or ga.max_vertices > 0):
+                # the vertex counts are free; timing both evaluations costs two cold placements, so it is opt-in
+                report = self.simplification_report() if ga.simplification_report else self.table.simplify_stats
+                timing = f"; one evaluation {report['full_seconds']:.3f}s -> {report['simplified_seconds']:.3f}s ({report['speedup']:.1f}x faster)" if 'speedup' in report else ""
+                log_callback(f"Simplification: {report['vertices_removed']} of {report['vertices_before']} vertices removed{timing}.")
+            resume = self._load_resume()
+            self.seed = resume['seed'] if resume else ga.seed if ga.seed is not None else random.randrange(2 ** 32)
+            if log_callback: log_callback(f"Seed {self.seed}." + (f" Resuming after generation {resume['generation']} of {ga.resume_log_path}." if resume else ""))
+            self._log_base = resume['base'] if resume else None
+            self._run_log = RunLogWriter(ga.run_log_path, self._run_log_header(), resume['records'] if resume else ()) if ga.run_log_path else None
+            worker_pool = self.worker_pool or NestingWorkerPool()
+            executor = worker_pool.executor_for(self.parts_pool, self.sheet_config, ga, self.sheets if self.multi_sheet else None)
+            try:
+                if ga.islands > 1: best_chromosome_overall, gen = self._run_islands(executor, worker_pool, progress_callback, should_stop, log_callback, generation_callback, resume)
+                else: best_chromosome_overall, gen = self._run_population(executor, progress_callback, should_stop, log_callback, generation_callback, resume)
+            finally:
+                if worker_pool is not self.worker_pool: worker_pool.shutdown()
+                if self._run_log: self._run_log.close()
+            if log_callback: log_callback(f"Stopped after {gen} generation(s): {self.stop_reason}.")
+            placed, unplaced, fitness = self._materialize(best_chromosome_overall)
+        finally:
+            if self.pair_cache: self.pair_cache.close()
+        return placed, unplaced, fitness
+    def _run_log_header(self) -> Dict:
+        """Run log header; with the job snapshot (unique parts as WKB, sheets, GA config) a log is a self-contained checkpoint (see checkpoint.py)."""
+        job = {'parts': [{'id': p.id, 'name': p.name, 'source_file': p.source_file, 'wkb': shapely.to_wkb(p.geometry, hex=True)} for p in self.table.unique_parts],
+               'pool': self.table.pool_to_unique.tolist(), 'sheet': asdict(self.sheet_config), 'sheets': [asdict(sheet) for sheet in self.sheets] if self.multi_sheet else None}
+        header = {'genes': len(self.parts_pool), 'rotations': self.rotations, 'islands': max(1, self.ga_config.islands), 'seed': self.seed, 'ga': asdict(self.ga_config), 'job': job}
+        if self._log_base: header['base'] = self._log_base
+        return header
+    def _log_generation(self, generation: int, entries: List[Tuple], stalled: int, best_fitness: float):
+        """Logs one generation's [(island, population, fitness, rng_state)]; with run_log_keep the log is periodically cut back to just this generation."""
+        for entry in entries: self._run_log.append(generation, *entry)
+        keep = self.ga_config.run_log_keep
+        if keep > 0 and len(entries) == max(1, self.ga_config.islands) and generation - (self._log_base or {}).get('generation', 0) >= keep:
+            # elites survive breeding, so the latest generation still holds the best chromosome; the header keeps the stall count
+            self._log_base = {'generation': generation, 'stalled': stalled, 'best_fitness': best_fitness}
+            self._run_log.rewrite(self._run_log_header(), [(generation, *entry) for entry in entries])
+    def _load_resume(self) -> Optional[Dict]:
+        """Where a logged run (GAConfig.resume_log_path) left off after its resume generation.
+
+        Logged fitnesses go into the fitness cache, so nothing the log already covers is evaluated again.
+        """
+        ga = self.ga_config
+        if not ga.resume_log_path: return None
+        header, records = load_run_log(ga.resume_log_path, ga.resume_generation or None); islands = max(1, ga.islands)
+        if header['genes'] != len(self.parts_pool) or header['rotations'] != self.rotations or header['islands'] != islands:
+            raise ValueError(f"{ga.resume_log_path} was written for a different job or GA setup")
+        # a generation is complete once every island logged it; an interrupted last generation is dropped
+        counts: Dict[int, int] = {}
+        for record in records: counts[record.generation] = counts.get(record.generation, 0) + 1
+        complete = [g for g, count in counts.items() if count == islands]
+        if not complete: raise ValueError(f"{ga.resume_log_path} has no complete generation to resume from")
+        generation = max(complete); records = [r for r in records if r.generation <= generation]
+        best = (float('inf'), None); generation_best: Dict[int, float] = {}; last = {}
+        for record in records:
+            index = int(np.argmin(record.fitness)); last[record.island] = record
+            if record.fitness[index] < best[0]: best = (float(record.fitness[index]), record.population[index])
+            generation_best[record.generation] = min(generation_best.get(record.generation, float('inf')), float(record.fitness[index]))
+            if self.fitness_cache:
+                for chrom, fitness in zip(record.population, record.fitness.tolist()): self.fitness_cache.put(self._fitness_key(chrom), fitness)
+        base = header.get('base'); stalled = base['stalled'] if base else 0; running = base['best_fitness'] if base else float('inf')
+        for g in sorted(generation_best):
+            if base and g <= base['generation']: continue
+            if generation_best[g] < running: running = generation_best[g]; stalled = 0
+            else: stalled += 1
+        return {'generation': generation, 'seed': header['seed'], 'best': best, 'stalled': stalled, 'last': last, 'records': records, 'base': base}
+    def replay(self, path: str, generation_callback, until_generation: Optional[int] = None) -> Optional[Tuple[List[Part], List[Part], float]]:
+        """Plays a run log back through generation_callback(stats, best) without evaluating anything.
+
+        Only the bests that improved are placed (to show them); returns the best layout of the log.
+        """
+        header, records = load_run_log(path, until_generation)
+        if header['genes'] != len(self.parts_pool) or header['rotations'] != self.rotations: raise ValueError(f"{path} was written for a different job")
+        best = (float('inf'), None); index = 0
+        while index < len(records):
+            group = [records[index]]
+            while index + len(group) < len(records) and records[index + len(group)].generation == group[0].generation: group.append(records[index + len(group)])
+            index += len(group); improved = None
+            for record in group:
+                i = int(np.argmin(record.fitness))
+                if record.fitness[i] < best[0]: best = (float(record.fitness[i]), record.population[i]); improved = best[1]
+            stats = self._generation_stats(group[0].generation - 1, [], 0, np.sort(np.concatenate([r.fitness for r in group])).tolist(), 0.0, best[0]); stats['islands'] = len(group)
+            self._record_generation(stats, None); self._report_generation(stats, improved, generation_callback)
+        return self._materialize(best[1]) if best[1] is not None else None
+    @staticmethod
+    def _resumed_island(record) -> Tuple[List[np.ndarray], np.random.Generator]:
+        """(ranked population, RNG) of a logged generation, ready to breed the next one."""
+        rng = np.random.default_rng(); rng.bit_generator.state = record.rng_state
+        return [record.population[i] for i in np.argsort(record.fitness, kind='stable')], rng
+    def _run_population(self, executor, progress_callback, should_stop, log_callback, generation_callback, resume: Optional[Dict] = None):
+        """One population; selection runs here and fitness evaluations fan out to the worker pool.
+
+        Results are ranked by fitness with ties kept in population order, so the completion order
+        of the workers never changes the run.
+        """
+        ga = self.ga_config; run_start = time.perf_counter(); gen = 0; stalled = 0; last_generation = 0.0; best_fitness_overall = float('inf')
+        if resume:
+            ranked, rng = self._resumed_island(resume['last'][0]); population = self._breed(ranked, rng, ga)
+            gen = resume['generation']; stalled = resume['stalled']; best_fitness_overall, best_chromosome_overall = resume['best']
+        else: rng = np.random.default_rng(self.seed); population = self._random_population(rng, ga); best_chromosome_overall = population[0]
+        while True:
+            self.stop_reason = 'cancelled' if should_stop() else self._should_end(gen, time.perf_counter() - run_start, last_generation, stalled)
+            if self.stop_reason: break
+            gen_start = time.perf_counter(); results = [None] * len(population); futures = {}; waiting: Dict[bytes, list] = {}; fitness_hits = 0; evaluated = []
+            for index, chrom in enumerate(population):
+                key = self._fitness_key(chrom); fitness = self.fitness_cache.get(key) if self.fitness_cache else None
+                if fitness is not None: results[index] = (fitness, chrom); fitness_hits += 1; continue
+                if key not in waiting: waiting[key] = []; futures[executor.submit(_evaluate_in_worker, chrom)] = key
+                waiting[key].append(index)
+            for future in concurrent.futures.as_completed(futures):
+                # cancelling mid-generation drops the unfinished evaluations; the best so far stands
+                if should_stop():
+                    for pending in futures: pending.cancel()
+                    break
+                fitness, info = future.result(); key = futures[future]; self.cache_hits += info['cache_hits']; self.cache_misses += info['cache_misses']; evaluated.append(info)
+                if self.fitness_cache: self.fitness_cache.put(key, fitness)
+                for index in waiting[key]: results[index] = (fitness, population[index])
+            if should_stop(): self.stop_reason = 'cancelled'; break
+            fitnesses = [r[0] for r in results]; results.sort(key=lambda x: x[0]); improved = results[0][0] < best_fitness_overall
+            if improved: best_fitness_overall, best_chromosome_overall = results[0]; stalled = 0
+            else: stalled += 1
+            if self._run_log: self._log_generation(gen + 1, [(0, population, fitnesses, rng.bit_generator.state)], stalled, best_fitness_overall)
+            last_generation = time.perf_counter() - gen_start
+            stats = self._record_generation(self._generation_stats(gen, evaluated, fitness_hits, [r[0] for r in results], last_generation, best_fitness_overall), log_callback)
+            self._report_generation(stats, best_chromosome_overall if improved else None, generation_callback)
+            population = self._breed([r[1] for r in results], rng, ga); gen += 1; progress_callback(self._progress(gen, time.perf_counter() - run_start, stalled))
+        return best_chromosome_overall, gen
+    def _report_generation(self, stats: Dict, improved_chromosome: Optional[np.ndarray], generation_callback):
+        best = self._materialize(improved_chromosome) if improved_chromosome is not None and (generation_callback or self.ga_config.target_utilization > 0) else None
+        if best: self.best_utilization = self.utilization(best[0])
+        stats['utilization'] = self.best_utilization
+        if generation_callback: generation_callback(stats, best)
+    def evolve_island(self, island: int, population: Optional[List[np.ndarray]], migrants: List[np.ndarray], rng: np.random.Generator, generations: int,
+                      deadline: float = 0.0, record: bool = False, known: Optional[Dict[bytes, float]] = None) -> Dict:
+        """Evolves one island for up to `generations` generations in this process (see _run_islands).
+
+        Everything the island needs travels with the call, so the outcome does not depend on which
+        worker runs it. Incoming migrants are evaluated with the first generation and replace the
+        island's weakest ranked individuals. With `record`, every generation's (population, fitness,
+        RNG state) comes back for the run log; `known` fitnesses (from a resumed log) are not
+        evaluated again.
+        """
+        ga = self.island_config(island); history = []
+        if known and self.fitness_cache:
+            for key, fitness in known.items(): self.fitness_cache.put(key, fitness)
+        population = list(population) if population is not None else self._random_population(rng, ga)
+        migrants = list(migrants[:len(population) - 1])
+        best = None; stats = []; ranked = population; pair_hits = pair_misses = 0
+        for gen in range(generations):
+            if (deadline and time.time() > deadline) or (_worker_stop_event is not None and _worker_stop_event.is_set()): break
+            start = time.perf_counter(); results = []; evaluated = []; fitness_hits = 0
+            for chrom in population + migrants:
+                key = self._fitness_key(chrom); fitness = self.fitness_cache.get(key) if self.fitness_cache else None
+                if fitness is not None: fitness_hits += 1
+                else:
+                    fitness, info = self._evaluate_chromosome(chrom); evaluated.append(info); pair_hits += info['cache_hits']; pair_misses += info['cache_misses']
+                    if self.fitness_cache: self.fitness_cache.put(key, fitness)
+                results.append((fitness, chrom))
+            # ties keep population order; the migrants' places come out of the bottom of the ranking
+            survivors = sorted(range(len(results)), key=lambda i: results[i][0])[:len(population)]; migrants = []
+            if record: kept = sorted(survivors); history.append(([results[i][1] for i in kept], [results[i][0] for i in kept], rng.bit_generator.state))
+            results = [results[i] for i in survivors]; ranked = [r[1] for r in results]
+            if best is None or results[0][0] < best[0]: best = results[0]
+            stats.append(self._generation_stats(gen, evaluated, fitness_hits, [r[0] for r in results], time.perf_counter() - start, best[0]))
+            population = self._breed(ranked, rng, ga)
+        return {'island': island, 'population': population, 'best': best, 'migrants': ranked[:ga.migrants], 'rng': rng, 'stats': stats, 'history': history,
+                'cache_hits': pair_hits, 'cache_misses': pair_misses}
+    @staticmethod
+    def _merge_island_stats(gen: int, island_stats: List[Dict], best_overall: float) -> Dict:
+        """One generation's stats across islands; throughput adds up because the islands run side by side."""
+        evaluations = sum(s['evaluations'] for s in island_stats)
+        return {'generation': gen + 1, 'evaluations': evaluations, 'fitness_cache_hits': sum(s['fitness_cache_hits'] for s in island_stats),
+                'prefix_reuse': sum(s['prefix_reuse'] * s['evaluations'] for s in island_stats) / evaluations if evaluations else 0.0,
+                'seconds_saved': sum(s['seconds_saved'] for s in island_stats), 'best_fitness': min(s['best_fitness'] for s in island_stats),
+                'mean_fitness': sum(s['mean_fitness'] for s in island_stats) / len(island_stats), 'worst_fitness': max(s['worst_fitness'] for s in island_stats),
+                'best_overall': best_overall, 'evaluations_per_second': sum(s['evaluations_per_second'] for s in island_stats),
+                'seconds': max(s['seconds'] for s in island_stats), 'islands': len(island_stats)}
+    def _run_islands(self, executor, worker_pool: 'NestingWorkerPool', progress_callback, should_stop, log_callback, generation_callback, resume: Optional[Dict] = None):
+        """Island model: every island evolves its own population inside a worker process.
+
+        Islands run `migration_interval` generations per task (an epoch); after each epoch the best
+        `migrants` of island i replace the weakest of island i + 1 (a ring). Each island's population
+        and RNG state come back with its result and go out with the next task, and results are merged
+        in island order, so a run with a given seed and no time budget is reproducible whatever the
+        worker count or scheduling. A resumed run treats its resume generation as an epoch boundary.
+        """
+        ga = self.ga_config; run_start = time.perf_counter(); wall_start = time.time(); interval = max(1, ga.migration_interval)
+        if log_callback: log_callback(f"Island model: {ga.islands} islands, migration every {interval} generation(s).")
+        islands = [{'population': None, 'migrants': [], 'rng': np.random.default_rng([self.seed, island]), 'known': None} for island in range(ga.islands)]
+        best_found = None; best_fitness_overall = float('inf'); gen = 0; stalled = 0; last_epoch = 0.0
+        if resume:
+            for island, state in enumerate(islands):
+                record = resume['last'][island]; ranked, state['rng'] = self._resumed_island(record); config = self.island_config(island)
+                state['population'] = self._breed(ranked, state['rng'], config); islands[(island + 1) % len(islands)]['migrants'] = ranked[:config.migrants]
+                state['known'] = {self._fitness_key(chrom): fitness for chrom, fitness in zip(record.population, record.fitness.tolist())}
+            gen = resume['generation']; stalled = resume['stalled']; best_fitness_overall = resume['best'][0]; best_found = resume['best']
+        while True:
+            self.stop_reason = 'cancelled' if should_stop() else self._should_end(gen, time.perf_counter() - run_start, last_epoch, stalled)
+            if self.stop_reason: break
+            epoch = interval if ga.generations <= 0 else min(interval, ga.generations - gen); epoch_start = time.perf_counter()
+            if ga.stall_generations > 0: epoch = min(epoch, ga.stall_generations - stalled)
+            deadline = wall_start + ga.time_budget if ga.time_budget > 0 else 0.0
+            futures = [executor.submit(_evolve_island_in_worker, island, state['population'], state['migrants'], state['rng'], epoch, deadline, self._run_log is not None, state.pop('known', None), ga)
+                       for island, state in enumerate(islands)]
+            pending = set(futures)
+            while pending and not should_stop(): _done, pending = concurrent.futures.wait(pending, timeout=0.2)
+            if pending:
+                # islands already running stop at their next generation; the best of finished epochs stands
+                worker_pool.stop_islands()
+                for future in pending: future.cancel()
+                self.stop_reason = 'cancelled'; break
+            results = [future.result() for future in futures]
+            for result in results:
+                state = islands[result['island']]; state['population'] = result['population']; state['rng'] = result['rng']
+                islands[(result['island'] + 1) % len(islands)]['migrants'] = result['migrants']
+                self.cache_hits += result['cache_hits']; self.cache_misses += result['cache_misses']
+            ran = max(len(r['stats']) for r in results); improved_chromosome = None
+            for index in range(ran):
+                island_stats = [r['stats'][index] for r in results if index < len(r['stats'])]
+                generation_best = min(s['best_fitness'] for s in island_stats)
+                if generation_best < best_fitness_overall: best_fitness_overall = generation_best; stalled = 0
+                else: stalled += 1
+                if self._run_log: self._log_generation(gen + index + 1, [(r['island'], *r['history'][index]) for r in results if index < len(r['history'])], stalled, best_fitness_overall)
+                stats = self._record_generation(self._merge_island_stats(gen + index, island_stats, best_fitness_overall), log_callback)
+                if index == ran - 1:
+                    for r in results:
+                        if r['best'] is not None and (best_found is None or r['best'][0] < best_found[0]): best_found = r['best']; improved_chromosome = r['best'][1]
+                self._report_generation(stats, improved_chromosome if index == ran - 1 else None, generation_callback)
+            gen += ran; last_epoch = (time.perf_counter() - epoch_start) / max(1, ran); progress_callback(self._progress(gen, time.perf_counter() - run_start, stalled))
+            if ran < epoch: self.stop_reason = 'time_budget'; break  # islands only cut an epoch short at the deadline
+        if best_found is None: return self._random_population(np.random.default_rng(self.seed), ga)[0], gen
+        return best_found[1], gen
+
+# --- Persistent worker pool: each process holds the part pool and engine for the whole job ---
+_worker_nester: Optional[GeneticAlgorithmNester] = None
+_worker_stop_event = None  # set by the parent to end running island epochs early
+
+def _init_worker(parts_pool: PartPool, sheet_config: SheetConfig, ga_config: GAConfig, sheets: List[SheetConfig], stop_event=None):
+    global _worker_nester, _worker_stop_event
+    _worker_nester = GeneticAlgorithmNester(parts_pool, sheet_config, ga_config, sheets=sheets); _worker_stop_event = stop_event
+
+def _evaluate_in_worker(encoded: np.ndarray):
+    return _worker_nester._evaluate_chromosome(encoded)
+
+def _evolve_island_in_worker(island: int, population, migrants, rng, generations: int, deadline: float, record: bool, known, ga_config: GAConfig):
+    _worker_nester.ga_config = ga_config  # the pool outlives GA-only setting changes (see NestingWorkerPool.job_signature)
+    return _worker_nester.evolve_island(island, population, migrants, rng, generations, deadline, record, known)
+
+# GAConfig fields that shape a worker's geometry table, engine and caches
+WORKER_FIELDS = ('engine', 'simplify_tolerance', 'max_vertices', 'pair_cache_path', 'pair_cache_max_mb', 'fitness_cache_size', 'prefix_stride', 'prefix_cache_nodes', 'open_sheet_lookback')
+
+class NestingWorkerPool:
+    """Long-lived process pool shared by consecutive runs; restarted only when the job inputs change.
+
+    Workers receive the part pool and configs once through the pool initializer and build their
+    GeometryTable there, so each task only carries an encoded chromosome.
+    """
+    def __init__(self, max_workers: Optional[int] = None):
+        self.max_workers = max_workers; self._executor: Optional[concurrent.futures.ProcessPoolExecutor] = None; self._signature = None
+        self._stop_event = multiprocessing.Event()
+    @staticmethod
+    def job_signature(parts_pool: PartPool, sheet_config: SheetConfig, ga_config: GAConfig, sheets: List[SheetConfig]) -> bytes:
+        """Digest of what the workers build in _init_worker: parts, sheets, rotations and the GAConfig fields of WORKER_FIELDS.
+
+        Population size, rates, seed and stop criteria are left out: island tasks carry the current
+        GAConfig, so changing them between runs keeps the pool and its warm caches.
+        """
+        worker_config = tuple(getattr(ga_config, name) for name in WORKER_FIELDS)
+        digest = hashlib.blake2b(repr((sheet_config, sheets, job_rotations(ga_config), worker_config)).encode(), digest_size=16)
+        for part in parts_pool.unique: digest.update(part.id.encode()); digest.update(shapely.to_wkb(part.geometry))
+        digest.update(parts_pool.indices.tobytes())
+        return digest.digest()
+    def executor_for(self, parts_pool: PartPool, sheet_config: SheetConfig, ga_config: GAConfig, sheets: List[SheetConfig]) -> concurrent.futures.ProcessPoolExecutor:
+        signature = self.job_signature(parts_pool, sheet_config, ga_config, sheets)
+        if self._executor is None or signature != self._signature:
+            self.shutdown()
+            self._executor = concurrent.futures.ProcessPoolExecutor(max_workers=self.max_workers, initializer=_init_worker, initargs=(parts_pool, sheet_config, ga_config, sheets, self._stop_event))
+            self._signature = signature
+        self._stop_event.clear()
+        return self._executor
+    def stop_islands(self):
+        """Asks island epochs running in the workers to return after their current generation."""
+        self._stop_event.set()
+    def shutdown(self):
+        if self._executor is not None: self._executor.shutdown(wait=True, cancel_futures=True); self._executor = None; self._signature = None
@@ -4,11 +4,15 @@
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLabel, QFrame, QSplitter,
                              QTableView, QTreeWidget, QTreeWidgetItem,
                              QGraphicsView, QGraphicsScene, QGroupBox, QRadioButton,
-                             QFormLayout, QDoubleSpinBox, QGridLayout)
-from PyQt6.QtGui import QStandardItemModel, QStandardItem, QBrush, QColor, QPen, QPolygonF
+                             QFormLayout, QDoubleSpinBox, QSpinBox, QGridLayout, QComboBox, QFileDialog, QCheckBox)
+from PyQt6.QtGui import QStandardItemModel, QStandardItem, QBrush, QColor, QPen, QPolygonF, QPainterPath
 from PyQt6.QtCore import Qt, QSize, QPointF
 import qtawesome as qta
 
+from nesting_engine import PLACEMENT_ENGINES
+from checkpoint import DEFAULT_CHECKPOINT_DIR
+from preview_render import PathCache, LayoutSceneCache, layout_scene
+
 class NestingTab(QWidget):
     def __init__(self, main_window):
         super().__init__()
@@ -24,52 +28,73 @@ class NestingTab(QWidget):
         results_splitter.addWidget(self.results_table_view)
         bottom_panel = QWidget(); bottom_layout = QVBoxLayout(bottom_panel)
         details_splitter = QSplitter(Qt.Orientation.Horizontal)
-        self.setup_placed_parts_tree(); self.setup_efficiency_graph()
-        details_splitter.addWidget(self.placed_parts_tree); details_splitter.addWidget(self.efficiency_view)
-        details_splitter.setSizes()
-        bottom_layout.addWidget(details_splitter); bottom_layout.addWidget(QLabel("Current Layout"))
+        self.setup_placed_parts_tree(); self.setup_efficiency_graph(); self.setup_convergence_chart()
+        details_splitter.addWidget(self.placed_parts_tree); details_splitter.addWidget(self.efficiency_view); details_splitter.addWidget(self.convergence_view)
+        details_splitter.setSizes([400, 300, 300])
+        bottom_layout.addWidget(details_splitter); self.live_status_label = QLabel("Current Layout"); bottom_layout.addWidget(self.live_status_label)
         self.setup_layout_preview(); bottom_layout.addWidget(self.layout_preview_view)
-        results_splitter.addWidget(bottom_panel); results_splitter.setSizes()
+        results_splitter.addWidget(bottom_panel); results_splitter.setSizes([200, 500])
         main_layout.addWidget(results_splitter)
         self.toggle_buttons(True)
 
     def on_result_selected(self, selected, deselected):
         indexes = selected.indexes()
         if not indexes: return
-        result_data = self.main_window.nesting_results[indexes.row()]
+        result_data = self.main_window.nesting_results[indexes[0].row()]
         self.placed_parts_tree.clear()
         if 'placed_parts_geometries' in result_data['layout']:
              for part_obj in result_data['layout']['placed_parts_geometries']:
-                 QTreeWidgetItem(self.placed_parts_tree,)
+                 QTreeWidgetItem(self.placed_parts_tree, [part_obj.name])
         self.efficiency_scene.clear(); util = result_data['util']
         self.efficiency_scene.addRect(10, 10, 200, 30, QPen(QColor("lightgreen")), QBrush(QColor("lightgreen")))
         self.efficiency_scene.addRect(10, 10, 2 * util, 30, QPen(QColor("darkgreen")), QBrush(QColor("green")))
         self.efficiency_scene.addText(f"{util:.2f}%").setPos(90, 15)
-        self.layout_preview_scene.clear()
         layout_info = result_data['layout']
-        sheet_w, sheet_h = layout_info['width'], layout_info['height']
-        self.layout_preview_scene.addRect(0, 0, sheet_w, sheet_h, QPen(QColor("gray")))
-        placed_parts_geometries = layout_info.get('placed_parts_geometries',)
-        for part_obj in placed_parts_geometries:
-            if part_obj.placed_geometry:
-                # للتعامل مع الأشكال التي تم تعديلها (قد تكون MultiLineString)
-                if hasattr(part_obj.placed_geometry, 'geoms'):
-                    for geom in part_obj.placed_geometry.geoms:
-                        coords = list(geom.coords)
-                        q_polygon = QPolygonF([QPointF(x, y) for x, y in coords])
-                        self.layout_preview_scene.addPolygon(q_polygon, QPen(Qt.GlobalColor.black), QBrush(QColor("lightblue")))
-                else:
-                    coords = list(part_obj.placed_geometry.exterior.coords)
-                    q_polygon = QPolygonF([QPointF(x, y) for x, y in coords])
-                    self.layout_preview_scene.addPolygon(q_polygon, QPen(Qt.GlobalColor.black), QBrush(QColor("lightblue")))
-        self.layout_preview_view.fitInView(self.layout_preview_scene.itemsBoundingRect(), Qt.AspectRatioMode.KeepAspectRatio)
+        # مشهد كل نتيجة يُبنى مرة واحدة ثم يُعاد عرضه فورًا عند اختيارها مجددًا
+        scene = self.scene_cache.scene(indexes[0].row(), lambda: [(layout_info['width'], layout_info['height'], layout_info.get('placed_parts_geometries', []))])
+        self.show_scene(scene)
+
+    def draw_layouts(self, sheets):
+        """Draws (width, height, placed parts) sheets side by side in the live layout preview."""
+        self.show_scene(layout_scene(self.path_cache, sheets, self.layout_preview_scene))
+
+    def show_scene(self, scene):
+        if self.layout_preview_view.scene() is not scene: self.layout_preview_view.setScene(scene)
+        self.layout_preview_view.fitInView(scene.itemsBoundingRect(), Qt.AspectRatioMode.KeepAspectRatio)
+
+    # --- عرض مباشر أثناء التعشيش ---
+    def reset_live_view(self):
+        self.convergence_history = []; self.convergence_scene.clear(); self.layout_preview_scene.clear(); self.show_scene(self.layout_preview_scene); self.live_status_label.setText("Current Layout")
+
+    def update_generation_stats(self, stats_list):
+        self.convergence_history.extend(stats_list); last = self.convergence_history[-1]
+        self.live_status_label.setText(f"Generation {last['generation']} | best {last['best_overall']:.1f} | mean {last['mean_fitness']:.1f} | "
+                                       f"worst {last['worst_fitness']:.1f} | utilization {last['utilization']:.1f}% | {last['evaluations_per_second']:.1f} eval/s")
+        self.draw_convergence_chart()
+
+    def draw_convergence_chart(self, width=300.0, height=120.0):
+        """Best-so-far (green) and generation mean (blue) fitness against generation."""
+        self.convergence_scene.clear(); history = self.convergence_history
+        self.convergence_scene.addRect(0, 0, width, height, QPen(QColor("lightgray")))
+        series = [([s['best_overall'] for s in history], QColor("green")), ([s['mean_fitness'] for s in history], QColor("steelblue"))]
+        low = min(min(values) for values, _ in series); high = max(max(values) for values, _ in series); span = (high - low) or 1.0
+        step = width / max(1, len(history) - 1)
+        for values, color in series:
+            points = [QPointF(i * step, height - (v - low) / span * height) for i, v in enumerate(values)]
+            for a, b in zip(points, points[1:]): self.convergence_scene.addLine(a.x(), a.y(), b.x(), b.y(), QPen(color, 2))
+        self.convergence_scene.addText(f"{high:.0f}").setPos(width + 4, -8); self.convergence_scene.addText(f"{low:.0f}").setPos(width + 4, height - 16)
+        self.convergence_view.fitInView(self.convergence_scene.itemsBoundingRect(), Qt.AspectRatioMode.KeepAspectRatio)
+
+    def show_live_layout(self, best):
+        self.draw_layouts([(sheet.width, sheet.height, parts) for sheet, parts in best['layouts']])
 
     def create_toolbar(self):
         self.start_button = self.create_tool_button("Start", "fa5s.play-circle", self.start_nesting, icon_size=QSize(24, 24), fixed_size=QSize(80, 40))
         self.stop_button = self.create_tool_button("Stop", "fa5s.stop-circle", self.stop_nesting, icon_size=QSize(24, 24), fixed_size=QSize(80, 40))
+        self.resume_button = self.create_tool_button("Resume", "fa5s.history", self.resume_nesting, icon_size=QSize(24, 24), fixed_size=QSize(80, 40))
         toolbar_frame = QFrame(); toolbar_layout = QHBoxLayout(toolbar_frame)
         toolbar_layout.setAlignment(Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter)
-        start_stop_layout = QVBoxLayout(); start_stop_layout.addWidget(self.start_button); start_stop_layout.addWidget(self.stop_button)
+        start_stop_layout = QVBoxLayout(); start_stop_layout.addWidget(self.start_button); start_stop_layout.addWidget(self.stop_button); start_stop_layout.addWidget(self.resume_button)
         toolbar_layout.addLayout(start_stop_layout)
         toolbar_layout.addWidget(self.create_separator())
         settings_layout = QFormLayout()
@@ -81,23 +106,47 @@ class NestingTab(QWidget):
         settings_layout.addRow("Sheet Margin:", self.sheet_margin_spin)
         settings_layout.addRow("Sheet Width:", self.sheet_width_spin)
         settings_layout.addRow("Sheet Height:", self.sheet_height_spin)
-        toolbar_layout.addLayout(settings_layout); toolbar_layout.addStretch()
+        self.engine_combo = QComboBox()
+        for engine_name, engine_label in PLACEMENT_ENGINES.items(): self.engine_combo.addItem(engine_label, engine_name)
+        settings_layout.addRow("Placement Engine:", self.engine_combo)
+        self.simplify_spin = QDoubleSpinBox(); self.simplify_spin.setRange(0, 100); self.simplify_spin.setDecimals(3); self.simplify_spin.setSpecialValueText("Off")
+        self.vertex_budget_spin = QSpinBox(); self.vertex_budget_spin.setRange(0, 100000); self.vertex_budget_spin.setSpecialValueText("Off")
+        settings_layout.addRow("Simplify Tolerance:", self.simplify_spin)
+        settings_layout.addRow("Vertex Budget / Part:", self.vertex_budget_spin)
+        # يقيس تقييماً كاملاً وآخر مبسطاً قبل التشغيل، لذلك هو اختياري
+        self.simplification_report_check = QCheckBox("Time the speed-up before the run"); self.simplification_report_check.setToolTip("Logs one full-resolution and one simplified evaluation time when simplification is on")
+        settings_layout.addRow("Simplification Report:", self.simplification_report_check)
+        self.islands_spin = QSpinBox(); self.islands_spin.setRange(1, 256); self.islands_spin.setSpecialValueText("Off")
+        self.migration_spin = QSpinBox(); self.migration_spin.setRange(1, 1000); self.migration_spin.setValue(5); self.migration_spin.setSuffix(" gens")
+        settings_layout.addRow("GA Islands:", self.islands_spin)
+        settings_layout.addRow("Migrate Every:", self.migration_spin)
+        stop_layout = QFormLayout()
+        self.time_budget_spin = QDoubleSpinBox(); self.time_budget_spin.setRange(0, 86400); self.time_budget_spin.setSuffix(" s"); self.time_budget_spin.setSpecialValueText("Off")
+        self.target_util_spin = QDoubleSpinBox(); self.target_util_spin.setRange(0, 100); self.target_util_spin.setSuffix(" %"); self.target_util_spin.setSpecialValueText("Off")
+        self.stall_gens_spin = QSpinBox(); self.stall_gens_spin.setRange(0, 10000); self.stall_gens_spin.setSpecialValueText("Off")
+        stop_layout.addRow("Time Budget:", self.time_budget_spin)
+        stop_layout.addRow("Target Utilization:", self.target_util_spin)
+        stop_layout.addRow("Stop After Stalled Gens:", self.stall_gens_spin)
+        toolbar_layout.addLayout(settings_layout); toolbar_layout.addWidget(self.create_separator()); toolbar_layout.addLayout(stop_layout); toolbar_layout.addStretch()
         return toolbar_frame
 
     def toggle_buttons(self, enabled):
-        self.start_button.setEnabled(enabled)
+        self.start_button.setEnabled(enabled); self.resume_button.setEnabled(enabled)
         self.stop_button.setEnabled(not enabled)
         
     def setup_results_table(self):
         self.results_table_view = QTableView()
         self.results_model = QStandardItemModel()
         self.results_table_view.setModel(self.results_model)
-        headers =; self.results_model.setHorizontalHeaderLabels(headers)
+        headers = ["Rank", "Utilization (%)", "Parts Nested", "Time"]; self.results_model.setHorizontalHeaderLabels(headers)
         self.results_table_view.selectionModel().selectionChanged.connect(self.on_result_selected)
 
-    def setup_placed_parts_tree(self): self.placed_parts_tree = QTreeWidget(); self.placed_parts_tree.setHeaderLabels()
+    def setup_placed_parts_tree(self): self.placed_parts_tree = QTreeWidget(); self.placed_parts_tree.setHeaderLabels(["Placed Parts"])
     def setup_efficiency_graph(self): self.efficiency_scene = QGraphicsScene(); self.efficiency_view = QGraphicsView(self.efficiency_scene)
-    def setup_layout_preview(self): self.layout_preview_scene = QGraphicsScene(); self.layout_preview_view = QGraphicsView(self.layout_preview_scene)
+    def setup_convergence_chart(self): self.convergence_scene = QGraphicsScene(); self.convergence_view = QGraphicsView(self.convergence_scene); self.convergence_history = []
+    def setup_layout_preview(self):
+        self.layout_preview_scene = QGraphicsScene(); self.layout_preview_view = QGraphicsView(self.layout_preview_scene)  # the scene of the live view
+        self.path_cache = PathCache(); self.scene_cache = LayoutSceneCache(self.path_cache)
 
     def create_tool_button(self, text, icon_name, function, icon_size=QSize(24, 24), fixed_size=None):
         button = QPushButton(f" {text}"); button.setIcon(qta.icon(icon_name, color='#333')); button.setIconSize(icon_size)
@@ -106,18 +155,38 @@ class NestingTab(QWidget):
 
     def create_separator(self): sep = QFrame(); sep.setFrameShape(QFrame.Shape.VLine); sep.setFrameShadow(QFrame.Shadow.Sunken); return sep
 
-    def start_nesting(self):
-        params = {
+    def settings(self) -> dict:
+        return {
             'part_spacing': self.part_spacing_spin.value(), 'sheet_margin': self.sheet_margin_spin.value(),
-            'sheet_width': self.sheet_width_spin.value(), 'sheet_height': self.sheet_height_spin.value()
+            'sheet_width': self.sheet_width_spin.value(), 'sheet_height': self.sheet_height_spin.value(),
+            'engine': self.engine_combo.currentData(), 'simplify_tolerance': self.simplify_spin.value(), 'max_vertices': self.vertex_budget_spin.value(),
+            'simplification_report': self.simplification_report_check.isChecked(),
+            'time_budget': self.time_budget_spin.value(), 'target_utilization': self.target_util_spin.value(), 'stall_generations': self.stall_gens_spin.value(),
+            'islands': self.islands_spin.value(), 'migration_interval': self.migration_spin.value()
         }
-        self.main_window.start_nesting(params)
+
+    def apply_settings(self, settings: dict):
+        """Restores settings() saved with a project; missing keys keep their current values."""
+        spins = {'part_spacing': self.part_spacing_spin, 'sheet_margin': self.sheet_margin_spin, 'sheet_width': self.sheet_width_spin, 'sheet_height': self.sheet_height_spin,
+                 'simplify_tolerance': self.simplify_spin, 'max_vertices': self.vertex_budget_spin, 'time_budget': self.time_budget_spin, 'target_utilization': self.target_util_spin,
+                 'stall_generations': self.stall_gens_spin, 'islands': self.islands_spin, 'migration_interval': self.migration_spin}
+        for key, spin in spins.items():
+            if key in settings: spin.setValue(settings[key])
+        if 'simplification_report' in settings: self.simplification_report_check.setChecked(bool(settings['simplification_report']))
+        index = self.engine_combo.findData(settings.get('engine'))
+        if index >= 0: self.engine_combo.setCurrentIndex(index)
+
+    def start_nesting(self): self.main_window.start_nesting(self.settings())
 
     def stop_nesting(self): self.main_window.cancel_nesting()
 
+    def resume_nesting(self):
+        path, _ = QFileDialog.getOpenFileName(self, "Resume Nesting", DEFAULT_CHECKPOINT_DIR, "Nesting Checkpoints (*.hnrl)")
+        if path: self.main_window.resume_nesting(path)
+
     def update_results(self, results_data):
-        self.results_model.removeRows(0, self.results_model.rowCount())
+        self.scene_cache.clear(); self.results_model.removeRows(0, self.results_model.rowCount())
         for res in results_data:
-            row =)), QStandardItem(f"{res['util']:.2f}"), QStandardItem(res['parts_nested']), QStandardItem(res['time'])]
+            row = [QStandardItem(str(res['rank'])), QStandardItem(f"{res['util']:.2f}"), QStandardItem(res['parts_nested']), QStandardItem(res['time'])]
             self.results_model.appendRow(row)
         if self.results_model.rowCount() > 0: self.results_table_view.selectRow(0)
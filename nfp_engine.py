@@ -0,0 +1,118 @@
+# =============================================================================
+#           HyperNesting v3.0 - nfp_engine.py (محرك المضلعات عديمة الملاءمة NFP)
+# =============================================================================
+from collections import OrderedDict
+from typing import List, Tuple
+
+import numpy as np
+import shapely
+from shapely.geometry import Polygon, Point, box
+from shapely.affinity import translate as shapely_translate
+
+from nesting_engine import PlacementEngine, PlacementState, SheetConfig
+from geometry_cache import PairGeometryCache
+from geometry_table import GeometryTable
+
+NFP_CACHE_SIZE = 20000
+MAX_PIECE_PAIRS = 20000
+
+# NFPs are kept per process so they survive across all GA evaluations that run in it;
+# PairGeometryCache adds the on-disk level shared between processes and runs
+_nfp_cache: "OrderedDict[Tuple[bytes, bytes], Polygon]" = OrderedDict()
+
+def clear_nfp_cache():
+    """Empties this process's NFP cache (used before timing runs that must start cold)."""
+    _nfp_cache.clear()
+
+def convex_pieces(geometry: Polygon) -> np.ndarray:
+    """Splits a polygon into convex pieces (triangles) as an array of shape (pieces, vertices, 2).
+
+    Falls back to the convex hull when constrained triangulation is unavailable; the hull
+    covers the part, so the resulting NFP is conservative and never allows an overlap.
+    """
+    if hasattr(shapely, 'constrained_delaunay_triangles'):
+        triangles = shapely.get_parts(shapely.constrained_delaunay_triangles(geometry))
+        if len(triangles): return shapely.get_coordinates(triangles).reshape(len(triangles), 4, 2)[:, :3]
+    return hull_piece(geometry)
+
+def hull_piece(geometry: Polygon) -> np.ndarray:
+    return shapely.get_coordinates(geometry.convex_hull.exterior)[None, :-1]
+
+def minkowski_sum(pieces_a: np.ndarray, pieces_b: np.ndarray) -> Polygon:
+    """Union of the pairwise convex sums of two convex decompositions."""
+    sums = pieces_a[:, None, :, None, :] + pieces_b[None, :, None, :, :]
+    points = sums.reshape(len(pieces_a) * len(pieces_b), pieces_a.shape[1] * pieces_b.shape[1], 2)
+    return shapely.union_all(shapely.convex_hull(shapely.multipoints(points)))
+
+class _Variant:
+    """Buffered part normalized so its bbox min sits at the origin (the NFP reference point)."""
+    __slots__ = ('digest', 'buffered', 'width', 'height', 'offset', 'pieces')
+    def __init__(self, table: GeometryTable, variant: int):
+        minx, miny, maxx, maxy = table.buffered_bounds[variant].tolist()
+        self.buffered = shapely_translate(table.buffered[variant], xoff=-minx, yoff=-miny); self.offset = (minx, miny)
+        self.width, self.height = maxx - minx, maxy - miny
+        self.digest = table.variant_key(variant); self.pieces = None
+
+class NFPNestingEngine(PlacementEngine):
+    """Bottom-left placement on the free region IFP - union(NFP); same interface as NestingEngine."""
+    def __init__(self, sheet_config: SheetConfig, pair_cache: PairGeometryCache = None):
+        super().__init__(sheet_config); self.pair_cache = pair_cache; self._table = None; self._variants: List[_Variant] = []
+    def _variant(self, table: GeometryTable, variant: int) -> _Variant:
+        if table is not self._table: self._table = table; self._variants = [None] * len(table)
+        if self._variants[variant] is None: self._variants[variant] = _Variant(table, variant)
+        return self._variants[variant]
+    def no_fit_polygon(self, fixed: _Variant, moving: _Variant) -> Polygon:
+        """NFP of `moving` around `fixed`, both at the origin: positions where they would overlap."""
+        key = (fixed.digest, moving.digest)
+        nfp = _nfp_cache.get(key)
+        if nfp is not None: _nfp_cache.move_to_end(key); return nfp
+        payload = self.pair_cache.get('nfp', *key) if self.pair_cache else None
+        if payload is not None: nfp = shapely.from_wkb(payload); self._remember(key, nfp); return nfp
+        for v in (fixed, moving):
+            if v.pieces is None: v.pieces = convex_pieces(v.buffered)
+        pieces_a, pieces_b = fixed.pieces, -moving.pieces
+        if len(pieces_a) * len(pieces_b) > MAX_PIECE_PAIRS:
+            if len(pieces_a) >= len(pieces_b): pieces_a = hull_piece(fixed.buffered)
+            else: pieces_b = -hull_piece(moving.buffered)
+        nfp = minkowski_sum(pieces_a, pieces_b); self._remember(key, nfp)
+        if self.pair_cache: self.pair_cache.put('nfp', *key, shapely.to_wkb(nfp))
+        return nfp
+    @staticmethod
+    def _remember(key, nfp):
+        _nfp_cache[key] = nfp
+        if len(_nfp_cache) > NFP_CACHE_SIZE: _nfp_cache.popitem(last=False)
+    def begin(self, table: GeometryTable, variant_ids: np.ndarray) -> PlacementState:
+        # (placed [(variant, x, y)], per moving variant: versions [(parts included, union of translated NFPs)])
+        return PlacementState(extra=([], {}))
+    def restore(self, snapshot) -> PlacementState:
+        state, n_placed, n_unplaced, max_y = snapshot; placed, forbidden = state.extra
+        versions = {key: [ver for ver in history if ver[0] <= n_placed] for key, history in forbidden.items()}
+        return PlacementState(state.placements[:n_placed], state.unplaced[:n_unplaced], max_y, (placed[:n_placed], versions))
+    def advance(self, state: PlacementState, table: GeometryTable, seq: int, variant: int):
+        placed, forbidden = state.extra; margin = self.sheet_config.margin; v = self._variant(table, variant)
+        x_max = self.sheet_config.width - margin - v.width; y_max = self.sheet_config.height - margin - v.height
+        if x_max < margin or y_max < margin: state.unplaced.append(seq); return
+        # the union is only extended with the parts placed since this variant was last placed
+        history = forbidden.setdefault(v.digest, []); included, union = history[-1] if history else (0, None)
+        new = [shapely_translate(self.no_fit_polygon(pv, v), xoff=qx, yoff=qy) for pv, qx, qy in placed[included:]]
+        if new: union = shapely.union_all(new if union is None else [union] + new); history.append((len(placed), union))
+        pos = self._bottom_left(margin, margin, x_max, y_max, union)
+        if pos is None: state.unplaced.append(seq); return
+        qx, qy = pos; placed.append((v, qx, qy)); state.placements.append((seq, qx - v.offset[0], qy - v.offset[1], 0))
+        state.max_y = qy + v.height if state.max_y is None else max(state.max_y, qy + v.height)
+    def result(self, state: PlacementState):
+        if self.pair_cache: self.pair_cache.flush()
+        return super().result(state)
+    @staticmethod
+    def _bottom_left(x_min, y_min, x_max, y_max, forbidden):
+        """Lowest, then left-most vertex of the inner-fit rectangle minus the forbidden region."""
+        if x_max > x_min and y_max > y_min:
+            free = box(x_min, y_min, x_max, y_max)
+            if forbidden is not None: free = free.difference(forbidden)
+            if free.is_empty: return None
+            coords = shapely.get_coordinates(free); best = np.lexsort((coords[:, 0], coords[:, 1]))[0]
+            return float(coords[best, 0]), float(coords[best, 1])
+        # the part fits exactly in one direction: the inner-fit region is a segment or a point
+        for x, y in sorted({(x_min, y_min), (x_max, y_min), (x_min, y_max), (x_max, y_max)}, key=lambda p: (p[1], p[0])):
+            if forbidden is None or not forbidden.contains(Point(x, y)): return x, y
+        return None
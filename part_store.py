@@ -0,0 +1,69 @@
+# =============================================================================
+#           HyperNesting v3.0 - part_store.py (سجل القطع بأعمدة بدلاً من قائمة قواميس)
+# =============================================================================
+"""Columnar registry of the unique parts of a job.
+
+One row per unique outline: names, geometries and fingerprints in lists, quantity, rotation,
+bounds, area and vertex count in NumPy columns, so the parts table reads a cell without touching
+shapely and totals are one array sum. A geometry may be a loader (a callable returning it) that
+is resolved on first use, which is how a project opens without building its polygons.
+"""
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import shapely
+
+from nesting_engine import Part, PartPool
+
+class PartStore:
+    def __init__(self):
+        self.names: List[str] = []; self.fingerprints: List[Optional[bytes]] = []; self._geometries: List = []  # geometry or loader
+        self.quantity = np.zeros(0, dtype=np.int32); self.rotation = np.zeros(0, dtype=np.float64)
+        self.bounds = np.zeros((0, 4), dtype=np.float64); self.area = np.zeros(0, dtype=np.float64); self.vertices = np.zeros(0, dtype=np.int32)
+        self._rows_by_fingerprint: Dict[bytes, int] = {}
+    def __len__(self) -> int: return len(self.names)
+    @property
+    def width(self) -> np.ndarray: return self.bounds[:, 2] - self.bounds[:, 0]
+    @property
+    def height(self) -> np.ndarray: return self.bounds[:, 3] - self.bounds[:, 1]
+    def total_quantity(self) -> int: return int(self.quantity.sum())
+    def pool(self) -> PartPool:
+        """GA part pool: one Part per row with a quantity, copies only as indices."""
+        rows = np.flatnonzero(self.quantity > 0).tolist()
+        unique = [Part(id=self.names[row], name=self.names[row], geometry=self.geometry(row), source_file='') for row in rows]
+        return PartPool.from_quantities(unique, self.quantity[rows])
+    def geometry(self, row: int):
+        geometry = self._geometries[row]
+        if callable(geometry): geometry = self._geometries[row] = geometry()
+        return geometry
+    def is_loaded(self, row: int) -> bool: return not callable(self._geometries[row])
+    def find(self, fingerprint: bytes) -> Optional[int]:
+        """Row of the part with this geometry fingerprint (see geometry_hash), if any."""
+        return self._rows_by_fingerprint.get(fingerprint)
+    def extend(self, names: Sequence[str], geometries: Sequence, quantities=None, rotations=None, fingerprints: Sequence[Optional[bytes]] = None,
+               bounds=None, area=None, vertices=None) -> range:
+        """Appends parts and returns their rows. Geometries may be loaders; bounds, area and vertices must then be given."""
+        n = len(names); start = len(self)
+        if bounds is None:
+            array = np.array(geometries, dtype=object)
+            bounds = shapely.bounds(array).reshape(-1, 4); area = shapely.area(array); vertices = shapely.get_num_coordinates(array)
+        self.names.extend(names); self._geometries.extend(geometries); self.fingerprints.extend(fingerprints if fingerprints is not None else [None] * n)
+        self.quantity = np.concatenate([self.quantity, np.ones(n, dtype=np.int32) if quantities is None else np.asarray(quantities, dtype=np.int32)])
+        self.rotation = np.concatenate([self.rotation, np.zeros(n) if rotations is None else np.asarray(rotations, dtype=np.float64)])
+        self.bounds = np.concatenate([self.bounds, np.asarray(bounds, dtype=np.float64).reshape(-1, 4)])
+        self.area = np.concatenate([self.area, np.asarray(area, dtype=np.float64)]); self.vertices = np.concatenate([self.vertices, np.asarray(vertices, dtype=np.int32)])
+        for row, fingerprint in enumerate(self.fingerprints[start:], start=start):
+            if fingerprint is not None: self._rows_by_fingerprint.setdefault(fingerprint, row)
+        return range(start, start + n)
+    def remove(self, rows: Sequence[int]):
+        keep = np.ones(len(self), dtype=bool); keep[list(rows)] = False; kept = np.flatnonzero(keep).tolist()
+        self.names = [self.names[i] for i in kept]; self.fingerprints = [self.fingerprints[i] for i in kept]; self._geometries = [self._geometries[i] for i in kept]
+        self.quantity = self.quantity[keep]; self.rotation = self.rotation[keep]; self.bounds = self.bounds[keep]; self.area = self.area[keep]; self.vertices = self.vertices[keep]
+        self._rows_by_fingerprint = {}
+        for row, fingerprint in enumerate(self.fingerprints):
+            if fingerprint is not None: self._rows_by_fingerprint.setdefault(fingerprint, row)
+    def set_geometry(self, row: int, geometry):
+        """Replaces an outline (e.g. after micro joints); it no longer matches its imported fingerprint."""
+        self._geometries[row] = geometry; self.bounds[row] = geometry.bounds; self.area[row] = geometry.area; self.vertices[row] = shapely.get_num_coordinates(geometry)
+        fingerprint = self.fingerprints[row]; self.fingerprints[row] = None
+        if fingerprint is not None and self._rows_by_fingerprint.get(fingerprint) == row: del self._rows_by_fingerprint[fingerprint]
@@ -2,17 +2,70 @@
 #           HyperNesting v3.0 - parts_tab.py (النسخة النهائية والمُصححة)
 # =============================================================================
 from PyQt6.QtWidgets import (QWidget, QHBoxLayout, QVBoxLayout, QPushButton,
-                             QFrame, QSplitter, QLabel, QFileDialog,
-                             QTableWidget, QGraphicsScene, QGraphicsView, QSpinBox, QHeaderView, QAbstractItemView, QMessageBox, QTableWidgetItem)
-from PyQt6.QtGui import QFont, QColor, QPen, QBrush, QPolygonF
-from PyQt6.QtCore import Qt, QSize, QPointF
+                             QFrame, QSplitter, QLabel, QFileDialog, QTableView, QStyledItemDelegate,
+                             QTableWidget, QGraphicsScene, QGraphicsView, QSpinBox, QHeaderView, QAbstractItemView, QMessageBox)
+from PyQt6.QtGui import QFont, QColor, QPen, QBrush, QPolygonF, QPainterPath
+from PyQt6.QtCore import Qt, QSize, QPointF, QAbstractTableModel, QModelIndex
 import qtawesome as qta
 from ui_components import InteractiveJointEditor
+from preview_render import PathCache
+from part_store import PartStore
+
+class PartsTableModel(QAbstractTableModel):
+    """Parts table over a PartStore; every change goes through here so views get row-level signals instead of a rebuild."""
+    HEADERS = ["Part Name", "Width", "Height", "Quantity", "Rotation", "Area", "Vertices"]; QUANTITY_COLUMN = 3
+    def __init__(self, store: PartStore, parent=None):
+        super().__init__(parent); self.store = store
+    def rowCount(self, parent=QModelIndex()): return 0 if parent.isValid() else len(self.store)
+    def columnCount(self, parent=QModelIndex()): return 0 if parent.isValid() else len(self.HEADERS)
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal: return self.HEADERS[section]
+        return None
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or role not in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.EditRole): return None
+        row, column = index.row(), index.column(); store = self.store
+        if column == 0: return store.names[row]
+        if column == 1: return f"{store.bounds[row, 2] - store.bounds[row, 0]:.2f}"
+        if column == 2: return f"{store.bounds[row, 3] - store.bounds[row, 1]:.2f}"
+        if column == 3: return int(store.quantity[row])
+        if column == 4: return f"{store.rotation[row]:g}"
+        if column == 5: return f"{store.area[row]:.2f}"
+        return int(store.vertices[row])
+    def flags(self, index):
+        flags = super().flags(index)
+        return flags | Qt.ItemFlag.ItemIsEditable if index.column() == self.QUANTITY_COLUMN else flags
+    def setData(self, index, value, role=Qt.ItemDataRole.EditRole):
+        if role != Qt.ItemDataRole.EditRole or index.column() != self.QUANTITY_COLUMN or int(value) < 1: return False
+        self.store.quantity[index.row()] = int(value); self.dataChanged.emit(index, index); return True
+    def reset(self, store: PartStore):
+        self.beginResetModel(); self.store = store; self.endResetModel()
+    def append(self, names, geometries, quantities=None, fingerprints=None) -> range:
+        first = len(self.store); self.beginInsertRows(QModelIndex(), first, first + len(names) - 1)
+        rows = self.store.extend(names, geometries, quantities, fingerprints=fingerprints); self.endInsertRows(); return rows
+    def remove_rows(self, rows):
+        # contiguous runs from the bottom up, so the rows still to remove keep their numbers
+        runs = []
+        for row in sorted(set(rows)):
+            if runs and runs[-1][1] == row - 1: runs[-1][1] = row
+            else: runs.append([row, row])
+        for first, last in reversed(runs):
+            self.beginRemoveRows(QModelIndex(), first, last); self.store.remove(range(first, last + 1)); self.endRemoveRows()
+    def add_quantity(self, row: int, count: int):
+        self.store.quantity[row] += count; index = self.index(row, self.QUANTITY_COLUMN); self.dataChanged.emit(index, index)
+    def set_geometry(self, row: int, geometry):
+        self.store.set_geometry(row, geometry); self.dataChanged.emit(self.index(row, 0), self.index(row, len(self.HEADERS) - 1))
+
+class QuantityDelegate(QStyledItemDelegate):
+    """Spin box editor for the quantity column; one editor exists only while a cell is being edited."""
+    def createEditor(self, parent, option, index):
+        editor = QSpinBox(parent); editor.setRange(1, 9999); return editor
+    def setEditorData(self, editor, index): editor.setValue(int(index.data(Qt.ItemDataRole.EditRole)))
+    def setModelData(self, editor, model, index): editor.interpretText(); model.setData(index, editor.value(), Qt.ItemDataRole.EditRole)
 
 class PartsTab(QWidget):
     def __init__(self, main_window):
         super().__init__()
-        self.main_window = main_window
+        self.main_window = main_window; self.path_cache = PathCache()
         splitter = QSplitter(Qt.Orientation.Horizontal)
         left_panel = QFrame()
         left_layout = QVBoxLayout(left_panel)
@@ -49,9 +102,8 @@ class PartsTab(QWidget):
         
         for index in selected_rows_indices:
             row = index.row()
-            part_data = self.main_window.parts_data[row]
             # Assuming editor should be opened for each part
-            editor = InteractiveJointEditor(part_data['geometry'], self)
+            editor = InteractiveJointEditor(self.main_window.parts_data.geometry(row), self)
             if editor.exec():
                 joint_data = editor.get_joint_data()
                 if joint_data:
@@ -78,9 +130,8 @@ class PartsTab(QWidget):
             return
         
         # We take the first selected row for the preview
-        part_data = self.main_window.parts_data[indexes[0].row()]
         self.preview_scene.clear()
-        polygon_geom = part_data['geometry']
+        polygon_geom = self.main_window.parts_data.geometry(indexes[0].row())
         
         geometries = []
         if polygon_geom.geom_type == 'Polygon':
@@ -88,50 +139,18 @@ class PartsTab(QWidget):
         elif polygon_geom.geom_type == 'MultiPolygon':
             geometries = polygon_geom.geoms
         
-        for geom in geometries:
-            coords = list(geom.exterior.coords)
-            q_polygon = QPolygonF([QPointF(x, y) for x, y in coords])
-            bounding_rect = q_polygon.boundingRect()
-            # Center the polygon in the view
-            q_polygon.translate(-bounding_rect.center())
-            self.preview_scene.addPolygon(q_polygon, QPen(Qt.GlobalColor.black), QBrush(QColor("#ff6347")))
+        if geometries:
+            path = self.path_cache.path(polygon_geom)  # built once per outline, reused on every selection
+            item = self.preview_scene.addPath(path, QPen(Qt.GlobalColor.black), QBrush(QColor("#ff6347")))
+            # Center the part in the view
+            item.setPos(-path.boundingRect().center())
             
         self.preview_view.fitInView(self.preview_scene.itemsBoundingRect(), Qt.AspectRatioMode.KeepAspectRatio)
 
-    def on_quantity_changed(self, value, row_index):
-        if row_index < len(self.main_window.parts_data):
-            self.main_window.parts_data[row_index]['quantity'] = value
-            total_quantity = sum(part['quantity'] for part in self.main_window.parts_data)
-            self.total_parts_label.setText(f"Total for Nesting = {total_quantity}")
-
-    def update_table_view(self, parts_data):
-        self.parts_table_view.setRowCount(0)
-        if not parts_data: return
-        
-        total_quantity = sum(part['quantity'] for part in parts_data)
-        self.parts_table_view.setRowCount(len(parts_data))
-
-        for i, part in enumerate(parts_data):
-            bounds = part['geometry'].bounds  # (minx, miny, maxx, maxy)
-            # تم الإصلاح: طريقة حساب العرض والارتفاع
-            width = bounds[2] - bounds[0]
-            height = bounds[3] - bounds[1]
-            
-            self.parts_table_view.setItem(i, 0, QTableWidgetItem(part['name']))
-            self.parts_table_view.setItem(i, 1, QTableWidgetItem(f"{width:.2f}"))
-            self.parts_table_view.setItem(i, 2, QTableWidgetItem(f"{height:.2f}"))
-            
-            quantity_spinbox = QSpinBox()
-            quantity_spinbox.setMinimum(1)
-            quantity_spinbox.setMaximum(9999)
-            quantity_spinbox.setValue(part['quantity'])
-            quantity_spinbox.valueChanged.connect(lambda val, index=i: self.on_quantity_changed(val, index))
-            self.parts_table_view.setCellWidget(i, 3, quantity_spinbox)
-            
-            self.parts_table_view.setItem(i, 4, QTableWidgetItem(str(part.get('rotation', 0))))
-            
-        self.total_parts_label.setText(f"Total for Nesting = {total_quantity}")
-        self.unique_parts_label.setText(f"Unique Parts = {len(parts_data)}")
+    def update_totals(self, *args):
+        store = self.parts_model.store
+        self.total_parts_label.setText(f"Total for Nesting = {store.total_quantity()}")
+        self.unique_parts_label.setText(f"Unique Parts = {len(store)}")
 
     def create_toolbar(self):
         toolbar_frame = QFrame()
@@ -143,12 +162,14 @@ class PartsTab(QWidget):
         return toolbar_frame
 
     def setup_parts_table(self):
-        self.parts_table_view = QTableWidget()
-        self.parts_table_view.setColumnCount(5)
-        # تم الإصلاح: إضافة العناوين الناقصة
-        headers = ["Part Name", "Width", "Height", "Quantity", "Rotation"]
-        self.parts_table_view.setHorizontalHeaderLabels(headers)
+        # الجدول يقرأ من مخزن القطع مباشرة؛ لا توجد عناصر أو أدوات لكل صف
+        self.parts_model = PartsTableModel(self.main_window.parts_data, self)
+        self.parts_table_view = QTableView(); self.parts_table_view.setModel(self.parts_model)
+        self.parts_table_view.setItemDelegateForColumn(PartsTableModel.QUANTITY_COLUMN, QuantityDelegate(self.parts_table_view))
+        self.parts_table_view.setEditTriggers(QAbstractItemView.EditTrigger.DoubleClicked | QAbstractItemView.EditTrigger.SelectedClicked | QAbstractItemView.EditTrigger.EditKeyPressed)
+        self.parts_table_view.verticalHeader().setDefaultSectionSize(22)
         self.parts_table_view.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        for signal in (self.parts_model.rowsInserted, self.parts_model.rowsRemoved, self.parts_model.dataChanged, self.parts_model.modelReset): signal.connect(self.update_totals)
         self.parts_table_view.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
         self.parts_table_view.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
         self.parts_table_view.selectionModel().selectionChanged.connect(self.on_selection_changed)
@@ -170,7 +191,7 @@ class PartsTab(QWidget):
         self.total_parts_label = QLabel("Total for Nesting = 0")
         bottom_layout.addWidget(self.unique_parts_label)
         bottom_layout.addWidget(self.total_parts_label)
-        bottom_layout.addStretch()
+        bottom_layout.addStretch(); self.update_totals()
         return bottom_frame
 
     def setup_preview_panel(self):
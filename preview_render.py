@@ -0,0 +1,96 @@
+# =============================================================================
+#           HyperNesting v3.0 - preview_render.py (رسم المعاينات بمسارات مخزنة ومستويات تفصيل)
+# =============================================================================
+"""Cached rendering for the part and layout previews.
+
+Every placed copy of a part shares its Part.geometry (the rotated outline, see GeometryTable), so
+one QPainterPath is built per geometry and each copy is a PartItem that draws that path at an
+offset. When zoomed out a PartItem draws a simplified outline, and below a few pixels just its
+bounding box. LayoutSceneCache keeps the finished scene of each result, so selecting a result
+again only swaps the view's scene.
+"""
+from collections import OrderedDict
+
+from shapely.geometry import Polygon
+from PyQt6.QtWidgets import QGraphicsScene, QGraphicsItem, QStyleOptionGraphicsItem
+from PyQt6.QtGui import QBrush, QColor, QPen, QPolygonF, QPainterPath
+from PyQt6.QtCore import Qt, QPointF, QRectF
+
+MAX_CACHED_PATHS = 20000  # the path cache starts over beyond this many outlines
+MAX_CACHED_SCENES = 8     # result scenes kept by LayoutSceneCache
+LOD_BOX_PIXELS = 4.0      # below this on-screen size a part is drawn as its bounding box
+LOD_SIMPLE_PIXELS = 60.0  # below this on-screen size a part is drawn simplified
+LOD_TOLERANCE = 0.02      # simplification tolerance, as a fraction of the part's size
+
+def geometry_path(geometry) -> QPainterPath:
+    """Painter path of a shapely geometry; polygon holes stay empty (odd-even fill)."""
+    path = QPainterPath()
+    for geom in getattr(geometry, 'geoms', [geometry]):
+        if isinstance(geom, Polygon):
+            for ring in [geom.exterior, *geom.interiors]: path.addPolygon(QPolygonF([QPointF(x, y) for x, y in ring.coords]))
+        else:
+            # الأشكال المعدلة بالوصلات قد تكون خطوطًا
+            for k, (x, y) in enumerate(geom.coords):
+                if k: path.lineTo(x, y)
+                else: path.moveTo(x, y)
+    return path
+
+class PathCache:
+    """Full and simplified QPainterPath per geometry object, built once and shared by every copy."""
+    def __init__(self):
+        self._paths = {}  # id(geometry) -> [geometry, full path, simplified path or None]
+    def _entry(self, geometry):
+        entry = self._paths.get(id(geometry))
+        if entry is None or entry[0] is not geometry:
+            if len(self._paths) >= MAX_CACHED_PATHS: self._paths.clear()
+            entry = self._paths[id(geometry)] = [geometry, geometry_path(geometry), None]
+        return entry
+    def path(self, geometry) -> QPainterPath: return self._entry(geometry)[1]
+    def simplified(self, geometry) -> QPainterPath:
+        entry = self._entry(geometry)
+        if entry[2] is None:
+            minx, miny, maxx, maxy = geometry.bounds
+            entry[2] = geometry_path(geometry.simplify(max(maxx - minx, maxy - miny) * LOD_TOLERANCE, preserve_topology=False))
+        return entry[2]
+    def clear(self): self._paths.clear()
+
+class PartItem(QGraphicsItem):
+    """One placed copy: the cached path of its geometry, drawn at the copy's offset with level of detail."""
+    def __init__(self, cache: PathCache, geometry, pen: QPen, brush: QBrush):
+        super().__init__(); self.cache = cache; self.geometry = geometry; self.pen = pen; self.brush = brush
+        minx, miny, maxx, maxy = geometry.bounds; self.rect = QRectF(minx, miny, maxx - minx, maxy - miny); self.size = max(maxx - minx, maxy - miny)
+    def boundingRect(self) -> QRectF: return self.rect
+    def paint(self, painter, option, widget=None):
+        pixels = QStyleOptionGraphicsItem.levelOfDetailFromTransform(painter.worldTransform()) * self.size
+        painter.setPen(self.pen); painter.setBrush(self.brush)
+        if pixels < LOD_BOX_PIXELS: painter.fillRect(self.rect, self.brush)
+        elif pixels < LOD_SIMPLE_PIXELS: painter.drawPath(self.cache.simplified(self.geometry))
+        else: painter.drawPath(self.cache.path(self.geometry))
+
+def layout_scene(cache: PathCache, sheets, scene: QGraphicsScene = None) -> QGraphicsScene:
+    """Scene of (width, height, placed parts) sheets side by side; copies are PartItems over shared paths."""
+    scene = scene or QGraphicsScene(); scene.clear(); offset_x = 0.0
+    pen = QPen(Qt.GlobalColor.black); pen.setCosmetic(True); brushes = {False: QBrush(QColor("lightblue")), True: QBrush(QColor("khaki"))}
+    for sheet_w, sheet_h, placed_parts in sheets:
+        scene.addRect(offset_x, 0, sheet_w, sheet_h, QPen(QColor("gray")))
+        for part in placed_parts:
+            placed = part.placed_geometry
+            if placed is None: continue
+            # the copy is its shared geometry moved by the placement offset
+            geometry = part.geometry if part.geometry is not None else placed
+            item = PartItem(cache, geometry, pen, brushes[part.nest_depth > 0])
+            item.setPos(placed.bounds[0] - geometry.bounds[0] + offset_x, placed.bounds[1] - geometry.bounds[1]); scene.addItem(item)
+        offset_x += sheet_w * 1.05
+    return scene
+
+class LayoutSceneCache:
+    """Finished preview scenes by result key, least recently used dropped first."""
+    def __init__(self, path_cache: PathCache):
+        self.path_cache = path_cache; self._scenes = OrderedDict()
+    def scene(self, key, sheets) -> QGraphicsScene:
+        """Cached scene for `key`; `sheets` is only used (and may be a callable returning them) when it has to be built."""
+        if key in self._scenes: self._scenes.move_to_end(key); return self._scenes[key]
+        scene = layout_scene(self.path_cache, sheets() if callable(sheets) else sheets); self._scenes[key] = scene
+        while len(self._scenes) > MAX_CACHED_SCENES: self._scenes.popitem(last=False)
+        return scene
+    def clear(self): self._scenes.clear()
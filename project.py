@@ -0,0 +1,128 @@
+# =============================================================================
+#           HyperNesting v3.0 - project.py (ملف المشروع المضغوط مع تحميل الأشكال عند الطلب)
+# =============================================================================
+"""HyperNesting project files (.hnproj).
+
+A project is a zip archive:
+
+    manifest.json      format, version, parts (name, quantity, rotation, fingerprint, bounds, area, vertices),
+                       sheets, nesting settings and results (placed part records)
+    parts/*.npy        part outlines as packed coordinate arrays (shapely ragged MultiPolygon layout:
+                       coords, ring offsets, polygon offsets, geometry offsets, multi flags)
+    placed/*.npy       the placed outlines of every result, in the same layout
+
+Opening a project only parses the manifest. Parts come back as a PartStore whose geometries are
+loaders, so the parts table shows a large project at once and polygons are materialized only for
+preview, nesting or saving; the coordinate arrays are read from the archive on first use.
+"""
+import io
+import json
+import os
+import zipfile
+from collections.abc import ItemsView, KeysView, ValuesView
+from typing import Callable, Dict, List, Sequence
+
+import numpy as np
+import shapely
+from shapely.geometry import Polygon, MultiPolygon
+
+from nesting_engine import Part
+from part_store import PartStore
+
+PROJECT_FORMAT = "hypernesting-project"; PROJECT_VERSION = 1; PROJECT_SUFFIX = ".hnproj"
+_ARRAYS = ('coords', 'rings', 'polygons', 'geometries', 'multi')
+
+class LazyDict(dict):
+    """dict whose missing keys with a loader are computed on first access and then stored.
+
+    Keys with a pending loader count as present (`in`, len, iteration, keys()); only reading their
+    value, including through items() or values(), runs the loader.
+    """
+    def __init__(self, data: Dict, loaders: Dict[str, Callable]):
+        super().__init__(data); self._loaders = loaders
+    def __missing__(self, key):
+        if key not in self._loaders: raise KeyError(key)
+        value = self[key] = self._loaders.pop(key)(); return value
+    def __contains__(self, key): return super().__contains__(key) or key in self._loaders
+    def __iter__(self): return iter([*super().keys(), *self._loaders])
+    def __len__(self): return super().__len__() + len(self._loaders)
+    def keys(self): return KeysView(self)
+    def items(self): return ItemsView(self)
+    def values(self): return ValuesView(self)
+    def get(self, key, default=None):
+        return self[key] if key in self else default
+
+def _polygons(geometry) -> MultiPolygon:
+    return MultiPolygon([g for g in shapely.get_parts(geometry) if isinstance(g, Polygon) and not g.is_empty])
+
+def _pack(geometries: Sequence) -> Dict[str, np.ndarray]:
+    """Packed coordinate arrays of polygonal geometries."""
+    multi = np.array([g.geom_type != 'Polygon' for g in geometries], dtype=bool)
+    if not len(geometries): return {'coords': np.zeros((0, 2)), 'rings': np.zeros(1, np.int32), 'polygons': np.zeros(1, np.int32), 'geometries': np.zeros(1, np.int32), 'multi': multi}
+    _, coords, (rings, polygons, parts) = shapely.to_ragged_array([_polygons(g) for g in geometries])
+    return {'coords': coords, 'rings': rings, 'polygons': polygons, 'geometries': parts, 'multi': multi}
+
+class GeometryStore:
+    """Geometries packed in one archive folder; the arrays are read on first use and each geometry is built when asked for."""
+    def __init__(self, path: str, folder: str):
+        self.path = path; self.folder = folder; self._arrays = None
+    def _load(self) -> Dict[str, np.ndarray]:
+        if self._arrays is None:
+            with zipfile.ZipFile(self.path) as archive: self._arrays = {name: np.load(io.BytesIO(archive.read(f"{self.folder}/{name}.npy"))) for name in _ARRAYS}
+        return self._arrays
+    def geometry(self, index: int):
+        a = self._load(); g0, g1 = a['geometries'][index], a['geometries'][index + 1]
+        p0, p1 = a['polygons'][g0], a['polygons'][g1]; r0, r1 = a['rings'][p0], a['rings'][p1]
+        # one MultiPolygon from the slices, offsets rebased to zero
+        geometry = shapely.from_ragged_array(shapely.GeometryType.MULTIPOLYGON, a['coords'][r0:r1],
+                                             (a['rings'][p0:p1 + 1] - r0, a['polygons'][g0:g1 + 1] - p0, np.array([0, g1 - g0])))[0]
+        return geometry if a['multi'][index] or len(geometry.geoms) != 1 else geometry.geoms[0]
+
+def _write_arrays(archive: zipfile.ZipFile, folder: str, arrays: Dict[str, np.ndarray]):
+    for name, array in arrays.items():
+        buffer = io.BytesIO(); np.save(buffer, array, allow_pickle=False); archive.writestr(f"{folder}/{name}.npy", buffer.getvalue())
+
+def save_project(path: str, parts_data: PartStore, sheets_data: List[Dict], settings: Dict, results: List[Dict]):
+    """Writes a project; the file is replaced atomically, so a failed save keeps the previous one.
+
+    Every lazy geometry is materialized while saving, so nothing loaded later can come from the
+    file this save replaces.
+    """
+    store = parts_data; geometries = [store.geometry(row) for row in range(len(store))]; index_of = {id(g): i for i, g in enumerate(geometries)}
+    parts = [{'name': name, 'quantity': quantity, 'rotation': rotation, 'fingerprint': fingerprint.hex() if fingerprint else None, 'bounds': bounds, 'area': area, 'vertices': vertices}
+             for name, quantity, rotation, fingerprint, bounds, area, vertices in zip(store.names, store.quantity.tolist(), store.rotation.tolist(), store.fingerprints,
+                                                                                  store.bounds.tolist(), store.area.tolist(), store.vertices.tolist())]
+    placed_geometries = []; manifest_results = []
+    for result in results:
+        layout = result['layout']; placed = []
+        for p in layout['placed_parts_geometries']:
+            placed.append({'id': p.id, 'name': p.name, 'source_file': p.source_file, 'part': index_of.get(id(p.geometry), -1), 'geometry': len(placed_geometries),
+                           'rotation': p.rotation, 'sheet_index': p.sheet_index, 'nested_in': p.nested_in, 'nest_depth': p.nest_depth})
+            placed_geometries.append(p.placed_geometry)
+        manifest_results.append({**{k: v for k, v in result.items() if k != 'layout'}, 'layout': {**{k: v for k, v in layout.items() if k != 'placed_parts_geometries'}, 'placed': placed}})
+    manifest = {'format': PROJECT_FORMAT, 'version': PROJECT_VERSION, 'parts': parts, 'sheets': sheets_data, 'settings': settings, 'results': manifest_results}
+    temporary = path + ".tmp"
+    with zipfile.ZipFile(temporary, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("manifest.json", json.dumps(manifest, ensure_ascii=False, indent=1))
+        _write_arrays(archive, "parts", _pack(geometries)); _write_arrays(archive, "placed", _pack(placed_geometries))
+    os.replace(temporary, path)
+
+def load_project(path: str) -> Dict:
+    """{'parts' (PartStore), 'sheets', 'settings', 'results'} of a project; part and result geometries load lazily."""
+    with zipfile.ZipFile(path) as archive: manifest = json.loads(archive.read("manifest.json").decode('utf-8'))
+    if manifest.get('format') != PROJECT_FORMAT: raise ValueError(f"{path} is not a HyperNesting project")
+    if manifest['version'] > PROJECT_VERSION: raise ValueError(f"{path} was saved by a newer version (project format {manifest['version']})")
+    geometry_store = GeometryStore(path, "parts"); placed_store = GeometryStore(path, "placed"); entries = manifest['parts']; parts = PartStore()
+    parts.extend([e['name'] for e in entries], [lambda index=index: geometry_store.geometry(index) for index in range(len(entries))], [e['quantity'] for e in entries],
+                 [e.get('rotation', 0) for e in entries], [bytes.fromhex(e['fingerprint']) if e.get('fingerprint') else None for e in entries],
+                 [e['bounds'] for e in entries], [e['area'] for e in entries], [e['vertices'] for e in entries])
+    def placed_part(r: Dict) -> Part:
+        # القطع الموضوعة تشارك شكل القطعة الأصلية كما في نتيجة التعشيش؛ وإلا فشكلها هو الشكل الموضوع نفسه
+        placed = placed_store.geometry(r['geometry'])
+        return Part(id=r['id'], name=r['name'], source_file=r['source_file'], geometry=parts.geometry(r['part']) if r['part'] >= 0 else placed,
+                    placed_geometry=placed, rotation=r['rotation'], sheet_index=r['sheet_index'], nested_in=r['nested_in'], nest_depth=r['nest_depth'])
+    results = []
+    for entry in manifest['results']:
+        layout = {k: v for k, v in entry['layout'].items() if k != 'placed'}
+        results.append({**entry, 'layout': LazyDict(layout, {'placed_parts_geometries': lambda records=entry['layout']['placed']: [placed_part(r) for r in records]})})
+    return {'parts': parts, 'sheets': manifest['sheets'], 'settings': manifest.get('settings', {}), 'results': results}
@@ -0,0 +1,114 @@
+# =============================================================================
+#           HyperNesting v3.0 - raster_engine.py (محرك التصادم النقطي للأعداد الكبيرة)
+# =============================================================================
+import math
+from typing import List, Optional
+
+import numpy as np
+import shapely
+from shapely.affinity import translate as shapely_translate
+
+from nesting_engine import PlacementEngine, PlacementState, SheetConfig, SpatialGrid
+from geometry_table import GeometryTable
+
+MAX_GRID_CELLS = 4_000_000  # finest automatic resolution: the sheet never gets more cells than this
+AUTO_CELLS_PER_PART = 8      # automatic resolution: ~8 cells across the smaller side of a typical part
+ROW_CHUNK = 64               # candidate rows tested per vectorized pass
+
+class _Footprint:
+    """Conservative cell segments of a buffered variant: segment k covers row[k], cells [start[k], stop[k]) from its bbox corner.
+
+    A row has one segment per piece of the outline crossing it, so a hole that spans whole rows
+    leaves its cells free for smaller parts; `span` is the number of covered cells per row.
+    """
+    __slots__ = ('row', 'start', 'stop', 'span', 'width', 'height', 'offset')
+    def __init__(self, buffered, bounds, resolution: float):
+        minx, miny, maxx, maxy = bounds; self.offset = (minx, miny)
+        # floor + 1 also covers cells the outline only touches, so two footprints never share an edge
+        self.width = int(math.floor((maxx - minx) / resolution)) + 1; self.height = int(math.floor((maxy - miny) / resolution)) + 1
+        rows = np.arange(self.height); strips = shapely.box(minx - resolution, miny + rows * resolution, maxx + resolution, miny + (rows + 1) * resolution)
+        pieces, piece_rows = shapely.get_parts(shapely.intersection(buffered, strips), return_index=True)
+        extents = shapely.bounds(pieces).reshape(-1, 4); keep = ~np.isnan(extents[:, 0]); piece_rows = piece_rows[keep]; extents = extents[keep]
+        starts = np.floor((extents[:, 0] - minx) / resolution).astype(np.int64); stops = np.minimum(np.floor((extents[:, 2] - minx) / resolution) + 1, self.width).astype(np.int64)
+        segments = []
+        for r, a, b in sorted(zip(piece_rows.tolist(), starts.tolist(), stops.tolist())):
+            if segments and segments[-1][0] == r and a <= segments[-1][2]: segments[-1][2] = max(segments[-1][2], b)  # pieces sharing a cell merge
+            else: segments.append([r, a, b])
+        segments = np.array(segments, dtype=np.int64).reshape(-1, 3); self.row, self.start, self.stop = segments[:, 0], segments[:, 1], segments[:, 2]
+        self.span = np.bincount(self.row, weights=self.stop - self.start, minlength=self.height).astype(np.int64)
+
+class RasterNestingEngine(PlacementEngine):
+    """Bottom-left placement on a bitmap of the sheet; same interface as NestingEngine.
+
+    The usable sheet area is a boolean occupancy grid and every (part, rotation) a set of conservative
+    row spans, so a position is free when no span hits an occupied cell. Row prefix sums turn that into
+    a few vectorized array differences per footprint row over many candidate rows at once. The chosen
+    position is then confirmed with an exact shapely test before it is committed.
+    Resolution comes from SheetConfig.raster_resolution (drawing units per cell, 0 = automatic).
+    """
+    def __init__(self, sheet_config: SheetConfig):
+        super().__init__(sheet_config); self._table = None; self._footprints: List[Optional[_Footprint]] = []; self.resolution = None
+    def _prepare(self, table: GeometryTable):
+        if table is self._table: return
+        sheet = self.sheet_config; inner_w = sheet.width - 2 * sheet.margin; inner_h = sheet.height - 2 * sheet.margin
+        resolution = getattr(sheet, 'raster_resolution', 0.0)
+        if resolution <= 0:
+            bb = table.buffered_bounds; sides = np.minimum(bb[:, 2] - bb[:, 0], bb[:, 3] - bb[:, 1]); sides = sides[np.isfinite(sides) & (sides > 0)]
+            resolution = max(float(np.median(sides)) / AUTO_CELLS_PER_PART if len(sides) else 1.0, math.sqrt(max(inner_w * inner_h, 1e-9) / MAX_GRID_CELLS))
+        self._table = table; self.resolution = resolution; self._footprints = [None] * len(table)
+        self.columns = max(0, int(inner_w // resolution)); self.rows = max(0, int(inner_h // resolution))
+    def _footprint(self, table: GeometryTable, variant: int) -> _Footprint:
+        if self._footprints[variant] is None: self._footprints[variant] = _Footprint(table.buffered[variant], table.buffered_bounds[variant].tolist(), self.resolution)
+        return self._footprints[variant]
+    def _empty_state(self, table: GeometryTable, cell_size: float, placements=None, unplaced=None, max_y=None) -> PlacementState:
+        grid = SpatialGrid(cell_size)
+        occupancy = np.zeros((self.rows, self.columns), dtype=bool); prefix = np.zeros((self.rows, self.columns + 1), dtype=np.int32)
+        return PlacementState(placements, unplaced, max_y, (occupancy, prefix, [], grid, table))  # cells = [(variant, row, column)]
+    def begin(self, table: GeometryTable, variant_ids: np.ndarray) -> PlacementState:
+        self._prepare(table)
+        bb = table.buffered_bounds[variant_ids]; sizes = np.maximum(bb[:, 2] - bb[:, 0], bb[:, 3] - bb[:, 1]); sizes = sizes[np.isfinite(sizes)]
+        return self._empty_state(table, float(sizes.mean()) if len(sizes) else max(self.sheet_config.width, self.sheet_config.height))
+    def restore(self, snapshot) -> PlacementState:
+        # the bitmap is mutated in place, so it is rebuilt from the placed prefix instead of copied into every snapshot
+        state, n_placed, n_unplaced, max_y = snapshot; _occupancy, _prefix, cells, grid, table = state.extra
+        restored = self._empty_state(table, grid.cell_size, state.placements[:n_placed], state.unplaced[:n_unplaced], max_y)
+        occupancy, prefix, new_cells, new_grid, _ = restored.extra
+        for (variant, row, column), geometry in zip(cells[:n_placed], grid.geometries[:n_placed]):
+            self._stamp(occupancy, self._footprint(table, variant), row, column); new_cells.append((variant, row, column)); new_grid.insert(geometry)
+        if n_placed: prefix[:, 1:] = np.cumsum(occupancy, axis=1)
+        return restored
+    @staticmethod
+    def _stamp(occupancy: np.ndarray, footprint: _Footprint, row: int, column: int):
+        for r, start, stop in zip(footprint.row.tolist(), footprint.start.tolist(), footprint.stop.tolist()): occupancy[row + r, column + start:column + stop] = True
+    def _search(self, prefix: np.ndarray, footprint: _Footprint, rejected: set):
+        """Lowest, then left-most free (row, column) for the footprint, skipping `rejected` positions."""
+        n_rows = self.rows - footprint.height + 1; n_cols = self.columns - footprint.width + 1
+        if n_rows <= 0 or n_cols <= 0: return None
+        free_per_row = self.columns - prefix[:, -1]
+        # a row can only be a bottom row if every footprint row above it has enough free cells at all
+        possible = np.ones(n_rows, dtype=bool)
+        for r in np.flatnonzero(footprint.span).tolist(): possible &= free_per_row[r:r + n_rows] >= footprint.span[r]
+        candidates = np.flatnonzero(possible); segments = list(zip(footprint.row.tolist(), footprint.start.tolist(), footprint.stop.tolist()))
+        for chunk_start in range(0, len(candidates), ROW_CHUNK):
+            rows = candidates[chunk_start:chunk_start + ROW_CHUNK]; blocked = np.zeros((len(rows), n_cols), dtype=bool)
+            for r, start, stop in segments:
+                row_prefix = prefix[rows + r]
+                blocked |= row_prefix[:, stop:stop + n_cols] != row_prefix[:, start:start + n_cols]
+            for k, j in zip(*np.nonzero(~blocked)):
+                if (int(rows[k]), int(j)) not in rejected: return int(rows[k]), int(j)
+        return None
+    def advance(self, state: PlacementState, table: GeometryTable, seq: int, v: int):
+        occupancy, prefix, cells, grid, _ = state.extra; footprint = self._footprint(table, v); margin = self.sheet_config.margin; rejected = set()
+        while True:
+            position = self._search(prefix, footprint, rejected)
+            if position is None: state.unplaced.append(seq); return
+            row, column = position
+            dx = margin + column * self.resolution - footprint.offset[0]; dy = margin + row * self.resolution - footprint.offset[1]
+            candidate_geom = shapely_translate(table.buffered[v], xoff=dx, yoff=dy)
+            # exact check; the conservative bitmap should make this pass, but a rejection only costs one more search
+            if self.sheet_boundary.contains(candidate_geom) and not grid.intersects(candidate_geom): break
+            rejected.add(position)
+        self._stamp(occupancy, footprint, row, column); rows = slice(row, row + footprint.height)
+        prefix[rows, 1:] = np.cumsum(occupancy[rows], axis=1); cells.append((v, row, column)); grid.insert(candidate_geom)
+        state.placements.append((seq, dx, dy, 0)); top = table.buffered_bounds[v][3] + dy
+        state.max_y = top if state.max_y is None else max(state.max_y, top)
@@ -0,0 +1,84 @@
+# =============================================================================
+#           HyperNesting v3.0 - run_log.py (سجل ثنائي لإعادة تشغيل التعشيش واستئنافه)
+# =============================================================================
+"""Append-only binary log of a GA run: one record per evaluated population.
+
+    file   = b"HNRL" + u16 version + u32 header length + header JSON
+    record = <IiII> generation, island, population size, genes + u32 RNG state length
+             + order (u16, or i32 for pools over 65535 parts) + rotation index (u16; u8 in version 1) + fitness (f64)
+             + RNG state JSON (the state breeding the next generation starts from)
+
+Records are flushed as they are written, so a crash loses at most the record being written; a
+truncated last record is ignored when reading. rewrite() replaces the whole file atomically, which
+is how a checkpoint log is kept short.
+"""
+import json
+import os
+import struct
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+MAGIC = b"HNRL"; VERSION = 2
+_ROTATION_DTYPES = {1: np.dtype('u1'), 2: np.dtype('<u2')}  # by file version
+_RECORD = struct.Struct("<IiIII")
+
+class GenerationRecord(NamedTuple):
+    generation: int; island: int
+    population: np.ndarray  # (population size, genes, 2) int32 chromosomes, in population order
+    fitness: np.ndarray     # (population size,) float64, aligned with population
+    rng_state: Dict
+
+def _order_dtype(genes: int): return np.dtype('<u2') if genes <= 0xFFFF else np.dtype('<i4')
+
+class RunLogWriter:
+    """Writes a run log; `records` (generation, island, population, fitness, rng_state) start it off, e.g. when a resumed run carries its history over."""
+    def __init__(self, path: str, header: Dict, records=()):
+        self.path = path; self.genes = int(header['genes']); self._file = None
+        self.rewrite(header, records)
+    def _record(self, generation: int, island: int, population: List[np.ndarray], fitness, rng_state: Dict) -> bytes:
+        chromosomes = np.asarray(population, dtype=np.int32).reshape(len(population), self.genes, 2); state = json.dumps(rng_state).encode('utf-8')
+        return (_RECORD.pack(generation, island, len(population), self.genes, len(state)) + chromosomes[:, :, 0].astype(_order_dtype(self.genes)).tobytes()
+                + chromosomes[:, :, 1].astype(_ROTATION_DTYPES[VERSION]).tobytes() + np.asarray(fitness, dtype='<f8').tobytes() + state)
+    def append(self, generation: int, island: int, population: List[np.ndarray], fitness, rng_state: Dict):
+        self._file.write(self._record(generation, island, population, fitness, rng_state)); self._file.flush()
+    def rewrite(self, header: Dict, records=()):
+        """Replaces the file with `header` and `records`; a crash meanwhile leaves the previous file intact."""
+        self.close(); payload = json.dumps(header).encode('utf-8'); temporary = self.path + ".tmp"
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with open(temporary, 'wb') as f:
+            f.write(MAGIC + struct.pack("<HI", VERSION, len(payload)) + payload)
+            for record in records: f.write(self._record(*record))
+        os.replace(temporary, self.path); self._file = open(self.path, 'ab')
+    def close(self):
+        if self._file is not None and not self._file.closed: self._file.close()
+
+def iter_run_log(path: str) -> Tuple[Dict, Iterator[GenerationRecord]]:
+    """(header, records) of a run log; records are read lazily, in the order they were written."""
+    f = open(path, 'rb')
+    if f.read(4) != MAGIC: f.close(); raise ValueError(f"{path} is not a HyperNesting run log")
+    version, length = struct.unpack("<HI", f.read(6))
+    if version not in _ROTATION_DTYPES: f.close(); raise ValueError(f"Unsupported run log version {version}")
+    rotation_dtype = _ROTATION_DTYPES[version]
+    header = json.loads(f.read(length).decode('utf-8'))
+    def records():
+        with f:
+            while True:
+                head = f.read(_RECORD.size)
+                if len(head) < _RECORD.size: return
+                generation, island, size, genes, state_length = _RECORD.unpack(head); order_dtype = _order_dtype(genes)
+                order_end = size * genes * order_dtype.itemsize; rotation_end = order_end + size * genes * rotation_dtype.itemsize; fitness_end = rotation_end + size * 8
+                body = f.read(fitness_end + state_length)
+                if len(body) < fitness_end + state_length: return  # interrupted write
+                population = np.stack([np.frombuffer(body[:order_end], dtype=order_dtype).reshape(size, genes),
+                                       np.frombuffer(body[order_end:rotation_end], dtype=rotation_dtype).reshape(size, genes)], axis=2).astype(np.int32)
+                yield GenerationRecord(generation, island, population, np.frombuffer(body[rotation_end:fitness_end], dtype='<f8').copy(), json.loads(body[fitness_end:].decode('utf-8')))
+    return header, records()
+
+def load_run_log(path: str, until_generation: Optional[int] = None) -> Tuple[Dict, List[GenerationRecord]]:
+    """Header and every record up to `until_generation` (None = all)."""
+    header, records = iter_run_log(path); kept = []
+    for record in records:
+        if until_generation is not None and record.generation > until_generation: records.close(); break
+        kept.append(record)
+    return header, kept
@@ -34,7 +34,7 @@ class SheetsTab(QWidget):
         self.sheets_table_view = QTableView()
         self.sheets_model = QStandardItemModel()
         self.sheets_table_view.setModel(self.sheets_model)
-        headers =
+        headers = ["Sheet Name", "Width", "Height", "Quantity", "Priority"]
         self.sheets_model.setHorizontalHeaderLabels(headers)
         self.sheets_table_view.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
         self.sheets_table_view.verticalHeader().setVisible(False)
@@ -61,6 +61,6 @@ class SheetsTab(QWidget):
     def update_table_view(self, sheets_data):
         self.sheets_model.removeRows(0, self.sheets_model.rowCount())
         for sheet in sheets_data:
-            row =), QStandardItem(f"{sheet['width']:.2f}"), QStandardItem(f"{sheet['height']:.2f}"),
+            row = [QStandardItem(sheet['name']), QStandardItem(f"{sheet['width']:.2f}"), QStandardItem(f"{sheet['height']:.2f}"),
                    QStandardItem(str(sheet['quantity'])), QStandardItem(str(sheet['priority']))]
             self.sheets_model.appendRow(row)
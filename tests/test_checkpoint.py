@@ -0,0 +1,37 @@
+from dataclasses import replace
+
+import numpy as np
+import pytest
+from shapely.geometry import Point, box
+
+from checkpoint import checkpoint_config, checkpoint_nester
+from nesting_engine import GAConfig, GeneticAlgorithmNester, NestingWorkerPool, Part, SheetConfig
+from run_log import load_run_log
+
+@pytest.fixture(scope='module')
+def worker_pool():
+    pool = NestingWorkerPool(1); yield pool; pool.shutdown()
+
+def job_parts():
+    rng = np.random.default_rng(7); parts = []
+    for i, (w, h) in enumerate(rng.uniform(10, 60, (16, 2)).tolist()):
+        geometry = box(0, 0, w, h) if i % 3 else Point(0, 0).buffer(w / 2, quad_segs=8)
+        parts.append(Part(id=f"p{i}", name=f"p{i}", geometry=geometry, source_file=''))
+    return parts
+
+def run(nester):
+    bests = []; placed, _, fitness = nester.run(lambda percent: None, lambda: False, None, lambda stats, best: bests.append((stats['generation'], stats['best_overall'])))
+    return fitness, bests, sorted((p.name, p.placed_geometry.bounds) for p in placed)
+
+@pytest.mark.parametrize('islands', [0, 3])
+def test_resumed_checkpoint_matches_an_uninterrupted_run(tmp_path, worker_pool, islands):
+    sheet = SheetConfig(width=300, height=200, spacing=2, margin=5)
+    ga = GAConfig(generations=10, population_size=8, islands=islands, migration_interval=2, pair_cache_path=None, seed=5)
+    full = run(GeneticAlgorithmNester(job_parts(), sheet, ga, worker_pool))
+    path = str(tmp_path / 'checkpoint.hnrl')
+    # stopped after 7 generations, with the log compacted every 3
+    run(GeneticAlgorithmNester(job_parts(), sheet, checkpoint_config(replace(ga, generations=7, run_log_keep=3), path), worker_pool))
+    assert max(r.generation for r in load_run_log(path)[1]) == 7
+    nester = checkpoint_nester(path, worker_pool); nester.ga_config = replace(nester.ga_config, generations=10)
+    fitness, bests, placed = run(nester)
+    assert (fitness, placed) == (full[0], full[2]) and bests == full[1][7:] and [g for g, _ in bests] == [8, 9, 10]
@@ -0,0 +1,68 @@
+import ezdxf
+import pytest
+from shapely.affinity import rotate, translate
+from shapely.geometry import Point, Polygon, box
+
+from dxf_io import DxfImportCache, polygons_with_holes, read_dxf_polygons, write_layout_dxf
+from nesting_engine import Part
+
+def save(tmp_path, name, draw):
+    doc = ezdxf.new('R2010'); draw(doc.modelspace()); path = str(tmp_path / name); doc.saveas(path)
+    return path
+
+def test_lines_and_circle_make_a_plate_with_a_hole(tmp_path):
+    def draw(msp):
+        corners = [(0, 0), (100, 0), (100, 50), (0, 50)]
+        for a, b in zip(corners, corners[1:] + corners[:1]): msp.add_line(a, b)
+        msp.add_circle((70, 25), 10)
+    [plate] = read_dxf_polygons(save(tmp_path, 'plate.dxf', draw))
+    assert plate.bounds == pytest.approx((0, 0, 100, 50)) and len(plate.interiors) == 1
+    assert Polygon(plate.interiors[0]).centroid.coords[0] == pytest.approx((70, 25), abs=1e-6)
+    assert plate.area == pytest.approx(5000 - Point(0, 0).buffer(10, quad_segs=256).area, rel=1e-3)
+
+def test_closed_polyline_and_chained_slot(tmp_path):
+    def draw(msp):
+        msp.add_lwpolyline([(0, 0), (40, 0), (0, 30)], close=True)
+        # 60 x 20 slot with round ends: two lines and two half circles
+        msp.add_line((110, 0), (150, 0)); msp.add_arc((150, 10), 10, -90, 90)
+        msp.add_line((150, 20), (110, 20)); msp.add_arc((110, 10), 10, 90, 270)
+    triangle, slot = sorted(read_dxf_polygons(save(tmp_path, 'shapes.dxf', draw)), key=lambda p: p.bounds[0])
+    assert triangle.area == pytest.approx(600)
+    assert slot.bounds == pytest.approx((100, 0, 160, 20), abs=1e-3) and slot.area == pytest.approx(800 + 314.159, rel=1e-3)
+
+def test_open_linework_is_ignored(tmp_path):
+    def draw(msp):
+        msp.add_line((0, 0), (10, 0)); msp.add_line((10, 0), (10, 10)); msp.add_circle((50, 50), 5)
+    [circle] = read_dxf_polygons(save(tmp_path, 'open.dxf', draw))
+    assert circle.centroid.coords[0] == pytest.approx((50, 50), abs=1e-6)
+
+@pytest.mark.parametrize('use_blocks', [False, True])
+def test_layout_round_trip(tmp_path, use_blocks):
+    plate = box(0, 0, 60, 30).difference(Point(20, 15).buffer(8, quad_segs=16)); insert = box(0, 0, 6, 6)
+    turned = rotate(plate, 90, origin=(0, 0))
+    parts = [Part(id='1', name='plate', geometry=plate, source_file='', placed_geometry=translate(plate, 5, 5)),
+             Part(id='1', name='plate', geometry=turned, source_file='', placed_geometry=translate(turned, 110, 5), rotation=90),
+             Part(id='2', name='insert', geometry=insert, source_file='', placed_geometry=translate(insert, 22, 17))]
+    path = str(tmp_path / 'layout.dxf'); write_layout_dxf(path, 200, 100, parts, use_blocks=use_blocks)
+    polygons = read_dxf_polygons(path, layer='PARTS')
+    # the insert sits in the first plate's hole, two levels deep, so it comes back as a part of its own
+    assert len(polygons) == 3
+    for part in parts:
+        assert any(p.symmetric_difference(part.placed_geometry).area < 1e-6 for p in polygons)
+    [sheet] = read_dxf_polygons(path, layer='SHEET')
+    assert sheet.bounds == pytest.approx((0, 0, 200, 100))
+
+def test_import_cache_round_trip(tmp_path):
+    path = save(tmp_path, 'circle.dxf', lambda msp: msp.add_circle((0, 0), 5))
+    cache = DxfImportCache(str(tmp_path / 'cache.sqlite'))
+    assert cache.get(path) is None
+    polygons = read_dxf_polygons(path); cache.put(path, polygons)
+    [cached] = cache.get(path); cache.close()
+    assert cached.equals(polygons[0]) and (cache.hits, cache.misses) == (1, 1)
+
+def test_polygons_with_holes_alternates_outline_and_hole():
+    loops = [box(30, 30, 34, 34), box(0, 0, 100, 100), box(20, 20, 60, 60), box(200, 0, 210, 10)]
+    outer, inner, separate = polygons_with_holes(loops)
+    # the order of the outlines in `loops` is kept; box(20, 20, 60, 60) is the big part's hole
+    assert inner.equals(box(0, 0, 100, 100).difference(box(20, 20, 60, 60)))
+    assert outer.equals(box(30, 30, 34, 34)) and separate.equals(box(200, 0, 210, 10))
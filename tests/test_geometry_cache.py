@@ -0,0 +1,32 @@
+from geometry_cache import PairGeometryCache
+
+def key(i): return i.to_bytes(16, 'little')
+
+def traced(cache):
+    statements = []; cache._connection().set_trace_callback(statements.append)
+    return statements
+
+def test_size_total_is_not_summed_on_every_flush(tmp_path):
+    cache = PairGeometryCache(str(tmp_path / 'pairs.sqlite'), batch_size=4); statements = traced(cache)
+    for i in range(40): cache.put('nfp', key(i), key(i), b'x' * 100)
+    cache.close()
+    assert sum('SUM(size)' in s for s in statements) == 1 and sum(s == 'COMMIT' for s in statements) == 10
+
+def test_hits_update_last_used_in_batches(tmp_path):
+    cache = PairGeometryCache(str(tmp_path / 'pairs.sqlite'), batch_size=8)
+    for i in range(8): cache.put('nfp', key(i), key(i), b'x')
+    statements = traced(cache)
+    for _ in range(2):
+        for i in range(8): assert cache.get('nfp', key(i), key(i)) == b'x'
+    assert sum(s.startswith('UPDATE') for s in statements) == 2 * 8 and sum(s == 'COMMIT' for s in statements) == 2
+    assert cache.stats()['hits'] == 16
+
+def test_eviction_keeps_recently_used_entries(tmp_path):
+    cache = PairGeometryCache(str(tmp_path / 'pairs.sqlite'), batch_size=1); cache.max_bytes = 1000
+    for i in range(8): cache.put('nfp', key(i), key(i), b'x' * 100)
+    assert cache.get('nfp', key(0), key(0)) is not None  # now the most recently used
+    for i in range(8, 12): cache.put('nfp', key(i), key(i), b'x' * 100)
+    stored = {row[0] for row in cache._connection().execute("SELECT key_a FROM pairs")}
+    assert key(0) in stored and key(1) not in stored and len(stored) * 100 <= 1000
+    assert cache._total == cache._stored_bytes()
+    cache.close()
@@ -0,0 +1,25 @@
+from shapely.affinity import rotate, scale, translate
+from shapely.geometry import Polygon, box
+
+from geometry_hash import geometry_fingerprint
+
+def plate(hole_x, hole_y, width=100, height=50, size=10):
+    return Polygon(box(0, 0, width, height).exterior.coords, [box(hole_x - size / 2, hole_y - size / 2, hole_x + size / 2, hole_y + size / 2).exterior.coords])
+
+def test_hole_position_distinguishes_plates():
+    # same hole, same distance from the centroid, different place
+    assert geometry_fingerprint(plate(70, 25)) != geometry_fingerprint(plate(62, 41))
+
+def test_fingerprint_ignores_position_rotation_and_start_vertex():
+    part = plate(70, 20); moved = translate(rotate(part, 37, origin=(0, 0)), 500, -200)
+    shifted = Polygon([(100, 0), (100, 50), (0, 50), (0, 0)], [list(part.interiors[0].coords)])
+    assert geometry_fingerprint(part) == geometry_fingerprint(moved) == geometry_fingerprint(shifted)
+
+def test_symmetric_outline_matches_its_rotated_copy():
+    # a rectangle plate turned 180 degrees carries its hole to the mirrored position
+    assert geometry_fingerprint(plate(70, 20)) == geometry_fingerprint(plate(30, 30))
+    assert geometry_fingerprint(plate(70, 20)) != geometry_fingerprint(plate(30, 20))
+
+def test_mirror_image_differs():
+    part = Polygon([(0, 0), (40, 0), (40, 10), (10, 10), (10, 30), (0, 30)])
+    assert geometry_fingerprint(part) != geometry_fingerprint(scale(part, -1, 1, origin=(0, 0)))
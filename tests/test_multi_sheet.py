@@ -0,0 +1,15 @@
+from shapely.geometry import box
+
+from geometry_table import GeometryTable
+from multi_sheet import MultiSheetEngine
+from nesting_engine import Part, SheetConfig
+
+def test_a_part_that_fits_nowhere_opens_no_sheet():
+    # with spacing the 88 x 88 plate is exactly as wide as the space inside the margins: it passes the
+    # size check of every sheet, but touching the margin counts as a collision, so it fits nowhere
+    sheets = [SheetConfig(width=100, height=100, spacing=2, margin=5) for _ in range(3)]
+    parts = [Part(id=str(i), name=str(i), geometry=g, source_file='') for i, g in enumerate([box(0, 0, 60, 60), box(0, 0, 88, 88), box(0, 0, 20, 20)])]
+    table = GeometryTable(parts, [0], 2)
+    placements, unplaced, material = MultiSheetEngine(sheets).place_variants(table, table.pool_variants())
+    assert unplaced == [1] and {sheet for _, _, _, sheet in placements} == {0}
+    assert material < 100 * 100
@@ -0,0 +1,9 @@
+from nesting_benchmark import compare_results, rectangles_dataset, run_case
+
+def test_quick_case_and_regression_check():
+    result = run_case(rectangles_dataset(1, scale=0.1), 'bbox', 'quick', seed=1, repeats=1)
+    assert result['placed'] + result['unplaced'] == result['parts'] and 0 < result['utilization'] <= 100
+    baseline = {'results': [result]}
+    assert compare_results({'results': [result]}, baseline) == []
+    worse = {**result, 'placed': result['placed'] - 1, 'utilization': result['utilization'] - 1}
+    assert [message.split(': ')[1].split(' ')[0] for message in compare_results({'results': [worse]}, baseline)] == ['placed', 'utilization']
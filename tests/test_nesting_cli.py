@@ -0,0 +1,28 @@
+import json
+
+import ezdxf
+import pytest
+from shapely.geometry import Polygon
+
+from nesting_cli import job_parts, load_job
+
+def write_plates(path):
+    doc = ezdxf.new('R2010'); msp = doc.modelspace()
+    # two copies of a 100 x 50 plate with a hole, the second one turned a quarter and drawn with lines
+    msp.add_lwpolyline([(0, 0), (100, 0), (100, 50), (0, 50)], close=True); msp.add_circle((70, 25), 10)
+    corners = [(300, 0), (350, 0), (350, 100), (300, 100)]
+    for a, b in zip(corners, corners[1:] + corners[:1]): msp.add_line(a, b)
+    msp.add_circle((325, 70), 10)
+    doc.saveas(str(path))
+
+def test_job_parts_imports_plates_with_holes(tmp_path):
+    write_plates(tmp_path / 'plate.dxf')
+    job_path = tmp_path / 'job.json'
+    job_path.write_text(json.dumps({'parts': [{'file': 'plate.dxf', 'quantity': 2}, {'name': 'strip', 'wkt': 'POLYGON ((0 0, 80 0, 80 10, 0 10, 0 0))'}],
+                                    'sheet': {'width': 500, 'height': 300}}))
+    pool = job_parts(load_job(str(job_path)))
+    assert len(pool.unique) == 2 and pool.indices.tolist() == [0, 0, 0, 0, 1]
+    plate = pool.unique[0]
+    assert plate.source_file == 'plate.dxf' and len(plate.geometry.interiors) == 1
+    assert Polygon(plate.geometry.interiors[0]).centroid.coords[0] == pytest.approx((70, 25), abs=1e-6)
+    assert pool.unique[1].name == 'strip' and pool.unique[1].source_file == ''
@@ -0,0 +1,86 @@
+from dataclasses import replace
+
+import numpy as np
+import pytest
+from shapely.geometry import Point, Polygon, box
+
+from nesting_engine import GAConfig, assign_nesting, GeneticAlgorithmNester, NestingEngine, NestingWorkerPool, Part, PartPool, SheetConfig
+
+def nester(**ga):
+    parts = PartPool([Part(id='a', name='a', geometry=box(0, 0, 40, 20), source_file=''), Part(id='b', name='b', geometry=box(0, 0, 30, 30), source_file='')], [0, 0, 1])
+    return GeneticAlgorithmNester(parts, SheetConfig(width=100, height=100, spacing=2, margin=5), GAConfig(pair_cache_path=None, **ga))
+
+def test_copies_of_a_part_share_a_fitness_key():
+    n = nester()
+    swapped = n._fitness_key(np.array([[1, 0], [0, 0], [2, 1]], dtype=np.int32))
+    assert n._fitness_key(np.array([[0, 0], [1, 0], [2, 1]], dtype=np.int32)) == swapped
+    assert n._fitness_key(np.array([[0, 0], [2, 0], [1, 1]], dtype=np.int32)) != swapped
+
+def test_full_prefix_reuse_counts_as_a_fitness_hit():
+    evaluated = [{'genes': 10, 'reused_genes': 10, 'seconds': 0.001}, {'genes': 10, 'reused_genes': 0, 'seconds': 0.1}]
+    stats = nester()._generation_stats(0, evaluated, 0, [1.0, 2.0], 0.2, 1.0)
+    assert stats['seconds_saved'] == pytest.approx(0.1 - 0.001)
+    only_full = nester()._generation_stats(0, evaluated[:1], 0, [1.0], 0.1, 1.0)
+    assert only_full['seconds_saved'] == 0.0
+
+def test_migrants_replace_the_weakest_ranked_individuals():
+    n = nester(population_size=3); rng = np.random.default_rng(0)
+    population = [np.array(c, dtype=np.int32) for c in ([[2, 1], [1, 1], [0, 0]], [[1, 1], [0, 0], [2, 1]], [[2, 1], [1, 0], [0, 0]])]
+    migrant = np.array([[2, 1], [1, 1], [0, 1]], dtype=np.int32)
+    fitness = [n._evaluate_chromosome(c)[0] for c in [*population, migrant]]
+    assert fitness[0] == max(fitness) and fitness[3] == min(fitness)
+    [(kept, kept_fitness, _)] = n.evolve_island(0, population, [migrant], rng, 1, record=True)['history']
+    # the newest child (the last one) stays; the worst ranked one makes room for the migrant
+    assert [k.tolist() for k in kept] == [c.tolist() for c in (population[1], population[2], migrant)] and kept_fitness == fitness[1:]
+
+@pytest.mark.parametrize('hole', [Point(60, 60).buffer(40, quad_segs=16), box(20, 20, 100, 100), Point(60, 60).buffer(40, quad_segs=16).intersection(box(0, 0, 120, 80))])
+def test_parts_nest_in_round_and_irregular_holes(hole):
+    frame = box(0, 0, 120, 120).difference(hole); spacing = 2
+    parts = [Part(id='frame', name='frame', geometry=frame, source_file='')] + [Part(id=str(i), name=str(i), geometry=box(0, 0, 10, 10), source_file='') for i in range(6)]
+    # the sheet only has room for the frame, so every square has to go into the hole
+    placed, unplaced, _ = NestingEngine(SheetConfig(width=135, height=135, spacing=spacing, margin=5)).place_parts(parts)
+    assert not unplaced
+    cut_out = Polygon(placed[0].placed_geometry.interiors[0])
+    for part in placed[1:]: assert cut_out.contains(part.placed_geometry) and cut_out.exterior.distance(part.placed_geometry) >= spacing - 1e-6
+
+def test_union_and_indexed_collision_checks_place_identically():
+    rng = np.random.default_rng(4); geometries = []
+    for i, (w, h) in enumerate(rng.uniform(8, 50, (60, 2)).tolist()):
+        geometries.append(box(0, 0, w, h) if i % 4 else Point(0, 0).buffer(max(w, h) / 2, quad_segs=8) if i % 8 else box(0, 0, 3 * w, 3 * h).difference(box(w, h, 2 * w, 2 * h)))
+    def parts(): return [Part(id=str(i), name=str(i), geometry=g, source_file='') for i, g in enumerate(geometries)]
+    sheet = SheetConfig(width=400, height=300, spacing=3, margin=5)
+    indexed = NestingEngine(sheet).place_parts(parts())
+    union = NestingEngine(sheet, use_spatial_index=False).place_parts(parts())
+    assert indexed[1] and any(p.nest_depth for p in assign_nesting(indexed[0]))  # a full sheet, with parts in holes
+    assert [p.name for p in indexed[0]] == [p.name for p in union[0]] and indexed[2] == union[2]
+    assert all(a.placed_geometry.equals_exact(b.placed_geometry, 0) for a, b in zip(indexed[0], union[0]))
+
+def test_worker_pool_survives_ga_only_changes():
+    n = nester(); pool = NestingWorkerPool(1)
+    def signature(**ga): return pool.job_signature(n.parts_pool, n.sheet_config, replace(n.ga_config, **ga), None)
+    assert signature(population_size=50, generations=99, seed=3, stall_generations=4, time_budget=10.0, mutation_rate=0.5) == signature()
+    for changed in ({'engine': 'nfp'}, {'allowed_rotations': [0, 180]}, {'simplify_tolerance': 1.0}, {'pair_cache_path': 'other.sqlite'}):
+        assert signature(**changed) != signature()
+
+def test_reused_worker_pool_runs_the_new_ga_settings():
+    def run(pool, **ga):
+        n = nester(islands=2, migration_interval=2, **ga); n.worker_pool = pool; placed, _, fitness = n.run(lambda percent: None, lambda: False)
+        return fitness, [s['best_fitness'] for s in n.generation_stats], sorted((p.name, p.placed_geometry.bounds) for p in placed)
+    shared = NestingWorkerPool(1); fresh = NestingWorkerPool(1)
+    try:
+        run(shared, generations=2, population_size=12, seed=1); executor = shared._executor
+        # the shared workers' fitness caches are warm, so only the outcome is compared, not the evaluation counts
+        changed = {'generations': 4, 'population_size': 6, 'mutation_rate': 0.9, 'seed': 2}
+        assert run(shared, **changed) == run(fresh, **changed) and shared._executor is executor
+    finally: shared.shutdown(); fresh.shutdown()
+
+def test_pair_cache_is_closed_when_a_run_fails(tmp_path):
+    parts = PartPool([Part(id='a', name='a', geometry=Point(0, 0).buffer(15, quad_segs=4), source_file=''), Part(id='b', name='b', geometry=box(0, 0, 30, 20), source_file='')], [0, 1, 1])
+    path = str(tmp_path / 'pairs.sqlite'); ga = GAConfig(engine='nfp', generations=3, population_size=4, seed=1, pair_cache_path=path)
+    n = GeneticAlgorithmNester(parts, SheetConfig(width=100, height=100, spacing=2, margin=5), ga, NestingWorkerPool(1))
+    def fail(stats, best): raise RuntimeError("callback failed")
+    try:
+        with pytest.raises(RuntimeError): n.run(lambda percent: None, lambda: False, None, fail)
+    finally: n.worker_pool.shutdown()
+    # the layout shown for generation 1 was placed in this process from the NFPs the worker stored; its LRU touches are written on close
+    assert n.pair_cache.hits > 0 and n.pair_cache._conn is None and not n.pair_cache._touched
@@ -0,0 +1,29 @@
+from shapely.affinity import translate
+from shapely.geometry import Point, box
+
+from nesting_engine import Part
+from part_store import PartStore
+from project import load_project, save_project
+
+def saved_project(path):
+    plate = box(0, 0, 60, 30).difference(Point(20, 15).buffer(8, quad_segs=16)); parts = PartStore(); parts.extend(['plate'], [plate], [2])
+    placed = [Part(id='plate', name='plate', geometry=plate, source_file='', placed_geometry=translate(plate, 5 + 70 * i, 5)) for i in range(2)]
+    layout = {'name': 'Sheet 200x100', 'width': 200, 'height': 100, 'util': 18.0, 'placed_parts_geometries': placed}
+    save_project(path, parts, [{'width': 200, 'height': 100}], {'engine': 'bbox'}, [{'name': 'Result 1', 'layout': layout}])
+    return placed
+
+def test_loaded_layout_lists_its_placed_parts_before_loading_them(tmp_path):
+    path = str(tmp_path / 'job.hnproj'); placed = saved_project(path)
+    layout = load_project(path)['results'][0]['layout']
+    assert 'placed_parts_geometries' in layout and 'missing' not in layout
+    assert set(layout.keys()) == {'name', 'width', 'height', 'util', 'placed_parts_geometries'} and len(layout) == 5
+    assert not dict.__contains__(layout, 'placed_parts_geometries')  # still not read from the archive
+    loaded = dict(layout.items())['placed_parts_geometries']
+    assert [p.placed_geometry.equals(q.placed_geometry) for p, q in zip(loaded, placed)] == [True, True]
+    assert layout.get('placed_parts_geometries') is loaded and {**layout}['placed_parts_geometries'] is loaded
+
+def test_loaded_placed_parts_share_the_part_outline(tmp_path):
+    path = str(tmp_path / 'job.hnproj'); saved_project(path)
+    project = load_project(path); placed = project['results'][0]['layout']['placed_parts_geometries']
+    assert placed[0].geometry is placed[1].geometry is project['parts'].geometry(0)
+    assert len(placed[0].placed_geometry.interiors) == 1
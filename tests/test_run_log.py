@@ -0,0 +1,39 @@
+import json
+import struct
+
+import numpy as np
+
+from run_log import MAGIC, RunLogWriter, load_run_log
+
+def population(rng, size, genes, rotations):
+    return [np.stack([rng.permutation(genes), rng.integers(0, rotations, genes)], axis=1).astype(np.int32) for _ in range(size)]
+
+def test_records_round_trip_with_many_rotations(tmp_path):
+    rng = np.random.default_rng(1); path = str(tmp_path / 'run.hnrl'); state = rng.bit_generator.state
+    generations = [population(rng, 4, 6, 360) for _ in range(2)]
+    writer = RunLogWriter(path, {'genes': 6, 'rotations': list(range(360))})
+    for generation, chromosomes in enumerate(generations, start=1): writer.append(generation, 0, chromosomes, np.arange(4.0), state)
+    writer.close()
+    header, records = load_run_log(path)
+    assert header['rotations'] == list(range(360)) and [r.generation for r in records] == [1, 2]
+    for record, chromosomes in zip(records, generations):
+        assert np.array_equal(record.population, np.array(chromosomes)) and record.rng_state == state
+    assert records[0].population[:, :, 1].max() > 255
+
+def test_truncated_last_record_is_ignored(tmp_path):
+    rng = np.random.default_rng(2); path = str(tmp_path / 'run.hnrl')
+    writer = RunLogWriter(path, {'genes': 5}); state = rng.bit_generator.state
+    for generation in (1, 2): writer.append(generation, 0, population(rng, 3, 5, 4), [1.0, 2.0, 3.0], state)
+    writer.close()
+    with open(path, 'r+b') as f: f.truncate(f.seek(0, 2) - 10)
+    assert [r.generation for r in load_run_log(path)[1]] == [1]
+
+def test_reads_version_1_logs(tmp_path):
+    path = str(tmp_path / 'old.hnrl'); chromosomes = np.array([[[1, 2], [0, 3]], [[0, 0], [1, 1]]], dtype=np.int32); header = json.dumps({'genes': 2}).encode()
+    state = json.dumps({'state': 7}).encode()
+    with open(path, 'wb') as f:
+        f.write(MAGIC + struct.pack("<HI", 1, len(header)) + header + struct.pack("<IiIII", 3, 1, 2, 2, len(state)))
+        f.write(chromosomes[:, :, 0].astype('<u2').tobytes() + chromosomes[:, :, 1].astype('u1').tobytes() + np.array([5.0, 6.0]).tobytes() + state)
+    [record] = load_run_log(path)[1]
+    assert (record.generation, record.island) == (3, 1) and np.array_equal(record.population, chromosomes)
+    assert record.fitness.tolist() == [5.0, 6.0] and record.rng_state == {'state': 7}
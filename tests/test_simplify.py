@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+from shapely.geometry import Point, box
+
+from geometry_simplify import simplify_outward
+from geometry_table import GeometryTable
+from nesting_engine import NestingEngine, Part, SheetConfig
+
+def placed_count(geometries, sheet, tolerance):
+    parts = [Part(id=str(i), name=str(i), geometry=g, source_file='') for i, g in enumerate(geometries)]
+    table = GeometryTable(parts, [0], sheet.spacing, tolerance)
+    placements, _, _ = NestingEngine(sheet).place_variants(table, table.pool_variants())
+    return len(placements)
+
+def test_proxy_contains_part_within_tolerance():
+    part = Point(0, 0).buffer(20, quad_segs=16); proxy = simplify_outward(part, 2.0)
+    assert proxy.contains(part) and len(proxy.exterior.coords) < len(part.exterior.coords)
+    assert part.hausdorff_distance(proxy) <= 2.0 + 1e-9
+
+def test_proxy_of_a_simple_part_is_the_part():
+    part = box(0, 0, 40, 20)
+    assert simplify_outward(part, 5.0) is part
+
+@pytest.mark.parametrize('part', [Point(0, 0).buffer(20, quad_segs=16), box(0, 0, 40, 30).buffer(5, quad_segs=8)])
+@pytest.mark.parametrize('tolerance', [1.0, 3.0, 6.0])
+def test_simplification_does_not_reduce_placed_parts(part, tolerance):
+    sheet = SheetConfig(width=300, height=200, spacing=10, margin=5)
+    assert placed_count([part] * 30, sheet, tolerance) >= placed_count([part] * 30, sheet, 0.0)
+
+@pytest.mark.parametrize('tolerance', [1.0, 3.0])
+def test_simplification_on_mixed_parts(tolerance):
+    rng = np.random.default_rng(3)
+    parts = [Point(0, 0).buffer(r, quad_segs=12) if k else box(0, 0, r * 2, r) for r, k in zip(rng.uniform(5, 30, 150), rng.integers(0, 2, 150))]
+    sheet = SheetConfig(width=600, height=400, spacing=4, margin=5)
+    assert placed_count(parts, sheet, tolerance) >= placed_count(parts, sheet, 0.0)
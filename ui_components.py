@@ -9,12 +9,14 @@ from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QHBoxLayout,
                              QDialog, QDialogButtonBox, QGraphicsView, QGraphicsScene,
                              QComboBox, QCheckBox, QGridLayout, QTextEdit,
                              QLineEdit, QFormLayout, QDoubleSpinBox, QRadioButton,
-                             QSpinBox, QToolBar, QScrollArea, QSplitter, QGraphicsEllipseItem)
+                             QSpinBox, QToolBar, QScrollArea, QSplitter, QGraphicsEllipseItem, QGroupBox)
 from PyQt6.QtGui import QBrush, QColor, QPen, QFont, QPolygonF
 from PyQt6.QtCore import Qt, QSize, QPointF
 import qtawesome as qta
 import random
 
+from dxf_io import DXF_VERSION, DXF_VERSIONS
+
 # --- 1.1: Auto Joint Dialog ---
 class AutoJointDialog(QDialog):
     def __init__(self, parent=None):
@@ -37,6 +39,56 @@ class AutoJointDialog(QDialog):
     def get_settings(self):
         return {'style': 'By Count' if self.by_count_radio.isChecked() else 'By Distance','no_joint_at_start': self.no_joint_start_check.isChecked(),'corner_is_not_mic': self.corner_not_mic_check.isChecked(),'count': self.count_spin.value(),'length': self.length_combo.currentText(),'apply_to': self.apply_to_combo.currentText(),'use_min_filter': self.min_size_check.isChecked(),'min_size': self.min_size_combo.currentText() if self.min_size_check.isChecked() else None,'use_max_filter': self.max_size_check.isChecked(),'max_size': self.max_size_combo.currentText() if self.max_size_check.isChecked() else None}
 
+# --- 1.1b: DXF Export Dialog ---
+class DxfExportDialog(QDialog):
+    def __init__(self, sheet_count: int = 1, parent=None):
+        super().__init__(parent);self.setWindowTitle("DXF Export");self.setMinimumWidth(400);main_layout = QVBoxLayout(self)
+        files_group = QGroupBox("Sheets");files_layout = QVBoxLayout();self.per_sheet_radio = QRadioButton(f"One file per sheet ({sheet_count} files)");self.single_file_radio = QRadioButton("All sheets side by side in one file")
+        self.per_sheet_radio.setChecked(True);files_layout.addWidget(self.per_sheet_radio);files_layout.addWidget(self.single_file_radio);files_group.setLayout(files_layout);main_layout.addWidget(files_group)
+        options_layout = QFormLayout();self.use_blocks_check = QCheckBox("Write repeated parts as blocks (INSERT)");self.use_blocks_check.setChecked(True);self.version_combo = QComboBox();self.version_combo.addItems(list(DXF_VERSIONS))
+        self.version_combo.setCurrentText(DXF_VERSION);options_layout.addRow(self.use_blocks_check);options_layout.addRow("DXF Version:", self.version_combo);main_layout.addLayout(options_layout)
+        button_box = QDialogButtonBox(QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel);button_box.accepted.connect(self.accept);button_box.rejected.connect(self.reject);main_layout.addWidget(button_box)
+    def get_settings(self):
+        return {'single_file': self.single_file_radio.isChecked(), 'use_blocks': self.use_blocks_check.isChecked(), 'dxf_version': self.version_combo.currentText()}
+
+# --- 1.1c: Report Viewers ---
+def _rows_table(rows) -> QTableWidget:
+    """Read-only table of a list of dicts; the first row's keys are the columns."""
+    columns = list(rows[0]) if rows else [];table = QTableWidget(len(rows), len(columns));table.setHorizontalHeaderLabels([c.replace('_', ' ').title() for c in columns])
+    for r, row in enumerate(rows):
+        for c, key in enumerate(columns): value = row.get(key, ''); table.setItem(r, c, QTableWidgetItem(f"{value:.2f}" if isinstance(value, float) else str(value)))
+    table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers);table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch);return table
+
+def _summary_form(values) -> QFormLayout:
+    form = QFormLayout()
+    for key, value in values.items(): form.addRow(f"{key.replace('_', ' ').title()}:", QLabel(f"{value:.2f}" if isinstance(value, float) else str(value)))
+    return form
+
+class SummaryReportViewer(QDialog):
+    """Job summary: {'job_summary': {...}, 'sheet_requirements': [{...}], 'parts_list': [{...}]}."""
+    def __init__(self, data, parent=None):
+        super().__init__(parent);self.setWindowTitle("Summary Report");self.resize(700, 600);main_layout = QVBoxLayout(self)
+        summary_group = QGroupBox("Job Summary");summary_group.setLayout(_summary_form(data.get('job_summary', {})));main_layout.addWidget(summary_group)
+        main_layout.addWidget(QLabel("Sheet Requirements"));main_layout.addWidget(_rows_table(data.get('sheet_requirements', [])))
+        main_layout.addWidget(QLabel("Parts List"));main_layout.addWidget(_rows_table(data.get('parts_list', [])))
+        button_box = QDialogButtonBox(QDialogButtonBox.StandardButton.Close);button_box.rejected.connect(self.reject);main_layout.addWidget(button_box)
+
+class DetailedReportViewer(QDialog):
+    """One nest: {'header_summary': {...}, 'main_preview': layout dict, 'parts_list': [{...}], 'footer': {...}}."""
+    def __init__(self, data, parent=None):
+        super().__init__(parent);self.setWindowTitle("Detailed Report");self.resize(900, 700);main_layout = QVBoxLayout(self)
+        header_group = QGroupBox("Nest");header_group.setLayout(_summary_form(data.get('header_summary', {})));main_layout.addWidget(header_group)
+        splitter = QSplitter(Qt.Orientation.Horizontal);layout = data.get('main_preview') or {};self.preview = QGraphicsView()
+        if layout:
+            from preview_render import PathCache, layout_scene
+            self.preview.setScene(layout_scene(PathCache(), [(layout['width'], layout['height'], layout.get('placed_parts_geometries', []))]))
+        splitter.addWidget(self.preview);splitter.addWidget(_rows_table(data.get('parts_list', [])));main_layout.addWidget(splitter, 1)
+        if data.get('footer'): main_layout.addLayout(_summary_form(data['footer']))
+        button_box = QDialogButtonBox(QDialogButtonBox.StandardButton.Close);button_box.rejected.connect(self.reject);main_layout.addWidget(button_box)
+    def showEvent(self, event):
+        super().showEvent(event)
+        if self.preview.scene(): self.preview.fitInView(self.preview.scene().itemsBoundingRect(), Qt.AspectRatioMode.KeepAspectRatio)
+
 # --- 1.2: Add Sheets Dialog ---
 class AddSheetsDialog(QDialog):
     def __init__(self, parent=None):